@@ -1,29 +1,24 @@
-import json
+from itemCatalog import PLANTS, Catalog
 
-# Load the items.json file
-with open('data/items/Items.json', 'r', encoding='utf-8') as file:
-    items = json.load(file)
+# Shiny tiers with the last digit of their id and their probability
+SHINY_TIERS = [('bronze', 1, 0.6), ('silver', 2, 0.3), ('gold', 3, 0.1)]
 
-# Iterate through each plant and add transformShinyIds
-for plant in items['PlacedItems']['Plants']:
-    original_transform_id = plant['transformId']
-    base_transform_id = original_transform_id[:-1]  # Remove last digit
 
-    plant['transformShinyIds'] = {
-        'bronze': {
-            'id': f"{base_transform_id}1",  # Change last digit to 1
-            'probability': 0.6
-        },
-        'silver': {
-            'id': f"{base_transform_id}2",  # Change last digit to 2
-            'probability': 0.3
-        },
-        'gold': {
-            'id': f"{base_transform_id}3",  # Change last digit to 3
-            'probability': 0.1
+def add_shiny_tables(catalog):
+    """Give every plant the standard transformShinyIds, next to its transformId. Returns how many plants changed."""
+    changed = 0
+    for plant in catalog.section(*PLANTS):
+        base_transform_id = plant.transformId[:-1]  # Remove last digit
+        shiny_ids = {
+            tier: {'id': f"{base_transform_id}{digit}", 'probability': probability}
+            for tier, digit, probability in SHINY_TIERS
         }
-    }
+        if catalog.update(plant, transformShinyIds=shiny_ids):
+            changed += 1
+    return changed
 
-# Write the updated items back to the file
-with open('data/items/Items.json', 'w', encoding='utf-8') as file:
-    json.dump(items, file, ensure_ascii=False, indent=2)
\ No newline at end of file
+
+if __name__ == "__main__":
+    catalog = Catalog.load()
+    add_shiny_tables(catalog)
+    catalog.save()
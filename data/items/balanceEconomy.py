@@ -0,0 +1,188 @@
+import csv
+import os
+import sys
+
+import numpy as np
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+PLANTS_CSV = 'items/placedItems/final/plants.csv'
+SEEDS_CSV = 'items/inventoryItems/final/seeds.csv'
+HARVESTED_CSV = 'items/inventoryItems/final/harvested.csv'
+STORES_CSV = 'store/stores.csv'
+
+REPORT_CSV = 'items/balanceReport.csv'
+PROPOSALS_CSV = 'items/balanceProposals.csv'
+
+# Balancing constants, see itemNotes.txt
+baseGold = 1
+baseExp = 0.1
+goldMultiplier = {'slow': 1.2, 'medium': 1, 'fast': 0.8}
+expMultiplier = {'slow': 0.8, 'medium': 1, 'fast': 1.5}
+roi = {'slow': 5, 'medium': 3, 'fast': 2}
+
+# Speed tiers by grow time in seconds: fast finishes within a play session, slow needs to be planned around
+SPEEDS = ['fast', 'medium', 'slow']
+SPEED_LIMITS = [15 * 60, 120 * 60]
+
+# A plant is within its band when its ROI is within this fraction of the target
+ROI_TOLERANCE = 0.1
+
+
+def read_csv(data_dir, relative_path):
+    with open(os.path.join(data_dir, relative_path), mode='r', encoding='utf-8', newline='') as csv_file:
+        return [row for row in csv.DictReader(csv_file) if row.get("id")]
+
+
+def column(rows, key):
+    return np.array([float(row[key]) for row in rows], dtype=np.float64)
+
+
+def lookup(values_by_id, ids):
+    """Values for ids from a {id: value} dict, NaN where the id is missing."""
+    return np.array([values_by_id.get(item_id, np.nan) for item_id in ids], dtype=np.float64)
+
+
+class Economy:
+    """Every plant of the catalog as arrays, one entry per plant, joined to its seed and harvested item.
+
+    Plants whose grow time is 0 (the error item) are dropped, they have no meaningful rates.
+    """
+
+    def __init__(self, plants, seeds, harvested, stores):
+        plants = [plant for plant in plants if float(plant["growTime"]) > 0]
+        self.ids = [plant["id"] for plant in plants]
+        self.names = [plant["name"] for plant in plants]
+
+        self.plant_value = column(plants, "value")
+        self.base_exp = column(plants, "baseExp")
+        self.grow_time = column(plants, "growTime")
+        self.repeated_grow_time = column(plants, "repeatedGrowTime")
+        self.num_harvests = np.maximum(column(plants, "numHarvests"), 1)
+
+        # Seeds point at their plant, plants point at their harvested item
+        seed_values = {seed["transformId"]: float(seed["value"]) for seed in seeds}
+        harvested_values = {item["id"]: float(item["value"]) for item in harvested}
+        self.seed_value = lookup(seed_values, self.ids)
+        self.harvested_value = lookup(harvested_values, [plant["transformId"] for plant in plants])
+
+        self.store_names = [store["name"] for store in stores]
+        self.buy_multiplier = column(stores, "buyMultiplier")
+        self.sell_multiplier = column(stores, "sellMultiplier")
+
+        # Index into SPEEDS per plant, and the per plant constants of its tier
+        self.speed = np.searchsorted(SPEED_LIMITS, self.grow_time, side='left')
+        self.gold_multiplier = np.array([goldMultiplier[speed] for speed in SPEEDS])[self.speed]
+        self.exp_multiplier = np.array([expMultiplier[speed] for speed in SPEEDS])[self.speed]
+        self.target_roi = np.array([roi[speed] for speed in SPEEDS], dtype=np.float64)[self.speed]
+
+    @classmethod
+    def load(cls, data_dir=default_data_dir):
+        return cls(
+            read_csv(data_dir, PLANTS_CSV),
+            read_csv(data_dir, SEEDS_CSV),
+            read_csv(data_dir, HARVESTED_CSV),
+            read_csv(data_dir, STORES_CSV),
+        )
+
+    @property
+    def cycle_time(self):
+        """Seconds from planting a seed to the last harvest."""
+        return self.grow_time + self.repeated_grow_time * (self.num_harvests - 1)
+
+    def metrics(self):
+        """ROI, gold per hour and exp per hour, as (plants, stores) arrays.
+
+        A cycle buys one seed at the store's buy multiplier and sells every harvest at its sell multiplier.
+        """
+        seed_cost = self.seed_value[:, None] * self.buy_multiplier[None, :]
+        revenue = (self.harvested_value * self.num_harvests)[:, None] * self.sell_multiplier[None, :]
+        hours = (self.cycle_time / 3600.0)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            roi_values = revenue / seed_cost
+            gold_per_hour = (revenue - seed_cost) / hours
+        exp_per_hour = np.broadcast_to((self.base_exp * self.num_harvests)[:, None] / hours, roi_values.shape)
+        return roi_values, gold_per_hour, exp_per_hour
+
+    def in_band(self, roi_values):
+        return np.abs(roi_values - self.target_roi[:, None]) <= ROI_TOLERANCE * self.target_roi[:, None]
+
+    def propose(self, store=0):
+        """Solve backward for the values that put every plant on its tier's ROI, gold and exp rates.
+
+        Same model as getPlantValues.py, over the whole cycle instead of a single grow: the profit of
+        a cycle is cycle time * gold multiplier * base gold, and ROI is revenue over seed cost, so
+        seed cost = profit / (ROI - 1) and revenue = profit + seed cost.
+        """
+        profit = self.cycle_time * self.gold_multiplier * baseGold
+        seed_cost = profit / (self.target_roi - 1.0)
+        revenue = profit + seed_cost
+        return {
+            "seedValue": seed_cost / self.buy_multiplier[store],
+            "harvestedValue": revenue / (self.sell_multiplier[store] * self.num_harvests),
+            "baseExp": self.cycle_time * self.exp_multiplier * baseExp / self.num_harvests,
+        }
+
+
+def format_number(value):
+    # NaN where a plant has no seed or harvested item
+    if np.isnan(value):
+        return ''
+    return f"{value:.4g}"
+
+
+def write_report(economy, file_path):
+    roi_values, gold_per_hour, exp_per_hour = economy.metrics()
+    in_band = economy.in_band(roi_values)
+    with open(file_path, mode='w', encoding='utf-8', newline='') as report_file:
+        writer = csv.writer(report_file, lineterminator='\n')
+        writer.writerow(["id", "name", "store", "speed", "roi", "targetRoi", "inBand", "goldPerHour", "expPerHour"])
+        for plant in range(len(economy.ids)):
+            for store in range(len(economy.store_names)):
+                writer.writerow([
+                    economy.ids[plant],
+                    economy.names[plant],
+                    economy.store_names[store],
+                    SPEEDS[economy.speed[plant]],
+                    format_number(roi_values[plant, store]),
+                    format_number(economy.target_roi[plant]),
+                    bool(in_band[plant, store]),
+                    format_number(gold_per_hour[plant, store]),
+                    format_number(exp_per_hour[plant, store]),
+                ])
+    return int(np.count_nonzero(~in_band))
+
+
+def write_proposals(economy, file_path, store=0):
+    # Item values are whole numbers in the CSVs, proposals never go below 1
+    proposal = {key: np.maximum(np.rint(values), 1).astype(np.int64) for key, values in economy.propose(store).items()}
+    current = {"seedValue": economy.seed_value, "harvestedValue": economy.harvested_value, "baseExp": economy.base_exp}
+    with open(file_path, mode='w', encoding='utf-8', newline='') as proposals_file:
+        writer = csv.writer(proposals_file, lineterminator='\n')
+        header = ["id", "name", "speed"]
+        for key in proposal:
+            header += [key, f"proposed{key[0].upper()}{key[1:]}"]
+        writer.writerow(header)
+        for plant in range(len(economy.ids)):
+            row = [economy.ids[plant], economy.names[plant], SPEEDS[economy.speed[plant]]]
+            for key, values in proposal.items():
+                row += [format_number(current[key][plant]), values[plant]]
+            writer.writerow(row)
+
+
+def balance_economy(data_dir=default_data_dir, store=0):
+    economy = Economy.load(data_dir)
+    report_path = os.path.normpath(os.path.join(data_dir, REPORT_CSV))
+    proposals_path = os.path.normpath(os.path.join(data_dir, PROPOSALS_CSV))
+    outside = write_report(economy, report_path)
+    write_proposals(economy, proposals_path, store)
+    print(f"Balanced {len(economy.ids)} plants across {len(economy.store_names)} stores, "
+          f"{outside} plant/store pairs outside their ROI band.")
+    print(f"Report written to {report_path}, proposals written to {proposals_path}.")
+
+
+if __name__ == "__main__":
+    # Proposals are priced for the default store unless a store row number is given
+    balance_economy(store=int(sys.argv[1]) if len(sys.argv) > 1 else 0)
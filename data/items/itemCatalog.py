@@ -0,0 +1,215 @@
+import json
+import os
+import sys
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_items_path = os.path.join(script_dir, 'Items.json')
+
+# The record types are shared with the build scripts
+scripts_dir = os.path.join(script_dir, '..', 'scripts')
+if scripts_dir not in sys.path:
+    sys.path.insert(0, scripts_dir)
+
+from itemRecords import MISSING, record_to_json, records_from_json
+
+PLANTS = ('PlacedItems', 'Plants')
+HARVESTED_ITEMS = ('InventoryItems', 'HarvestedItems')
+
+
+def find_sections(data, path=()):
+    """Yield (path, items) for every list of items in an Items.json document, in document order."""
+    for key, value in data.items():
+        if isinstance(value, list):
+            yield path + (key,), value
+        elif isinstance(value, dict):
+            yield from find_sections(value, path + (key,))
+
+
+class Catalog:
+    """Items.json loaded once, with hash indexes by id, name, subtype, category and level.
+
+    Every item is an itemRecords record stored in the document itself, so reading one from a
+    query and changing it through update() changes what save() writes. Mutations only touch
+    memory; save() writes the whole document once at the end. Index buckets are dicts keyed by
+    id(item), records compare by value and are not hashable, so an update moves an item between
+    buckets in constant time.
+    """
+
+    # Fields with an index of their own, besides id
+    INDEXED_FIELDS = ('name', 'subtype', 'category', 'level')
+
+    def __init__(self, data, path=None):
+        self.data = data
+        self.path = path
+        self.changed = False
+        self.by_id = {}
+        self.section_of = {}
+        # Position of every item in its section list, so upsert replaces without scanning
+        self.position_of = {}
+        self.indexes = {field: {} for field in self.INDEXED_FIELDS}
+        for section_path, items in find_sections(data):
+            items[:] = records_from_json(section_path, items)
+            for position, item in enumerate(items):
+                self.index(item, section_path)
+                self.position_of[id(item)] = position
+
+    @classmethod
+    def load(cls, path=default_items_path):
+        with open(path, mode='r', encoding='utf-8') as file:
+            return cls(json.load(file), path)
+
+    def save(self, path=None, force=False):
+        """Write the document back, by default only when something changed. Returns whether it was written."""
+        if not self.changed and not force:
+            return False
+        with open(path or self.path, mode='w', encoding='utf-8') as file:
+            json.dump(self.data, file, ensure_ascii=False, indent=4, default=record_to_json)
+        self.changed = False
+        return True
+
+    def index_field(self, item, field):
+        if field == 'id':
+            # The first item with an id wins, like the first match of a list scan
+            self.by_id.setdefault(item.id, item)
+            return
+        value = getattr(item, field, MISSING)
+        if value is not MISSING:
+            self.indexes[field].setdefault(value, {})[id(item)] = item
+
+    def unindex_field(self, item, field):
+        if field == 'id':
+            if self.by_id.get(item.id) is item:
+                del self.by_id[item.id]
+            return
+        value = getattr(item, field, MISSING)
+        if value is not MISSING:
+            bucket = self.indexes[field][value]
+            del bucket[id(item)]
+            if not bucket:
+                del self.indexes[field][value]
+
+    def index(self, item, section_path):
+        self.section_of[id(item)] = section_path
+        self.index_field(item, 'id')
+        for field in self.indexes:
+            self.index_field(item, field)
+
+    def unindex(self, item):
+        del self.section_of[id(item)]
+        self.position_of.pop(id(item), None)
+        self.unindex_field(item, 'id')
+        for field in self.indexes:
+            self.unindex_field(item, field)
+
+    def position(self, item):
+        """Where item sits in its section list."""
+        items = self.section(*self.section_of[id(item)])
+        position = self.position_of.get(id(item))
+        if position is None or position >= len(items) or items[position] is not item:
+            # The list was changed behind the catalog's back, e.g. through section()
+            position = next(position for position, other in enumerate(items) if other is item)
+            self.position_of[id(item)] = position
+        return position
+
+    # Queries
+
+    def section(self, *path):
+        """The item list at path, e.g. section('PlacedItems', 'Plants'), created empty when missing."""
+        node = self.data
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        return node.setdefault(path[-1], [])
+
+    def get(self, item_id, section=None):
+        """The item with this id, optionally only when it is in one section."""
+        item = self.by_id.get(item_id)
+        if item is not None and section is not None and self.section_of[id(item)] != tuple(section):
+            return None
+        return item
+
+    def where(self, field, value, section=None):
+        """Items whose indexed field equals value, in document order within each section."""
+        items = self.indexes[field].get(value, {}).values()
+        if section is not None:
+            return [item for item in items if self.section_of[id(item)] == tuple(section)]
+        return list(items)
+
+    def item_named(self, name, section=None):
+        """The first item with this name, optionally only within one section."""
+        items = self.where('name', name, section)
+        return items[0] if items else None
+
+    def in_category(self, category, subtype=None):
+        return [item for item in self.where('category', category) if subtype is None or getattr(item, 'subtype', None) == subtype]
+
+    def plants_in_category(self, category):
+        return self.in_category(category, 'Plant')
+
+    def up_to_level(self, level, subtype=None):
+        """Items unlocked at or below level, lowest level first."""
+        return [
+            item
+            for item_level in sorted(key for key in self.indexes['level'] if key <= level)
+            for item in self.indexes['level'][item_level].values()
+            if subtype is None or getattr(item, 'subtype', None) == subtype
+        ]
+
+    # Mutations
+
+    def update(self, item, **fields):
+        """Set fields on an item of this catalog and keep the indexes in step. Returns whether anything changed."""
+        # Compare in record form, e.g. transformShinyIds given as a dict is stored as ShinyRates
+        fields = {field: item.convert(field, value) for field, value in fields.items()}
+        changed = {field: value for field, value in fields.items() if getattr(item, field, MISSING) != value}
+        if not changed:
+            return False
+        # Only the indexes of changed fields are touched, most updates (value, ...) touch none
+        for field, value in changed.items():
+            indexed = field == 'id' or field in self.indexes
+            if indexed:
+                self.unindex_field(item, field)
+            setattr(item, field, value)
+            if indexed:
+                self.index_field(item, field)
+        self.changed = True
+        return True
+
+    def upsert(self, section_path, new_item, match='id'):
+        """Replace the item of section_path with the same id (or other indexed field) in place, or append new_item.
+
+        new_item is a record or a dict in the JSON shape. Returns the record stored.
+        """
+        section_path = tuple(section_path)
+        items = self.section(*section_path)
+        new_item = records_from_json(section_path, [new_item])[0]
+        if match == 'id':
+            old_item = self.get(new_item.id, section_path)
+        else:
+            old_item = next(iter(self.where(match, getattr(new_item, match), section_path)), None)
+        if old_item is not None:
+            if old_item == new_item:
+                return old_item
+            position = self.position(old_item)
+            items[position] = new_item
+            self.unindex(old_item)
+        else:
+            position = len(items)
+            items.append(new_item)
+        self.index(new_item, section_path)
+        self.position_of[id(new_item)] = position
+        self.changed = True
+        return new_item
+
+    def sort(self, key):
+        """Sort every section with key, returns whether any order changed."""
+        reordered = False
+        for _, items in find_sections(self.data):
+            ordered = sorted(items, key=key)
+            if any(a is not b for a, b in zip(ordered, items)):
+                items[:] = ordered
+                for position, item in enumerate(items):
+                    self.position_of[id(item)] = position
+                reordered = True
+        self.changed = self.changed or reordered
+        return reordered
@@ -0,0 +1,165 @@
+import csv
+import os
+import sys
+import time
+
+import numpy as np
+
+from updateShinyItemValues import multipliers
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+PLANTS_CSV = 'items/placedItems/final/plants.csv'
+HARVESTED_CSV = 'items/inventoryItems/final/harvested.csv'
+SHINY_RATES_CSV = 'items/placedItems/final/shinyItemRates.csv'
+
+REPORT_CSV = 'items/shinySimulation.csv'
+
+# Chance that a harvest is shiny at all (Plot.baseShinyChance); the tier probabilities only apply to shiny harvests
+DEFAULT_SHINY_CHANCES = [0.01, 0.05, 0.25]
+DEFAULT_HARVESTS = 1_000_000
+# Draws per batch across all plants, bounds the memory of a batch to a few tens of MB
+BATCH_DRAWS = 4_000_000
+
+
+def read_csv(data_dir, relative_path):
+    with open(os.path.join(data_dir, relative_path), mode='r', encoding='utf-8', newline='') as csv_file:
+        return [row for row in csv.DictReader(csv_file) if row.get("id")]
+
+
+class ShinyTable:
+    """The shiny tiers of every plant that has any, as padded (plants, tiers) arrays.
+
+    Tiers keep their order from shinyItemRates.csv, which is also the order of transformShinyIds in
+    Items.json and so the order Plot.checkShinyHarvest accumulates the probabilities in.
+    """
+
+    def __init__(self, plants, harvested, shiny_rates):
+        plants_by_id = {plant["id"]: plant for plant in plants}
+        values = {item["id"]: float(item["value"]) for item in harvested}
+
+        tiers_by_plant = {}
+        for rate in shiny_rates:
+            tiers_by_plant.setdefault(rate["plantId"], []).append(rate)
+        self.plant_ids = [plant_id for plant_id in tiers_by_plant if plant_id in plants_by_id]
+        self.names = [plants_by_id[plant_id]["name"] for plant_id in self.plant_ids]
+        self.tier_names = [[rate["tier"] for rate in tiers_by_plant[plant_id]] for plant_id in self.plant_ids]
+
+        plant_count = len(self.plant_ids)
+        tier_count = max((len(tiers) for tiers in self.tier_names), default=0)
+        self.probabilities = np.zeros((plant_count, tier_count))
+        # Column 0 is the regular harvest, then one column per tier
+        self.values = np.zeros((plant_count, tier_count + 1))
+        for plant, plant_id in enumerate(self.plant_ids):
+            regular_value = values.get(plants_by_id[plant_id]["transformId"], 0.0)
+            self.values[plant, 0] = regular_value
+            for tier, rate in enumerate(tiers_by_plant[plant_id]):
+                self.probabilities[plant, tier] = float(rate["probability"])
+                # A shiny item missing from harvested.csv is priced with its tier multiplier
+                multiplier = multipliers.get(rate["tier"].capitalize(), 1)
+                self.values[plant, tier + 1] = values.get(rate["id"], regular_value * multiplier)
+
+        self.probability_sums = self.probabilities.sum(axis=1)
+        # Padded tiers repeat the last cumulative value, so no draw ever lands on them
+        self.cumulative = np.cumsum(self.probabilities, axis=1)
+
+    @classmethod
+    def load(cls, data_dir=default_data_dir):
+        return cls(
+            read_csv(data_dir, PLANTS_CSV),
+            read_csv(data_dir, HARVESTED_CSV),
+            read_csv(data_dir, SHINY_RATES_CSV),
+        )
+
+    def overprobable(self, tolerance=1e-9):
+        """Plants whose tier probabilities add up to more than 1, the later tiers can never fully drop."""
+        return [self.names[plant] for plant in np.flatnonzero(self.probability_sums > 1 + tolerance)]
+
+    def outcome_probabilities(self, shiny_chance):
+        """Exact probability of each outcome per plant: regular, then every tier, as in Plot.checkShinyHarvest."""
+        effective = np.diff(np.minimum(self.cumulative, 1.0), axis=1, prepend=0.0)
+        outcomes = np.empty_like(self.values)
+        outcomes[:, 1:] = shiny_chance * effective
+        outcomes[:, 0] = 1.0 - outcomes[:, 1:].sum(axis=1)
+        return outcomes
+
+
+def simulate(table, shiny_chance, harvests=DEFAULT_HARVESTS, rng=None):
+    """Draw harvests for every plant at once and count how often each outcome came up.
+
+    Returns a (plants, tiers + 1) array of counts, column 0 being regular harvests. A shiny draw whose
+    tier roll lands past the last cumulative probability falls through to a regular harvest, like in
+    the game.
+    """
+    rng = rng or np.random.default_rng()
+    plant_count, tier_count = table.probabilities.shape
+    counts = np.zeros((plant_count, tier_count + 1), dtype=np.int64)
+    if plant_count == 0:
+        return counts
+
+    batch = max(1, BATCH_DRAWS // plant_count)
+    offsets = (np.arange(plant_count) * (tier_count + 1))[:, None]
+    remaining = harvests
+    while remaining > 0:
+        size = min(batch, remaining)
+        shiny = rng.random((plant_count, size)) < shiny_chance
+        tier_roll = rng.random((plant_count, size))
+        # Tier index is the number of cumulative probabilities below the roll; past the last one is regular
+        tier = (tier_roll[:, :, None] > table.cumulative[:, None, :]).sum(axis=2)
+        outcome = np.where(shiny & (tier < tier_count), tier + 1, 0)
+        counts += np.bincount((outcome + offsets).ravel(), minlength=counts.size).reshape(counts.shape)
+        remaining -= size
+    return counts
+
+
+def summarize(table, counts):
+    """Empirical outcome distribution, mean gold per harvest and its variance per plant."""
+    distribution = counts / counts.sum(axis=1, keepdims=True)
+    mean = (distribution * table.values).sum(axis=1)
+    variance = (distribution * table.values ** 2).sum(axis=1) - mean ** 2
+    return distribution, mean, np.maximum(variance, 0.0)
+
+
+def simulate_catalog(data_dir=default_data_dir, shiny_chances=DEFAULT_SHINY_CHANCES, harvests=DEFAULT_HARVESTS, seed=None):
+    """Sweep every plant under each shiny chance, print a summary and write the full report CSV."""
+    table = ShinyTable.load(data_dir)
+    rng = np.random.default_rng(seed)
+    report_path = os.path.normpath(os.path.join(data_dir, REPORT_CSV))
+    tier_count = table.probabilities.shape[1]
+
+    for name in table.overprobable():
+        print(f"Warning: shiny probabilities of {name} add up to more than 1.", file=sys.stderr)
+
+    start = time.perf_counter()
+    with open(report_path, mode='w', encoding='utf-8', newline='') as report_file:
+        writer = csv.writer(report_file, lineterminator='\n')
+        writer.writerow(
+            ["plantId", "name", "shinyChance", "harvests", "tiers", "probabilitySum", "regular"]
+            + [f"tier{tier + 1}" for tier in range(tier_count)]
+            + ["expectedGold", "simulatedGold", "variance", "stdDev"]
+        )
+        for shiny_chance in shiny_chances:
+            counts = simulate(table, shiny_chance, harvests, rng)
+            distribution, mean, variance = summarize(table, counts)
+            expected = (table.outcome_probabilities(shiny_chance) * table.values).sum(axis=1)
+            for plant, plant_id in enumerate(table.plant_ids):
+                writer.writerow(
+                    [plant_id, table.names[plant], shiny_chance, harvests, ' '.join(table.tier_names[plant]), f"{table.probability_sums[plant]:.6g}"]
+                    + [f"{fraction:.6f}" for fraction in distribution[plant]]
+                    + [f"{expected[plant]:.4f}", f"{mean[plant]:.4f}", f"{variance[plant]:.4f}", f"{np.sqrt(variance[plant]):.4f}"]
+                )
+            worst = np.max(np.abs(mean - expected) / np.maximum(expected, 1e-12)) if len(mean) else 0.0
+            print(f"Shiny chance {shiny_chance}: {len(table.plant_ids)} plants, "
+                  f"largest deviation from the expected gold {worst:.3%}.")
+
+    elapsed = time.perf_counter() - start
+    total = harvests * len(table.plant_ids) * len(shiny_chances)
+    print(f"Simulated {total:,} harvests in {elapsed:.2f}s, report written to {report_path}.")
+
+
+if __name__ == "__main__":
+    # Optional arguments: the shiny chances to sweep, e.g. 0.01 0.1
+    chances = [float(argument) for argument in sys.argv[1:]] or DEFAULT_SHINY_CHANCES
+    simulate_catalog(shiny_chances=chances)
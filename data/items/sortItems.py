@@ -1,26 +1,23 @@
-import json
+import os
 
-def sort_items_by_id(data):
-    # Sort each sub-array by 'id'
-    for category in data['PlacedItems']:
-        data['PlacedItems'][category] = sorted(data['PlacedItems'][category], key=lambda x: x['id'])
-    
-    for category in data['InventoryItems']:
-        data['InventoryItems'][category] = sorted(data['InventoryItems'][category], key=lambda x: x['id'])
+from itemCatalog import Catalog, script_dir
+from idCodec import natural_id_key
+
+
+def sort_items_by_id(catalog):
+    # Sort each section by 'id', numerically code by code
+    return catalog.sort(key=lambda item: natural_id_key(item.id))
 
-    return data
 
 def main():
-    # Load the JSON data from the file
-    with open('data/items/Items.json', 'r', encoding='utf-8') as file:
-        data = json.load(file)
+    catalog = Catalog.load()
 
     # Sort the items by id
-    sorted_data = sort_items_by_id(data)
+    sort_items_by_id(catalog)
+
+    # Save the sorted data to its own file, ensuring emojis are preserved
+    catalog.save(os.path.join(script_dir, 'Sorted_Items.json'), force=True)
 
-    # Save the sorted data back to the file, ensuring emojis are preserved
-    with open('data/items/Sorted_Items.json', 'w', encoding='utf-8') as file:
-        json.dump(sorted_data, file, indent=4, ensure_ascii=False)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,4 +1,4 @@
-import json
+from itemCatalog import HARVESTED_ITEMS, Catalog
 
 # Define the multipliers for shiny items
 multipliers = {
@@ -7,26 +7,63 @@ multipliers = {
     "Gold": 10
 }
 
-# Load the JSON data from the file
-with open('data/items/Items.json', 'r', encoding='utf-8') as file:
-    data = json.load(file)
-
-# Access the HarvestedItems list
-harvested_items = data['InventoryItems']['HarvestedItems']
-
-# Update the values of shiny items based on the multipliers
-for item in harvested_items:
-    # Check if the item is a shiny version
-    for shiny_name, multiplier in multipliers.items():
-        if shiny_name in item['name']:
-            # Find the base item (e.g., "garlic" for "Bronze garlic")
-            base_item_name = item['name'].replace(shiny_name, "").strip()  # Remove shiny prefix
-            base_item = next((i for i in harvested_items if i['name'] == base_item_name), None)
-            if base_item is not None:
-                item['value'] = base_item['value'] * multiplier
-
-# Save the updated items back to the JSON file
-with open('data/items/Items.json', 'w', encoding='utf-8') as file:
-    json.dump(data, file, ensure_ascii=False, indent=4)
-
-print("Updated shiny item values successfully.")
\ No newline at end of file
+
+def parse_shiny_name(name):
+    """Split "Bronze garlic" into ("Bronze", "garlic"), or return None for non-shiny names.
+
+    Only an exact tier word followed by a space counts, so "Golden apple" is not a Gold item.
+    """
+    tier, separator, base_name = name.partition(' ')
+    if not separator or tier not in multipliers:
+        return None
+    return tier, base_name.strip()
+
+
+def base_variant_id(item_id):
+    # Shiny variants share the type-subtype-category-item prefix with their base item, variant 00
+    return item_id[:item_id.rfind('-') + 1] + '00'
+
+
+def revalue_shiny_items(catalog):
+    """Recompute every shiny harvested item's value from its base item with index lookups.
+
+    The base item is the harvested item with the base name, or the harvested item with the same
+    id at variant 00 when no item has the base name. Returns (item, old_value) for every item
+    whose value changed.
+    """
+    changed = []
+    for item in list(catalog.section(*HARVESTED_ITEMS)):
+        shiny = parse_shiny_name(item.name)
+        if shiny is None:
+            continue
+        tier, base_item_name = shiny
+        base_item = (catalog.item_named(base_item_name, HARVESTED_ITEMS)
+                     or catalog.get(base_variant_id(item.id), HARVESTED_ITEMS))
+        if base_item is None or base_item is item:
+            continue
+        old_value = item.value
+        if catalog.update(item, value=base_item.value * multipliers[tier]):
+            changed.append((item, old_value))
+    return changed
+
+
+def main():
+    catalog = Catalog.load()
+
+    # Update the values of shiny items based on the multipliers
+    changed = revalue_shiny_items(catalog)
+    for item, old_value in changed:
+        print(f"{item.id} {item.name}: {old_value} -> {item.value}")
+
+    if not changed:
+        print("Shiny item values are already up to date.")
+        return
+
+    # Save the updated items back to the JSON file
+    catalog.save()
+
+    print(f"Updated {len(changed)} shiny item values successfully.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,33 +1,43 @@
 import csv
-import json
 import os  # Ensure this import is at the top of your file
+import sys
+
+from buildManifest import Section, build_json_incrementally
+from instrumentation import counted_rows
 
 # Get the directory of the current script
 script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+
+def convert_action_histories(data_dir=default_data_dir, force=False, profile=None):
+    # Construct absolute paths for the input and output files
+    history_file_path = os.path.join(data_dir, 'user/final/actionHistories.csv')
+    json_file_path = os.path.join(data_dir, 'final/temp/ActionHistories.json')
+
+    def build_histories():
+        with open(history_file_path, mode='r', encoding='utf-8') as csv_file:
+            csv_reader = csv.DictReader(csv_file)
 
-# Construct absolute paths for the input and output files
-history_file_path = os.path.join(script_dir, '../user/final/actionHistories.csv')
-json_file_path = os.path.join(script_dir, '../final/temp/ActionHistories.json')
+            # Process each row in the CSV
+            for row in counted_rows(history_file_path, csv_reader):
+                history = {
+                    "name": row["name"],
+                    "description": row["description"],
+                    "identifier": row["identifier"],
+                }
+                yield history
 
-# Initialize the data structure for JSON output
-data = {
-    "ActionHistories": []
-}
+    sections = [
+        Section(("ActionHistories",), [history_file_path], build_histories),
+    ]
 
-with open(history_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
+    if not build_json_incrementally(data_dir, json_file_path, sections, force=force, profile=profile):
+        print("ActionHistories.json is up to date, skipped action history CSV conversion.")
+        return
 
-    # Process each row in the CSV
-    for row in csv_reader:
-        history = {
-            "name": row["name"],
-            "description": row["description"],
-			"identifier": row["identifier"],
-        }
-        data["ActionHistories"].append(history)
+    print("Action History CSV has been converted to JSON format successfully.")
 
-# Write the JSON data to the output file
-with open(json_file_path, mode='w', encoding='utf-8') as json_file:
-    json.dump(data, json_file, ensure_ascii=False, indent=4)
 
-print("Action History CSV has been converted to JSON format successfully.")
\ No newline at end of file
+if __name__ == "__main__":
+    convert_action_histories(force="--force" in sys.argv, profile="compact" if "--compact" in sys.argv else None)
@@ -1,21 +1,12 @@
-def convert_all_csv_to_json():
-    import subprocess
-    import os  # Ensure this import is at the top of your file
+import sys
 
-    # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+from pipeline import converter_build_stages, run_pipeline
 
-    # Define the scripts with absolute paths
-    scripts = [
-        os.path.join(script_dir, "actionHistoryCSVToJson.py"),
-        # os.path.join(script_dir, "gardenCSVToJson.py"), #Removed, tools were merged into item csv
-        os.path.join(script_dir, "iconCSVToJson.py"),
-        os.path.join(script_dir, "itemCSVToJson.py"),
-        os.path.join(script_dir, "stocklistCSVToJson.py"),
-        os.path.join(script_dir, "storeCSVToJson.py")
-    ]
 
-    for script in scripts:
-        subprocess.run(["python", script])  # Call each script
+def convert_all_csv_to_json(profile=False):
+    # gardenCSVToJson is no longer a stage, tools were merged into item csv
+    return run_pipeline(converter_build_stages(), profile=profile)
 
-convert_all_csv_to_json()
\ No newline at end of file
+
+if __name__ == "__main__":
+    sys.exit(convert_all_csv_to_json(profile="--profile" in sys.argv))
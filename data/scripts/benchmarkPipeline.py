@@ -0,0 +1,209 @@
+import contextlib
+import functools
+import io
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import peak_rss_bytes
+from pipeline import full_build_stages, run_stage
+from syntheticCatalog import generate_catalog
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_results_path = os.path.join(script_dir, 'benchmarkResults.json')
+default_baseline_path = os.path.join(script_dir, 'benchmarkBaseline.json')
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+
+# Generated tables each stage reads, for its rows per second
+ITEM_TABLES = ["plants", "decorations", "ground", "shinyItemRates", "seeds", "harvested", "blueprints", "tools"]
+TEMP_TABLES = ITEM_TABLES + ["icons", "actionHistories"]
+STAGE_TABLES = {
+    "cleanCSVs": TEMP_TABLES,
+    "copyTempToFinal": TEMP_TABLES,
+    "validateCatalog": TEMP_TABLES + ["stocklist", "stores"],
+    "actionHistoryCSVToJson": ["actionHistories"],
+    "iconCSVToJson": ["icons"],
+    "itemCSVToJson": ITEM_TABLES,
+    "catalogBinary": ITEM_TABLES,
+    "catalogIndex": ITEM_TABLES,
+    "stocklistCSVToJson": ["stocklist"],
+    "storeCSVToJson": ["stores"],
+    "updateShinyItemValues": ["harvested"],
+}
+
+# A stage regressed when it is this much slower or bigger than the baseline...
+DEFAULT_TOLERANCE = 0.5
+# ...and the difference is above the noise of very short stages
+NOISE_SECONDS = 0.05
+NOISE_BYTES = 1 << 20
+# Time growing more than this many times faster than the row count between two sizes is flagged as superlinear
+SCALING_LIMIT = 2.0
+
+
+def revalue_generated_shiny_items(data_dir):
+    """updateShinyItemValues on the generated Items.json, indexing included."""
+    items_dir = os.path.join(script_dir, '..', 'items')
+    if items_dir not in sys.path:
+        sys.path.insert(0, items_dir)
+    from itemCatalog import Catalog
+    from updateShinyItemValues import revalue_shiny_items
+
+    revalue_shiny_items(Catalog.load(os.path.join(data_dir, 'final/temp/Items.json')))
+
+
+def run_benchmark_stage(stage, data_dir):
+    """Run one pipeline stage, raising when it failed so a broken stage is never timed as a result."""
+    report = run_stage(stage.name, stage.module, stage.function, data_dir)
+    if report["status"] != "succeeded":
+        raise RuntimeError(f"Stage {stage.name} failed:\n{report['traceback']}")
+    return report
+
+
+def timed_run(function):
+    """Run function with its output swallowed, returning (seconds, peak RSS in bytes).
+
+    The peak is this process's plus the largest of the worker processes function started and shut
+    down, e.g. the ParallelIngest pool of itemCSVToJson; None where resource is unavailable.
+    """
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function()
+    seconds = time.perf_counter() - start
+    peak = peak_rss_bytes()
+    return seconds, None if peak is None else peak + peak_rss_bytes(children=True)
+
+
+def measure(function):
+    """Run function once in a freshly spawned process, returning (seconds, peak RSS in bytes).
+
+    A process's peak RSS never goes down, so every stage gets a process of its own. Nothing is
+    traced, the times are the stage's own.
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(timed_run, function).result()
+
+
+def benchmark_size(rows, seed=0, keep=False):
+    """Generate a catalog of about `rows` item rows and time every stage of the full build on it."""
+    data_dir = tempfile.mkdtemp(prefix=f'benchmark-{rows}-')
+    try:
+        counts = generate_catalog(data_dir, rows, seed)
+        # Partials of module level functions, so the spawned processes can unpickle them
+        stages = [(stage.name, functools.partial(run_benchmark_stage, stage, data_dir)) for stage in full_build_stages()]
+        stages.append(("updateShinyItemValues", functools.partial(revalue_generated_shiny_items, data_dir)))
+
+        results = {}
+        for name, function in stages:
+            seconds, peak = measure(function)
+            stage_rows = sum(counts[table] for table in STAGE_TABLES.get(name, []))
+            results[name] = {
+                "seconds": round(seconds, 6),
+                "rows": stage_rows,
+                "rowsPerSecond": round(stage_rows / seconds, 1) if seconds > 0 else None,
+                "peakRssBytes": peak,
+            }
+            memory = "" if peak is None else f", peak RSS {peak / (1 << 20):.1f} MiB"
+            print(f"  {name}: {seconds:.3f}s, {stage_rows} rows{memory}")
+        return {"rows": sum(counts.values()), "tables": counts, "stages": results}
+    finally:
+        if keep:
+            print(f"  Generated catalog kept in {data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+def find_regressions(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    regressions = []
+    for size, result in results["sizes"].items():
+        baseline_stages = baseline.get("sizes", {}).get(size, {}).get("stages", {})
+        for name, stage in result["stages"].items():
+            previous = baseline_stages.get(name)
+            if previous is None:
+                continue
+            if stage["seconds"] > previous["seconds"] * (1 + tolerance) and stage["seconds"] - previous["seconds"] > NOISE_SECONDS:
+                regressions.append(f"{name} at {size} rows: {stage['seconds']:.3f}s, baseline {previous['seconds']:.3f}s")
+            # Baselines from before peak RSS was measured, or from a platform without it, only compare times
+            peak, previous_peak = stage.get("peakRssBytes"), previous.get("peakRssBytes")
+            if peak is None or previous_peak is None:
+                continue
+            if peak > previous_peak * (1 + tolerance) and peak - previous_peak > NOISE_BYTES:
+                regressions.append(f"{name} at {size} rows: peak RSS {peak} bytes, baseline {previous_peak} bytes")
+    return regressions
+
+
+def find_superlinear_stages(results):
+    """Stages whose time grows much faster than their rows between consecutive sizes, no baseline needed."""
+    flagged = []
+    sizes = sorted(results["sizes"], key=int)
+    for smaller, larger in zip(sizes, sizes[1:]):
+        for name, stage in results["sizes"][larger]["stages"].items():
+            previous = results["sizes"][smaller]["stages"].get(name)
+            if previous is None or not previous["rows"] or stage["seconds"] < NOISE_SECONDS:
+                continue
+            row_growth = stage["rows"] / previous["rows"]
+            time_growth = stage["seconds"] / max(previous["seconds"], NOISE_SECONDS)
+            if time_growth > row_growth * SCALING_LIMIT:
+                flagged.append(f"{name}: {row_growth:.0f}x rows took {time_growth:.0f}x time from {smaller} to {larger} rows")
+    return flagged
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, results_path=default_results_path, baseline_path=default_baseline_path,
+                   save_baseline=False, tolerance=DEFAULT_TOLERANCE, seed=0, keep=False):
+    """Benchmark every size, write the results and return 0, or 1 when a stage regressed."""
+    results = {
+        "createdAt": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "sizes": {},
+    }
+    for rows in sizes:
+        print(f"Benchmarking {rows} rows:")
+        results["sizes"][str(rows)] = benchmark_size(rows, seed, keep)
+
+    with open(results_path, mode='w', encoding='utf-8') as results_file:
+        json.dump(results, results_file, indent=4)
+    print(f"Results written to {results_path}.")
+
+    if save_baseline:
+        shutil.copyfile(results_path, baseline_path)
+        print(f"Saved as the baseline in {baseline_path}.")
+        return 0
+
+    problems = find_superlinear_stages(results)
+    if os.path.exists(baseline_path):
+        with open(baseline_path, mode='r', encoding='utf-8') as baseline_file:
+            problems += find_regressions(results, json.load(baseline_file), tolerance)
+    else:
+        print(f"No baseline at {baseline_path}, run with --save-baseline to store one.")
+
+    for problem in problems:
+        print(f"Regression: {problem}", file=sys.stderr)
+    if problems:
+        return 1
+    print("No regressions found.")
+    return 0
+
+
+def argument_value(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+if __name__ == "__main__":
+    sizes = [int(size) for size in argument_value("--sizes", ','.join(map(str, DEFAULT_SIZES))).split(',')]
+    sys.exit(run_benchmarks(
+        sizes=sizes,
+        save_baseline="--save-baseline" in sys.argv,
+        tolerance=float(argument_value("--tolerance", DEFAULT_TOLERANCE)),
+        keep="--keep" in sys.argv,
+    ))
@@ -0,0 +1,317 @@
+import hashlib
+import io
+import json
+import os
+
+from instrumentation import record_bytes_written, record_rows_written
+from jsonWriter import JsonStreamWriter, default_profile
+
+# Manifests are kept next to the JSON outputs, one file per output so parallel converters never share one
+MANIFEST_DIR = 'final/.buildCache'
+
+# Built sections kept in memory between builds by long-running callers such as watchCatalog.py, so
+# splicing does not have to copy from the previous output. Maps output path -> {section key: (hash, value)};
+# None disables it.
+section_cache = None
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, mode='rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def encode_compact(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class Section:
+    """One independently rebuildable part of a JSON output.
+
+    path is the chain of keys from the document root, for example ("InventoryItems", "Seeds").
+    build is called with no arguments and returns the value stored at that path: an iterable of
+    records for list sections, which are streamed one record at a time, or a dict.
+    """
+
+    def __init__(self, path, inputs, build):
+        self.path = tuple(path)
+        self.inputs = list(inputs)
+        self.build = build
+
+    @property
+    def key(self):
+        return '/'.join(self.path)
+
+
+class BuildManifest:
+    """Content hashes of the inputs, sections and file of the last build of one output."""
+
+    def __init__(self, data_dir, output_name):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, MANIFEST_DIR, output_name + '.manifest.json')
+        self.entry = {}
+        if os.path.exists(self.path):
+            with open(self.path, mode='r', encoding='utf-8') as file:
+                self.entry = json.load(file)
+
+    def relative(self, path):
+        return os.path.relpath(path, self.data_dir).replace(os.sep, '/')
+
+    def input_hash(self, path):
+        return self.entry.get("inputs", {}).get(self.relative(path))
+
+    def section_hash(self, section_key):
+        return self.entry.get("sections", {}).get(section_key)
+
+    def section_layout(self, section_key):
+        """[start, end, count] of the section's value in the output: its byte range and record count."""
+        return self.entry.get("layout", {}).get(section_key)
+
+    def output_matches(self, output_path, profile):
+        return (
+            "output" in self.entry
+            and self.entry.get("profile", "pretty") == profile
+            and os.path.exists(output_path)
+            and hash_file(output_path) == self.entry["output"]
+        )
+
+    def up_to_date(self, input_hashes, output_path, profile):
+        """True when every input still has the recorded hash and the output is untouched."""
+        return (
+            all(self.input_hash(path) == digest for path, digest in input_hashes.items())
+            and self.output_matches(output_path, profile)
+        )
+
+    def save(self, input_hashes, section_hashes, section_layout, output_path, profile):
+        self.entry = {
+            "profile": profile,
+            "inputs": {self.relative(path): digest for path, digest in input_hashes.items()},
+            "sections": section_hashes,
+            "layout": section_layout,
+            "output": hash_file(output_path),
+        }
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, mode='w', encoding='utf-8') as file:
+            json.dump(self.entry, file, indent=4)
+
+
+class EncodedSection:
+    """A section value already encoded for one profile, as text plus the hash and count write_section would give.
+
+    Lets the expensive encoding happen somewhere else, such as a worker process, while the output
+    is still written in section order.
+    """
+
+    def __init__(self, text, digest, count):
+        self.text = text
+        self.digest = digest
+        self.count = count
+
+
+class OutputRange:
+    """An unchanged section of the last output: the byte range of its encoded value, plus its hash and record count.
+
+    Splicing copies the bytes as they are, so the previous output is never parsed.
+    """
+
+    def __init__(self, file_path, start, end, digest, count):
+        self.file_path = file_path
+        self.start = start
+        self.end = end
+        self.digest = digest
+        self.count = count
+
+    def read_text(self):
+        with open(self.file_path, mode='rb') as source:
+            source.seek(self.start)
+            return source.read(self.end - self.start).decode('utf-8')
+
+    def copy_to(self, text_file):
+        text_file.flush()
+        with open(self.file_path, mode='rb') as source:
+            source.seek(self.start)
+            remaining = self.end - self.start
+            while remaining:
+                chunk = source.read(min(remaining, 1 << 20))
+                if not chunk:
+                    raise ValueError(f"{self.file_path} ended inside the section at bytes {self.start}-{self.end}")
+                text_file.buffer.write(chunk)
+                remaining -= len(chunk)
+
+
+def write_section(writer, value, digest):
+    """Write one section value and feed the text written for each of its records into digest.
+
+    Records are encoded once, by the writer, and hashed as it encoded them. Returns the number of
+    records written, the number of keys for a dict section.
+    """
+    if isinstance(value, dict):
+        digest.update(writer.value(value).encode('utf-8'))
+        return len(value)
+    count = 0
+    writer.begin_array()
+    for record in value:
+        # JSON text never holds a raw NUL, so it cleanly separates the records
+        digest.update(writer.value(record).encode('utf-8') + b'\0')
+        count += 1
+    writer.end_array()
+    return count
+
+
+def encode_section(value, path, profile=None):
+    """Encode the value of the section at path exactly as write_sections would write it."""
+    buffer = io.StringIO()
+    digest = hashlib.sha256()
+    count = write_section(JsonStreamWriter(buffer, profile, depth=len(path)), value, digest)
+    return EncodedSection(buffer.getvalue(), digest.hexdigest(), count)
+
+
+def cached_previous(json_file_path, sections, manifest):
+    """The previous section values from section_cache by section key, or None when any of them is stale."""
+    cached = (section_cache or {}).get(json_file_path)
+    if cached is None:
+        return None
+    previous = {}
+    for section in sections:
+        if section.key not in cached or cached[section.key][0] != manifest.section_hash(section.key):
+            return None
+        previous[section.key] = cached[section.key][1]
+    return previous
+
+
+def output_ranges(json_file_path, sections, manifest):
+    """The previous sections as OutputRanges of json_file_path by section key, or None when the manifest has no layout for one."""
+    previous = {}
+    for section in sections:
+        layout = manifest.section_layout(section.key)
+        digest = manifest.section_hash(section.key)
+        if layout is None or digest is None:
+            return None
+        start, end, count = layout
+        previous[section.key] = OutputRange(json_file_path, start, end, digest, count)
+    return previous
+
+
+def write_sections(json_file_path, sections, previous, changed_inputs, profile, cache=None):
+    """Stream every section to json_file_path, reusing the sections of previous whose inputs did not change.
+
+    previous maps section keys to their last values. A section value may be an EncodedSection or
+    an OutputRange, which are copied as is. Returns the section hashes, the byte range and record
+    count of every section and the keys of the sections that had to be rebuilt. When cache is a
+    dict, every written section value is also stored in it as (hash, value).
+    """
+    section_hashes = {}
+    section_layout = {}
+    rebuilt = []
+    with open(json_file_path, mode='w', encoding='utf-8') as json_file:
+        writer = JsonStreamWriter(json_file, profile)
+        open_path = ()
+        writer.begin_object()
+        for section in sections:
+            # Close and open the nested objects between the previous section and this one
+            common = 0
+            while common < len(open_path) and common < len(section.path) - 1 and open_path[common] == section.path[common]:
+                common += 1
+            for _ in open_path[common:]:
+                writer.end_object()
+            for key in section.path[common:-1]:
+                writer.key(key)
+                writer.begin_object()
+            open_path = section.path[:-1]
+
+            value = None
+            if previous is not None and not changed_inputs.intersection(section.inputs):
+                value = previous.get(section.key)
+            if value is None:
+                value = section.build()
+                rebuilt.append(section.key)
+            if cache is not None and isinstance(value, OutputRange):
+                # The range is only valid for the output it was cut from
+                value = EncodedSection(value.read_text(), value.digest, value.count)
+            elif cache is not None and not isinstance(value, (dict, list, EncodedSection)):
+                # Generators can only be walked once, keep the records for the next build
+                value = list(value)
+
+            writer.key(section.path[-1])
+            start = json_file.tell()
+            if isinstance(value, OutputRange):
+                writer.raw('')
+                value.copy_to(json_file)
+                count = value.count
+                section_hashes[section.key] = value.digest
+            elif isinstance(value, EncodedSection):
+                writer.raw(value.text)
+                count = value.count
+                section_hashes[section.key] = value.digest
+            else:
+                digest = hashlib.sha256()
+                count = write_section(writer, value, digest)
+                section_hashes[section.key] = digest.hexdigest()
+            section_layout[section.key] = [start, json_file.tell(), count]
+            record_rows_written(section.key, count)
+            if cache is not None:
+                cache[section.key] = (section_hashes[section.key], value)
+        for _ in open_path:
+            writer.end_object()
+        writer.end_object()
+    return section_hashes, section_layout, rebuilt
+
+
+def build_json_incrementally(data_dir, json_file_path, sections, force=False, profile=None, prefetch=None):
+    """Rebuild only the sections of json_file_path whose input CSVs changed since the last build.
+
+    Sections are listed in output order and streamed to disk as they are built, so a full build
+    never holds more than one record of a list section in memory. When the output on disk no
+    longer matches the manifest (deleted, edited by hand, first build, other profile) every section
+    is rebuilt. prefetch, when given, is called with the sections about to be rebuilt before any is
+    written, so the caller can start building them concurrently. Returns the keys of the rebuilt
+    sections, an empty list when already up to date.
+    """
+    profile = profile or default_profile
+    manifest = BuildManifest(data_dir, os.path.basename(json_file_path))
+
+    input_hashes = {}
+    for section in sections:
+        for input_path in section.inputs:
+            if input_path not in input_hashes:
+                input_hashes[input_path] = hash_file(input_path)
+    changed_inputs = {path for path, digest in input_hashes.items() if manifest.input_hash(path) != digest}
+
+    # Splicing copies the unchanged sections from the last output by the byte ranges in the manifest
+    previous = None
+    if not force and manifest.output_matches(json_file_path, profile):
+        if not changed_inputs:
+            return []
+        previous = cached_previous(json_file_path, sections, manifest)
+        if previous is None:
+            previous = output_ranges(json_file_path, sections, manifest)
+
+    if prefetch is not None:
+        prefetch([section for section in sections if previous is None or changed_inputs.intersection(section.inputs)])
+
+    # Write next to the output and swap it in, so a failed build never leaves a truncated file
+    temp_file_path = json_file_path + '.tmp'
+    cache = {} if section_cache is not None else None
+    try:
+        section_hashes, section_layout, rebuilt = write_sections(temp_file_path, sections, previous, changed_inputs, profile, cache)
+    except BaseException:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
+
+    # A rebuilt section can come out identical, e.g. after a whitespace-only edit to its CSV
+    unchanged = previous is not None and all(
+        manifest.section_hash(key) == digest for key, digest in section_hashes.items()
+    )
+    if unchanged:
+        os.remove(temp_file_path)
+    else:
+        os.replace(temp_file_path, json_file_path)
+        record_bytes_written(json_file_path, os.path.getsize(json_file_path))
+
+    manifest.save(input_hashes, section_hashes, section_layout, json_file_path, profile)
+    if cache is not None:
+        section_cache[json_file_path] = cache
+    return rebuilt
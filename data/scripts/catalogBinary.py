@@ -0,0 +1,257 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+from buildManifest import BuildManifest, hash_file
+from instrumentation import record_bytes_written, record_rows_written
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# File layout, all little endian:
+#   magic (4 bytes) | version (u32) | layout length (u32) | layout (compact JSON)
+#   string offsets (u32 * (string count + 1)) | string bytes (UTF-8)
+#   one block of fixed-width records per section
+# The layout lists every section with its key path, field codes, record count and offset.
+MAGIC = b'VGCB'
+VERSION = 1
+PREAMBLE = struct.Struct('<4sII')
+STRING_BOUNDS = struct.Struct('<II')
+
+# Field codes are struct format characters, except S (string table index) and J (compact JSON in the string table)
+STRING = 'S'
+JSON = 'J'
+STORAGE = {
+    STRING: 'I',
+    JSON: 'I',
+    'i': 'i',
+    'q': 'q',
+    'd': 'd',
+    '?': '?',
+}
+INT32_MIN, INT32_MAX = -(1 << 31), (1 << 31) - 1
+
+
+def field_code(values):
+    """Pick the narrowest fixed-width encoding that round-trips every value of one field."""
+    if all(isinstance(value, str) for value in values):
+        return STRING
+    if all(isinstance(value, bool) for value in values):
+        return '?'
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        if all(INT32_MIN <= value <= INT32_MAX for value in values):
+            return 'i'
+        if all(-(1 << 63) <= value < (1 << 63) for value in values):
+            return 'q'
+        return JSON
+    if all(isinstance(value, float) for value in values):
+        return 'd'
+    return JSON
+
+
+def find_sections(data, path=()):
+    """Yield (path, records) for every list of records in a catalog document, in document order."""
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from find_sections(value, path + (key,))
+        elif isinstance(value, list):
+            yield path + (key,), value
+        else:
+            raise ValueError(f"Unsupported catalog value at {'/'.join(path + (key,))}")
+
+
+class StringTable:
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def add(self, string):
+        position = self.index.get(string)
+        if position is None:
+            position = self.index[string] = len(self.strings)
+            self.strings.append(string)
+        return position
+
+
+def write_catalog(data, bin_file_path):
+    """Write a catalog document ({group: {section: [records]}}) as a binary catalog."""
+    strings = StringTable()
+    sections = []
+    for path, records in find_sections(data):
+        keys = list(records[0].keys()) if records else []
+        if any(list(record.keys()) != keys for record in records):
+            # Records of one section are expected to share their keys; otherwise keep each record as JSON
+            fields = [[None, JSON]]
+        else:
+            fields = [[key, field_code([record[key] for record in records])] for key in keys]
+        record_struct = struct.Struct('<' + ''.join(STORAGE[code] for _, code in fields))
+
+        block = bytearray(record_struct.size * len(records))
+        for position, record in enumerate(records):
+            values = []
+            for key, code in fields:
+                value = record if key is None else record[key]
+                if code == STRING:
+                    value = strings.add(value)
+                elif code == JSON:
+                    value = strings.add(json.dumps(value, ensure_ascii=False, separators=(',', ':')))
+                values.append(value)
+            record_struct.pack_into(block, position * record_struct.size, *values)
+        sections.append({"path": list(path), "fields": fields, "count": len(records), "block": block})
+
+    encoded_strings = [string.encode('utf-8') for string in strings.strings]
+    string_offsets = [0]
+    for encoded in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded))
+    string_block = struct.pack(f'<{len(string_offsets)}I', *string_offsets) + b''.join(encoded_strings)
+
+    # Offsets of the record blocks depend on the layout length, which depends on the offsets
+    layout = {"strings": len(encoded_strings), "sections": []}
+    offset = 0
+    while True:
+        layout["sections"] = []
+        position = offset
+        for section in sections:
+            layout["sections"].append({
+                "path": section["path"],
+                "fields": section["fields"],
+                "count": section["count"],
+                "offset": position,
+            })
+            position += len(section["block"])
+        encoded_layout = json.dumps(layout, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        data_start = PREAMBLE.size + len(encoded_layout) + len(string_block)
+        if data_start == offset:
+            break
+        offset = data_start
+
+    temp_file_path = bin_file_path + '.tmp'
+    with open(temp_file_path, mode='wb') as bin_file:
+        bin_file.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded_layout)))
+        bin_file.write(encoded_layout)
+        bin_file.write(string_block)
+        for section in sections:
+            bin_file.write(section["block"])
+    os.replace(temp_file_path, bin_file_path)
+
+
+class SectionView:
+    """Lazy sequence over the records of one section, each decoded only when accessed."""
+
+    def __init__(self, reader, layout):
+        self.reader = reader
+        self.path = tuple(layout["path"])
+        self.fields = layout["fields"]
+        self.count = layout["count"]
+        self.offset = layout["offset"]
+        self.struct = struct.Struct('<' + ''.join(STORAGE[code] for _, code in self.fields))
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError(f"{'/'.join(self.path)} has no record {position}")
+        values = self.struct.unpack_from(self.reader.buffer, self.offset + position * self.struct.size)
+        record = {}
+        for (key, code), value in zip(self.fields, values):
+            if code == STRING:
+                value = self.reader.string(value)
+            elif code == JSON:
+                value = json.loads(self.reader.string(value))
+            if key is None:
+                return value
+            record[key] = value
+        return record
+
+    def __iter__(self):
+        for position in range(self.count):
+            yield self[position]
+
+
+class CatalogReader:
+    """Memory-maps a binary catalog; only the layout is parsed up front."""
+
+    def __init__(self, bin_file_path):
+        self.file = open(bin_file_path, mode='rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, layout_length = PREAMBLE.unpack_from(self.buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{bin_file_path} is not a version {VERSION} binary catalog")
+        layout_end = PREAMBLE.size + layout_length
+        layout = json.loads(bytes(self.buffer[PREAMBLE.size:layout_end]).decode('utf-8'))
+        self.string_count = layout["strings"]
+        self.string_offsets = layout_end
+        self.string_data = layout_end + 4 * (self.string_count + 1)
+        self.sections = {tuple(section["path"]): SectionView(self, section) for section in layout["sections"]}
+
+    def string(self, position):
+        start, end = STRING_BOUNDS.unpack_from(self.buffer, self.string_offsets + 4 * position)
+        return self.buffer[self.string_data + start:self.string_data + end].decode('utf-8')
+
+    def section(self, *path):
+        return self.sections[tuple(path)]
+
+    def to_json(self):
+        """Decode every section back into the nested document the catalog was written from."""
+        data = {}
+        for path, section in self.sections.items():
+            node = data
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = list(section)
+        return data
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def verify_catalog(json_file_path, bin_file_path):
+    """Check that the binary catalog decodes to exactly the records of its JSON source."""
+    with open(json_file_path, mode='r', encoding='utf-8') as json_file:
+        expected = json.load(json_file)
+    with CatalogReader(bin_file_path) as reader:
+        return reader.to_json() == expected
+
+
+def convert_items_to_binary(data_dir=default_data_dir, force=False):
+    json_file_path = os.path.join(data_dir, 'final/temp/Items.json')
+    bin_file_path = os.path.join(data_dir, 'final/temp/Items.bin')
+
+    # Only rebuilt when Items.json changed since the last binary build
+    manifest = BuildManifest(data_dir, os.path.basename(bin_file_path))
+    input_hashes = {json_file_path: hash_file(json_file_path)}
+    if not force and manifest.up_to_date(input_hashes, bin_file_path, "binary"):
+        print("Items.bin is up to date, skipped binary catalog conversion.")
+        return
+
+    with open(json_file_path, mode='r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    write_catalog(data, bin_file_path)
+    manifest.save(input_hashes, {}, {}, bin_file_path, "binary")
+    for path, records in find_sections(data):
+        record_rows_written('/'.join(path), len(records))
+    record_bytes_written(bin_file_path, os.path.getsize(bin_file_path))
+
+    print(f"Items.json has been converted to a binary catalog successfully ({os.path.getsize(bin_file_path)} bytes).")
+
+
+if __name__ == "__main__":
+    convert_items_to_binary(force="--force" in sys.argv)
+    if "--verify" in sys.argv:
+        if not verify_catalog(os.path.join(default_data_dir, 'final/temp/Items.json'), os.path.join(default_data_dir, 'final/temp/Items.bin')):
+            print("Items.bin does not match Items.json.")
+            sys.exit(1)
+        print("Items.bin matches Items.json.")
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+from buildManifest import encode_compact, hash_file
+from catalogBinary import find_sections
+from jsonWriter import PROFILES
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# The catalog files clients download, compared record by record
+CATALOG_FILES = ('Items.json', 'Stocklists.json', 'Stores.json')
+
+# Patch layout (compact JSON), one entry per file that differs between the two builds:
+#   from, to  - sha256 of the old and new file, the applier refuses any other base and checks its result
+#   profile   - jsonWriter profile the new file is written with
+#   layout    - section paths in document order, only when sections were added, removed or moved
+#   sections  - section key ("PlacedItems/Plants") -> changes to its records:
+#       added    - new records, in the order they appear in the new build
+#       removed  - ids of records that are gone
+#       changed  - {"id", "set": {field: value}, "unset": [fields]}, or {"id", "record"} when the
+#                  fields also changed order
+#       order    - every id of the section, only when the order is not old order minus removed plus added
+#       records  - the whole section, for sections that repeat an id and so cannot be keyed
+#   document  - the whole new file, when the old build did not have it
+#   deleted   - true when the new build no longer has the file
+PATCH_FORMAT = 1
+
+
+def section_key(path):
+    return '/'.join(path)
+
+
+# One encoder for every comparison, json.dumps would build a new one per record
+compact_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def same_value(old_value, new_value):
+    """Whether two values encode the same. Dict comparison ignores key order, so nested values are encoded."""
+    if old_value != new_value:
+        return False
+    if isinstance(new_value, (dict, list)):
+        return compact_encoder.encode(old_value) == compact_encoder.encode(new_value)
+    return True
+
+
+def same_record(old_record, new_record):
+    """Whether two records encode the same, key order included.
+
+    Only records with nested values (transformShinyIds, stocklist items) are encoded; flat records
+    are compared as dicts plus their key order.
+    """
+    if old_record != new_record or list(old_record) != list(new_record):
+        return False
+    return all(same_value(old_record[key], value) for key, value in new_record.items() if isinstance(value, (dict, list)))
+
+
+def detect_profile(text):
+    return "pretty" if '\n' in text else "compact"
+
+
+def encode_document(document, profile):
+    return json.dumps(document, ensure_ascii=False, indent=PROFILES[profile]["indent"], separators=PROFILES[profile]["separators"])
+
+
+def diff_record(old_record, new_record):
+    """The change turning old_record into new_record, field by field."""
+    changed = {"id": new_record["id"]}
+    set_fields = {key: value for key, value in new_record.items() if key not in old_record or not same_value(old_record[key], value)}
+    unset_fields = [key for key in old_record if key not in new_record]
+    if list(apply_record_change(old_record, set_fields, unset_fields)) != list(new_record):
+        changed["record"] = new_record
+        return changed
+    if set_fields:
+        changed["set"] = set_fields
+    if unset_fields:
+        changed["unset"] = unset_fields
+    return changed
+
+
+def apply_record_change(record, set_fields, unset_fields):
+    record = {key: value for key, value in record.items() if key not in unset_fields}
+    record.update(set_fields)
+    return record
+
+
+def diff_section(old_records, new_records):
+    """Changes to one section, keyed by id: one hash lookup per record and one pass over each side."""
+    old_by_id = {record["id"]: record for record in old_records}
+    new_by_id = {record["id"]: record for record in new_records}
+    if len(old_by_id) != len(old_records) or len(new_by_id) != len(new_records):
+        return {"records": new_records}
+
+    changes = {}
+    added = [record for record in new_records if record["id"] not in old_by_id]
+    removed = [record["id"] for record in old_records if record["id"] not in new_by_id]
+    changed = [
+        diff_record(old_by_id[record["id"]], record)
+        for record in new_records
+        if record["id"] in old_by_id and not same_record(old_by_id[record["id"]], record)
+    ]
+    if added:
+        changes["added"] = added
+    if removed:
+        changes["removed"] = removed
+    if changed:
+        changes["changed"] = changed
+
+    removed_ids = set(removed)
+    expected_order = [record["id"] for record in old_records if record["id"] not in removed_ids] + [record["id"] for record in added]
+    new_order = [record["id"] for record in new_records]
+    if expected_order != new_order:
+        changes["order"] = new_order
+    return changes
+
+
+def diff_documents(old_document, new_document):
+    """Layout and section changes turning old_document into new_document, empty when they are equal."""
+    old_sections = dict((section_key(path), records) for path, records in find_sections(old_document))
+    new_paths = [path for path, _ in find_sections(new_document)]
+    patch = {}
+    if [section_key(path) for path in new_paths] != list(old_sections):
+        patch["layout"] = [list(path) for path in new_paths]
+
+    sections = {}
+    for path, records in find_sections(new_document):
+        changes = diff_section(old_sections.get(section_key(path), []), records)
+        if changes:
+            sections[section_key(path)] = changes
+    if sections:
+        patch["sections"] = sections
+    return patch
+
+
+def diff_catalogs(old_dir, new_dir, filenames=CATALOG_FILES):
+    """Patch from the catalog in old_dir to the one in new_dir. Files with the same hash are not parsed."""
+    files = {}
+    for filename in filenames:
+        old_path = os.path.join(old_dir, filename)
+        new_path = os.path.join(new_dir, filename)
+        if not os.path.exists(new_path):
+            if os.path.exists(old_path):
+                files[filename] = {"from": hash_file(old_path), "deleted": True}
+            continue
+        new_hash = hash_file(new_path)
+        with open(new_path, mode='r', encoding='utf-8') as new_file:
+            new_text = new_file.read()
+        if not os.path.exists(old_path):
+            files[filename] = {"to": new_hash, "profile": detect_profile(new_text), "document": json.loads(new_text)}
+            continue
+        old_hash = hash_file(old_path)
+        if old_hash == new_hash:
+            continue
+        with open(old_path, mode='r', encoding='utf-8') as old_file:
+            old_document = json.load(old_file)
+        file_patch = {"from": old_hash, "to": new_hash, "profile": detect_profile(new_text)}
+        file_patch.update(diff_documents(old_document, json.loads(new_text)))
+        files[filename] = file_patch
+    return {"format": PATCH_FORMAT, "files": files}
+
+
+def apply_section(records, changes):
+    if "records" in changes:
+        return list(changes["records"])
+    removed_ids = set(changes.get("removed", ()))
+    changed = {change["id"]: change for change in changes.get("changed", ())}
+    result = []
+    for record in records:
+        if record["id"] in removed_ids:
+            continue
+        change = changed.get(record["id"])
+        if change is not None:
+            if "record" in change:
+                record = change["record"]
+            else:
+                record = apply_record_change(record, change.get("set", {}), change.get("unset", ()))
+        result.append(record)
+    result.extend(changes.get("added", ()))
+    if "order" in changes:
+        by_id = {record["id"]: record for record in result}
+        result = [by_id[record_id] for record_id in changes["order"]]
+    return result
+
+
+def apply_document(document, file_patch):
+    """The new document from the old one and its file entry of a patch."""
+    sections = {section_key(path): records for path, records in find_sections(document)}
+    layout = file_patch.get("layout") or [path for path, _ in find_sections(document)]
+    changes = file_patch.get("sections", {})
+    result = {}
+    for path in layout:
+        node = result
+        for key in path[:-1]:
+            node = node.setdefault(key, {})
+        records = sections.get(section_key(path), [])
+        node[path[-1]] = apply_section(records, changes[section_key(path)]) if section_key(path) in changes else records
+    return result
+
+
+def write_text(path, text):
+    temp_file_path = path + '.tmp'
+    with open(temp_file_path, mode='w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(temp_file_path, path)
+
+
+def apply_patch(old_dir, patch, new_dir):
+    """Write the new build of every patched file into new_dir, checking both the base and the result hashes.
+
+    Every file is checked and rebuilt in memory before anything is written, so a patch that does not
+    fit leaves new_dir untouched, also when new_dir is old_dir. When new_dir is another directory the
+    CATALOG_FILES the patch leaves alone are copied over from old_dir, so new_dir ends up with the
+    whole new build. The results are staged next to their targets and only then swapped in. Raises
+    ValueError when a file in old_dir is not the build the patch was made from, or a result does
+    not match the build the patch was made for.
+    """
+    if patch.get("format") != PATCH_FORMAT:
+        raise ValueError(f"Unsupported catalog patch format {patch.get('format')}")
+    for filename, file_patch in patch["files"].items():
+        old_path = os.path.join(old_dir, filename)
+        if "from" in file_patch and (not os.path.exists(old_path) or hash_file(old_path) != file_patch["from"]):
+            raise ValueError(f"{old_path} is not the build this patch applies to")
+
+    # filename -> new text, None for files the new build no longer has
+    results = {}
+    for filename, file_patch in patch["files"].items():
+        if file_patch.get("deleted"):
+            results[filename] = None
+            continue
+        if "document" in file_patch:
+            document = file_patch["document"]
+        else:
+            with open(os.path.join(old_dir, filename), mode='r', encoding='utf-8') as old_file:
+                document = apply_document(json.load(old_file), file_patch)
+        text = encode_document(document, file_patch["profile"])
+        if hashlib.sha256(text.encode('utf-8')).hexdigest() != file_patch["to"]:
+            raise ValueError(f"Patching {filename} did not reproduce the new build")
+        results[filename] = text
+
+    # Unpatched files are the same in both builds: copied from old_dir, or absent from both
+    copies = {}
+    if not (os.path.isdir(new_dir) and os.path.samefile(old_dir, new_dir)):
+        for filename in CATALOG_FILES:
+            if filename not in results:
+                old_path = os.path.join(old_dir, filename)
+                if os.path.exists(old_path):
+                    copies[filename] = old_path
+                else:
+                    results[filename] = None
+
+    os.makedirs(new_dir, exist_ok=True)
+    staged = []
+    try:
+        for filename, text in results.items():
+            if text is not None:
+                temp_file_path = os.path.join(new_dir, filename) + '.tmp'
+                with open(temp_file_path, mode='w', encoding='utf-8') as file:
+                    file.write(text)
+                staged.append(temp_file_path)
+        for filename, old_path in copies.items():
+            temp_file_path = os.path.join(new_dir, filename) + '.tmp'
+            shutil.copyfile(old_path, temp_file_path)
+            staged.append(temp_file_path)
+    except BaseException:
+        for temp_file_path in staged:
+            os.remove(temp_file_path)
+        raise
+    for filename in copies:
+        new_path = os.path.join(new_dir, filename)
+        os.replace(new_path + '.tmp', new_path)
+    for filename, text in results.items():
+        new_path = os.path.join(new_dir, filename)
+        if text is not None:
+            os.replace(new_path + '.tmp', new_path)
+        elif os.path.exists(new_path):
+            os.remove(new_path)
+
+
+def describe(patch):
+    """One line per changed section, for reviewing a build before it is published."""
+    lines = []
+    for filename, file_patch in patch["files"].items():
+        if file_patch.get("deleted"):
+            lines.append(f"{filename}: deleted")
+        elif "document" in file_patch:
+            lines.append(f"{filename}: new file")
+        elif "layout" in file_patch:
+            lines.append(f"{filename}: sections are now {', '.join(section_key(path) for path in file_patch['layout'])}")
+        for key, changes in file_patch.get("sections", {}).items():
+            if "records" in changes:
+                lines.append(f"{filename} {key}: replaced ({len(changes['records'])} records, ids repeat)")
+                continue
+            parts = [f"{len(changes.get(kind, ()))} {kind}" for kind in ("added", "removed", "changed")]
+            if "order" in changes:
+                parts.append("reordered")
+            lines.append(f"{filename} {key}: {', '.join(parts)}")
+            for change in changes.get("changed", ()):
+                fields = list(change["record"]) if "record" in change else list(change.get("set", {})) + list(change.get("unset", ()))
+                lines.append(f"    {change['id']}: {', '.join(fields)}")
+    return lines
+
+
+USAGE = """Usage:
+  python catalogDiff.py [OLD_DIR NEW_DIR] [--out PATCH]   diff two builds, final/current and final/temp by default
+  python catalogDiff.py --apply OLD_DIR PATCH NEW_DIR     rebuild NEW_DIR from OLD_DIR and PATCH"""
+
+
+def main(arguments):
+    """Run the command line, returning a process exit status."""
+    if arguments and arguments[0] == "--apply":
+        if len(arguments) != 4:
+            print(USAGE, file=sys.stderr)
+            return 2
+        old_dir, patch_path, new_dir = arguments[1:]
+        with open(patch_path, mode='r', encoding='utf-8') as patch_file:
+            patch = json.load(patch_file)
+        try:
+            apply_patch(old_dir, patch, new_dir)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 1
+        print(f"Applied {patch_path} to {old_dir}, wrote {new_dir}.")
+        return 0
+
+    out_path = None
+    if "--out" in arguments:
+        position = arguments.index("--out")
+        if position + 1 == len(arguments):
+            print(USAGE, file=sys.stderr)
+            return 2
+        out_path = arguments[position + 1]
+        arguments = arguments[:position] + arguments[position + 2:]
+    if len(arguments) not in (0, 2):
+        print(USAGE, file=sys.stderr)
+        return 2
+    old_dir, new_dir = arguments if arguments else (
+        os.path.join(default_data_dir, 'final/current'), os.path.join(default_data_dir, 'final/temp'))
+
+    patch = diff_catalogs(old_dir, new_dir)
+    if not patch["files"]:
+        print(f"{new_dir} has the same catalog as {old_dir}.")
+        return 0
+    for line in describe(patch):
+        print(line)
+    if out_path:
+        write_text(out_path, encode_compact(patch).decode('utf-8'))
+        new_size = sum(os.path.getsize(os.path.join(new_dir, filename)) for filename in patch["files"]
+                       if os.path.exists(os.path.join(new_dir, filename)))
+        print(f"Wrote {out_path} ({os.path.getsize(out_path)} bytes for {new_size} bytes of changed files).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,167 @@
+import bisect
+import json
+import os
+import sys
+
+from buildManifest import BuildManifest, hash_file
+from catalogBinary import CatalogReader, find_sections
+from idCodec import load_codec
+from instrumentation import record_bytes_written, record_rows_written
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# Index layout (compact JSON):
+#   sections   - key paths of the catalog sections, e.g. ["PlacedItems", "Plants"]
+#   ids        - every item id, sorted, so an id prefix is a contiguous range
+#   locations  - [section number, position in section] for the id at the same position in ids
+#   names      - name -> ids with that name, in catalog order; a plant and its harvest can share one
+#   categories - category name -> ids in that category, in id order
+
+# Recorded in the manifest in place of a JSON profile, so an index in an older layout is rebuilt
+INDEX_FORMAT = "index-v2"
+
+
+def build_index(data):
+    sections = []
+    entries = []
+    names = {}
+    categories = {}
+    for section_number, (path, records) in enumerate(find_sections(data)):
+        sections.append(list(path))
+        for position, record in enumerate(records):
+            entries.append((record["id"], section_number, position))
+            names.setdefault(record["name"], []).append(record["id"])
+            if "category" in record:
+                categories.setdefault(record["category"], []).append(record["id"])
+    entries.sort()
+
+    for ids in categories.values():
+        ids.sort()
+    return {
+        "sections": sections,
+        "ids": [item_id for item_id, _, _ in entries],
+        "locations": [[section_number, position] for _, section_number, position in entries],
+        "names": names,
+        "categories": categories,
+    }
+
+
+def convert_items_to_index(data_dir=default_data_dir, force=False):
+    json_file_path = os.path.join(data_dir, 'final/temp/Items.json')
+    index_file_path = os.path.join(data_dir, 'final/temp/Items.index.json')
+
+    # Only rebuilt when Items.json changed since the last index build
+    manifest = BuildManifest(data_dir, os.path.basename(index_file_path))
+    input_hashes = {json_file_path: hash_file(json_file_path)}
+    if not force and manifest.up_to_date(input_hashes, index_file_path, INDEX_FORMAT):
+        print("Items.index.json is up to date, skipped item index conversion.")
+        return
+
+    with open(json_file_path, mode='r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    index = build_index(data)
+
+    temp_file_path = index_file_path + '.tmp'
+    with open(temp_file_path, mode='w', encoding='utf-8') as index_file:
+        json.dump(index, index_file, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_file_path, index_file_path)
+    manifest.save(input_hashes, {}, {}, index_file_path, INDEX_FORMAT)
+    record_rows_written("ids", len(index["ids"]))
+    record_bytes_written(index_file_path, os.path.getsize(index_file_path))
+
+    print(f"Item index has been built successfully ({len(index['ids'])} ids).")
+
+
+def id_prefix(*codes):
+    """Prefix matching every id that starts with the given codes, e.g. ("0", "02", "10") -> "0-02-10-"."""
+    return ''.join(code + '-' for code in codes)
+
+
+class ItemIndex:
+    """Point and range lookups over Items.index.json, loaded on first use.
+
+    Records are decoded one at a time from Items.bin when it sits next to the index, so answering
+    a lookup never deserializes the whole catalog. Category names are resolved with the id codec of
+    data_dir, by default the data directory the index was built in (<data_dir>/final/<build>/).
+    """
+
+    def __init__(self, index_file_path=None, bin_file_path=None, data_dir=None):
+        self.index_file_path = index_file_path or os.path.join(default_data_dir, 'final/temp/Items.index.json')
+        if bin_file_path is None:
+            bin_file_path = os.path.join(os.path.dirname(self.index_file_path), 'Items.bin')
+        self.bin_file_path = bin_file_path
+        if data_dir is None:
+            # normpath rather than the file system, so a build directory reached through a symlink keeps its own data_dir
+            data_dir = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(self.index_file_path)), '..', '..'))
+        self.data_dir = data_dir
+        self._index = None
+        self._reader = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            with open(self.index_file_path, mode='r', encoding='utf-8') as index_file:
+                self._index = json.load(index_file)
+        return self._index
+
+    def locate(self, item_id):
+        """Return (section path, position) of an id, or None when the id is unknown."""
+        ids = self.index["ids"]
+        position = bisect.bisect_left(ids, item_id)
+        if position == len(ids) or ids[position] != item_id:
+            return None
+        section_number, section_position = self.index["locations"][position]
+        return tuple(self.index["sections"][section_number]), section_position
+
+    def ids_for_name(self, name):
+        """Every id with this name, in catalog order."""
+        return list(self.index["names"].get(name, []))
+
+    def id_for_name(self, name, section=None):
+        """The first id with this name, or the one in the section with that key path, e.g. ("InventoryItems", "HarvestedItems")."""
+        for item_id in self.index["names"].get(name, []):
+            if section is None or self.locate(item_id)[0] == tuple(section):
+                return item_id
+        return None
+
+    def ids_with_prefix(self, prefix):
+        """All ids starting with prefix, in id order, found by binary search over the sorted ids."""
+        ids = self.index["ids"]
+        start = bisect.bisect_left(ids, prefix)
+        end = bisect.bisect_left(ids, prefix + '\uffff')
+        return ids[start:end]
+
+    def ids_in_category(self, category):
+        """Ids by category name ("Tropical") as written in the CSVs."""
+        return list(self.index["categories"].get(category, []))
+
+    def plants_in_category(self, category):
+        """Plant ids by two digit category code ("10") or category name ("Tropical"), from the id scheme."""
+        if category.isdigit():
+            return self.ids_with_prefix(id_prefix("0", "02", category))
+        return self.ids_with_prefix(load_codec(self.data_dir).prefix("PlacedItem", "Plant", category) + '-')
+
+    def get(self, item_id):
+        """Decode a single record by id, or return None when the id is unknown."""
+        location = self.locate(item_id)
+        if location is None:
+            return None
+        if self._reader is None:
+            self._reader = CatalogReader(self.bin_file_path)
+        path, position = location
+        return self._reader.section(*path)[position]
+
+    def get_by_name(self, name, section=None):
+        item_id = self.id_for_name(name, section)
+        return None if item_id is None else self.get(item_id)
+
+    def close(self):
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+if __name__ == "__main__":
+    convert_items_to_index(force="--force" in sys.argv)
@@ -1,63 +1,59 @@
 import os
-import pandas as pd
-import json
-
-def clean_csvs():
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Define the directories with absolute paths
-    inventory_dir = os.path.join(script_dir, '../items/inventoryItems/temp')
-    placed_dir = os.path.join(script_dir, '../items/placedItems/temp')
-    tool_dir = os.path.join(script_dir, '../items/tools/temp')
-    user_dir = os.path.join(script_dir, '../user/temp')
-    
-    
+
+from csvDedupeSort import DEFAULT_MEMORY_BUDGET, dedupe_and_sort_csv
+from idCodec import natural_id_key
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# Temp directories cleaned before they are copied to final, relative to the data directory
+CLEANED_DIRECTORIES = [
+    'items/inventoryItems/temp',
+    'items/placedItems/temp',
+    'items/tools/temp',
+    'user/temp',
+]
+
+
+def dedupe_key_for(file_path):
+    # User CSVs are keyed by name, item CSVs by id
+    if "/user/" in file_path.replace(os.sep, '/'):
+        return "name"
+    return "id"
+
+
+def clean_csv(file_path, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Remove duplicates based on the key, keeping the first row, and sort by 'id' if that is the key.
+
+    Ids are sorted by natural_id_key, the order the create scripts insert new rows in, so a file
+    they wrote is only checked and not rewritten. Returns the number of removed rows, or None when
+    the file has no key column.
+    """
+    dedupe_key = dedupe_key_for(file_path)
+    is_id = dedupe_key == 'id'
+    removed = dedupe_and_sort_csv(file_path, dedupe_key, sort=is_id, memory_budget=memory_budget,
+                                  sort_key=natural_id_key if is_id else None)
+    if removed is None:
+        print(f"Skipping {file_path}: '{dedupe_key}' column not found.")
+    return removed
+
+
+def clean_csvs(data_dir=default_data_dir, memory_budget=DEFAULT_MEMORY_BUDGET):
     # List to keep track of removed rows
     removed_rows = []
 
     # Function to process CSV files
     def process_csv(file_path):
-        nonlocal removed_rows
-        # Read the CSV file
-        df = pd.read_csv(file_path)
-
-        dedupe_key = ''
-        if "/user/" in file_path:
-            dedupe_key = "name"
-        else:
-            dedupe_key = "id"
-
-        if dedupe_key not in df.columns:
-            print(f"Skipping {file_path}: '{dedupe_key}' column not found.")
-            return
-        
-        # Convert to JSON objects
-        json_objects = df.to_dict(orient='records')
-        
-        # Remove duplicates based on 'id'
-        original_count = len(json_objects)
-        df_unique = df.drop_duplicates(subset=dedupe_key)
-        new_count = len(df_unique)
-        
+        removed = clean_csv(file_path, memory_budget)
+
         # Identify removed rows
-        if original_count > new_count:
-            removed = original_count - new_count
+        if removed:
             removed_rows.append((file_path, removed))
-        
-        # Sort by 'id' if id exists
-        if dedupe_key == 'id':
-            df_sorted = df_unique.sort_values(by=dedupe_key)
-        
-            # Write the sorted DataFrame back to the original CSV
-            df_sorted.to_csv(file_path, index=False)
-        else:
-            df_unique.to_csv(file_path, index=False)
-
-        # Print the sorted JSON objects
-        # print(json.dumps(df_sorted.to_dict(orient='records'), indent=4))
-
-    # Process all CSV files in both directories
-    for directory in [inventory_dir, placed_dir, tool_dir, user_dir]:
+
+    # Process all CSV files in every temp directory
+    for relative_directory in CLEANED_DIRECTORIES:
+        directory = os.path.join(data_dir, relative_directory)
         for filename in os.listdir(directory):
             if filename.endswith('.csv'):
                 process_csv(os.path.join(directory, filename))
@@ -65,9 +61,10 @@ def clean_csvs():
     # Print removed rows summary
     for file_path, count in removed_rows:
         print(f"Removed {count} rows from {file_path}")
-    
-    print(f"Cleaning complete, removed {len(removed_rows)} rows in total.")
+
+    total_removed = sum(count for _, count in removed_rows)
+    print(f"Cleaning complete, removed {total_removed} rows in total.")
 
 
-# Call the function
-clean_csvs()
\ No newline at end of file
+if __name__ == "__main__":
+    clean_csvs()
@@ -1,49 +1,39 @@
-import shutil
 import os
+import sys
+
+from deltaSync import sync_directory
+from instrumentation import record_bytes_written
 
 # Get the directory of the current script
 script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
 
-# Define source and destination directories for inventory items with absolute paths
-source_dir_inventory = os.path.join(script_dir, '../items/inventoryItems/temp')
-destination_dir_inventory = os.path.join(script_dir, '../items/inventoryItems/final')
-
-# Ensure the destination directory exists for inventory items
-os.makedirs(destination_dir_inventory, exist_ok=True)
-
-# Copy the entire directory from source to destination for inventory items
-shutil.copytree(source_dir_inventory, destination_dir_inventory, dirs_exist_ok=True)
-
-# Define source and destination directories for placed items with absolute paths
-source_dir_placed = os.path.join(script_dir, '../items/placedItems/temp')
-destination_dir_placed = os.path.join(script_dir, '../items/placedItems/final')
-
-# Ensure the destination directory exists for placed items
-os.makedirs(destination_dir_placed, exist_ok=True)
-
-# Copy the entire directory from source to destination for placed items
-shutil.copytree(source_dir_placed, destination_dir_placed, dirs_exist_ok=True)
-
-# Define source and destination directories for placed items with absolute paths
-source_dir_placed = os.path.join(script_dir, '../items/tools/temp')
-destination_dir_placed = os.path.join(script_dir, '../items/tools/final')
+# Directories promoted from temp to final, relative to the data directory
+SYNCED_DIRECTORIES = [
+    'items/inventoryItems',
+    'items/placedItems',
+    'items/tools',
+    'user',
+]
 
-# Ensure the destination directory exists for placed items
-os.makedirs(destination_dir_placed, exist_ok=True)
 
-# Copy the entire directory from source to destination for placed items
-shutil.copytree(source_dir_placed, destination_dir_placed, dirs_exist_ok=True)
+def copy_temp_to_final(data_dir=default_data_dir, compare_hash=False, link=False):
+    for directory in SYNCED_DIRECTORIES:
+        # Define source and destination directories with absolute paths
+        source_dir = os.path.join(data_dir, directory, 'temp')
+        destination_dir = os.path.join(data_dir, directory, 'final')
 
-# Define source and destination directories for placed items with absolute paths
-source_dir_placed = os.path.join(script_dir, '../user/temp')
-destination_dir_placed = os.path.join(script_dir, '../user/final')
+        # Copy only the files that changed, each swapped in atomically, and drop files removed from temp
+        result = sync_directory(source_dir, destination_dir, compare_hash=compare_hash, link=link)
+        for relative_path in result.copied:
+            destination_path = os.path.join(destination_dir, relative_path)
+            record_bytes_written(destination_path, os.path.getsize(destination_path))
+        print(f"Synced {directory} temp to final: {result}.")
 
-# Ensure the destination directory exists for placed items
-os.makedirs(destination_dir_placed, exist_ok=True)
+    print("Contents copied from inventory, placed, tool items temp to final.")
 
-# Copy the entire directory from source to destination for placed items
-shutil.copytree(source_dir_placed, destination_dir_placed, dirs_exist_ok=True)
 
-print("Contents copied from inventory, placed, tool items temp to final.")
+if __name__ == "__main__":
+    copy_temp_to_final(compare_hash="--hash" in sys.argv, link="--link" in sys.argv)
 
-# Workflow: addPlantToCSV -> cleanItemCSV -> copyTempToFinal -> itemCSVToJson or allCSVToJson
\ No newline at end of file
+# Workflow: addPlantToCSV -> cleanItemCSV -> copyTempToFinal -> itemCSVToJson or allCSVToJson
@@ -1,6 +1,15 @@
-import csv
 import copy
 import os
+import sys
+
+# The id codec is shared with the build scripts one directory up
+script_dir = os.path.dirname(os.path.abspath(__file__))
+scripts_dir = os.path.join(script_dir, '..')
+if scripts_dir not in sys.path:
+    sys.path.insert(0, scripts_dir)
+
+from csvAppend import default_data_dir, findExistingIds, mergeRowsIntoCSVs
+from idCodec import load_codec
 
 plantData = {
     "name": "pineapple",
@@ -34,243 +43,6 @@ plantData = {
 }
 
 
-def categoryToId(category):
-    category_map = {
-        "Onion": "01",
-        "Leafy Green": "02",
-        "Nightshade": "03",
-        "Legume": "04",
-        "Grain": "05",
-        "Squash": "06",
-        "Herb": "07",
-        "Root Vegetable": "08",
-        "Tree Fruit": "09",
-        "Tropical": "10",
-        "Berry": "11",
-        "Citrus": "12",
-        "Vine Fruit": "13",
-        "Sea Vegetable": "14",
-        "Error": "99"
-    }
-    if category not in category_map:
-        raise ValueError(f"Category '{category}' not found")
-    return category_map[category]
-
-def itemToId(crop, category):
-    crop_map = {
-        "Onion": {
-            "Garlic": "01",
-            "Green Onion": "02",
-            "Leek": "03",
-            "Red Onion": "04",
-            "Shallot": "05",
-            "Onion": "06"
-        },
-        "Leafy Green": {
-            "Broccoli": "01",
-            "Cabbage": "02",
-            "Cauliflower": "03",
-            "Kale": "04"
-        },
-        "Nightshade": {
-            "Bell Pepper": "01",
-            "Eggplant": "02",
-            "Tomato": "03"
-        },
-        "Legume": {
-            "Beans": "01",
-            "Chickpeas": "02",
-            "Lentils": "03",
-            "Peas": "04"
-        },
-        "Grain": {
-            "Barley": "01",
-            "Corn": "02",
-            "Rice": "03",
-            "Wheat": "04"
-        },
-        "Squash": {
-            "Butternut Squash": "01",
-            "Cucumber": "02",
-            "Pumpkin": "03",
-            "Zucchini": "04"
-        },
-        "Herb": {
-            "Basil": "01",
-            "Mint": "02",
-            "Parsley": "03",
-            "Rosemary": "04",
-            "Thyme": "05"
-        },
-        "Root Vegetable": {
-            "Beet": "01",
-            "Carrot": "02",
-            "Parsnip": "03",
-            "Radish": "04",
-            "Sweet Potato": "05",
-            "Turnip": "06"
-        },
-        "Tree Fruit": {
-            "Apple": "01",
-            "Cherry": "02",
-            "Peach": "03",
-            "Pear": "04",
-            "Plum": "05"
-        },
-        "Tropical": {
-            "Banana": "01",
-            "Coconut": "02",
-            "Mango": "03",
-            "Papaya": "04",
-            "Pineapple": "05"
-        },
-        "Berry": {
-            "Blackberry": "01",
-            "Blueberry": "02",
-            "Cranberry": "03",
-            "Raspberry": "04",
-            "Strawberry": "05"
-        },
-        "Citrus": {
-            "Grapefruit": "01",
-            "Lemon": "02",
-            "Lime": "03",
-            "Orange": "04"
-        },
-        "Vine Fruit": {
-            "Grape": "01",
-            "Kiwi": "02",
-            "Melon": "03",
-            "Passionfruit": "04"
-        },
-        "Sea Vegetable": {
-            "Dulse": "01",
-            "Kelp": "02",
-            "Nori": "03",
-            "Wakame": "04"
-        }
-    }
-    
-    if category not in crop_map or crop not in crop_map[category]:
-        raise ValueError(f"Crop '{crop}' not found in category '{category}'")
-    return crop_map[category][crop]
-
-
-def generateId(type, subtype, category, item, variant):
-    id = ''
-    if (type == 'PlacedItem'):
-        id += '0-'
-    elif (type == 'InventoryItem'):
-        id += '1-'
-    else:
-        raise ValueError("Invalid type")
-
-    if (subtype == 'Ground'):
-        id += '00-'
-    elif (subtype == 'Seed'):
-        id += '01-'
-    elif (subtype == 'Plant'):
-        id += '02-'
-    elif (subtype == 'HarvestedItem'):
-        id += '03-'
-    elif (subtype == 'Decoration'):
-        id += '04-'
-    elif (subtype == 'Blueprint'):
-        id += '05-'
-    else:
-        raise ValueError("Invalid subtype")
-    
-    id += categoryToId(category) + '-'
-
-    id += itemToId(item, category) + '-'
-
-    id += variant
-
-    return id
-
-plantData["type"] = "PlacedItem"
-plantData["subtype"] = "Plant"
-plantData["id"] = generateId(plantData["type"], plantData["subtype"], plantData["category"], plantData["item"], plantData["idSuffix"])
-
-seedData = copy.deepcopy(plantData)
-seedData["name"] = plantData["name"] + " seed"
-seedData["type"] = "InventoryItem"
-seedData["subtype"] = "Seed"
-seedData["id"] = generateId(seedData["type"], seedData["subtype"], seedData["category"], seedData["item"], seedData["idSuffix"])
-seedData["value"] = plantData["seedValue"]
-
-harvestedData = copy.deepcopy(plantData)
-harvestedData["type"] = "InventoryItem"
-harvestedData["subtype"] = "HarvestedItem"
-harvestedData["id"] = generateId(harvestedData["type"], harvestedData["subtype"], harvestedData["category"], harvestedData["item"], harvestedData["idSuffix"])
-harvestedData["value"] = harvestedData["harvestedValue"]
-
-seedData["transformId"] = plantData["id"]
-plantData["transformId"] = harvestedData["id"]
-
-def addPlantToCSV(plantData):
-     # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the absolute path to the decorations.csv file
-    absolute_path = os.path.join(script_dir, '../../items/placedItems/temp/plants.csv')
-    with open(absolute_path, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([
-            plantData["id"],
-            plantData["name"],
-            plantData["icon"],
-            plantData["type"],
-            plantData["subtype"],
-            plantData["category"],
-            plantData["description"],
-            plantData["value"],
-            plantData["level"],
-            plantData["transformId"],
-            plantData["baseExp"],
-            plantData["growTime"],
-            plantData["repeatedGrowTime"],
-            plantData["numHarvests"]
-        ])
-
-def addSeedToCSV(seedData):
-     # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the absolute path to the decorations.csv file
-    absolute_path = os.path.join(script_dir, '../../items/inventoryItems/temp/seeds.csv')
-    with open(absolute_path, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([
-            seedData["id"],
-            seedData["name"],
-            seedData["icon"],
-            seedData["type"],
-            seedData["subtype"],
-            seedData["category"],
-            seedData["description"],
-            seedData["value"],
-            seedData["level"],
-            seedData["transformId"]
-        ])
-
-def addHarvestedToCSV(harvestedData):
-     # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the absolute path to the decorations.csv file
-    absolute_path = os.path.join(script_dir, '../../items/inventoryItems/temp/harvested.csv')
-    with open(absolute_path, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow([
-            harvestedData["id"],
-            harvestedData["name"],
-            harvestedData["icon"],
-            harvestedData["type"],
-            harvestedData["subtype"],
-            harvestedData["category"],
-            harvestedData["description"],
-            harvestedData["value"],
-            harvestedData["level"]
-        ])
-
 def getShinyValueMultiplier(tier):
     if (tier == 'bronze'):
         return 2
@@ -280,49 +52,133 @@ def getShinyValueMultiplier(tier):
         return 10
     return 1
 
-def addShinyItemRates(plantData):
-     # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    # Construct the absolute path to the decorations.csv file
-    absolute_path = os.path.join(script_dir, '../../items/placedItems/temp/shinyItemRates.csv')
-    with open(absolute_path, mode='a', newline='') as file:
-        writer = csv.writer(file)
-        
-        for tier, shiny_info in plantData["shinyIds"].items():
-            shiny_item_id = harvestedData["id"][:-2] + shiny_info["idSuffix"] # Construct the shiny item ID
-            shiny_item_name = f"{tier} {plantData['name']}"  # Construct the shiny item name
-            probability = shiny_info["probability"]  # Get the probability from shiny_info
-            plant_id = plantData["id"]  # Use the original harvestedData ID
-            
-            writer.writerow([
-                shiny_item_id,
-                shiny_item_name,
-                tier,
-                probability,
-                plant_id
-            ])
-
-# Call the function to add the plant data
-addPlantToCSV(plantData)
 
-# Call the function to add the seed data
-addSeedToCSV(seedData)
+def createPlantItems(plantData, data_dir=default_data_dir):
+    """Derive the plant, seed, harvested and shiny harvested items from one plant definition."""
+    codec = load_codec(data_dir)
+    plantData = copy.deepcopy(plantData)
+    plantData["type"] = "PlacedItem"
+    plantData["subtype"] = "Plant"
+    plantData["id"] = codec.encode(plantData["type"], plantData["subtype"], plantData["category"], plantData["item"], plantData["idSuffix"])
+
+    seedData = copy.deepcopy(plantData)
+    seedData["name"] = plantData["name"] + " seed"
+    seedData["type"] = "InventoryItem"
+    seedData["subtype"] = "Seed"
+    seedData["id"] = codec.encode(seedData["type"], seedData["subtype"], seedData["category"], seedData["item"], seedData["idSuffix"])
+    seedData["value"] = plantData["seedValue"]
+
+    harvestedData = copy.deepcopy(plantData)
+    harvestedData["type"] = "InventoryItem"
+    harvestedData["subtype"] = "HarvestedItem"
+    harvestedData["id"] = codec.encode(harvestedData["type"], harvestedData["subtype"], harvestedData["category"], harvestedData["item"], harvestedData["idSuffix"])
+    harvestedData["value"] = harvestedData["harvestedValue"]
+
+    seedData["transformId"] = plantData["id"]
+    plantData["transformId"] = harvestedData["id"]
+
+    # Create additional harvested items for shiny versions
+    shinyHarvestedData = []
+    for tier, shiny_info in plantData["shinyIds"].items():
+        shiny_harvestedData = copy.deepcopy(harvestedData)  # Create a copy of the original harvestedData
+        shiny_harvestedData["name"] = f"{tier} {plantData['name']}"  # Set the new name
+        shiny_harvestedData["id"] = harvestedData["id"][:-2] + shiny_info["idSuffix"]  # Update the ID
+        shiny_harvestedData["description"] = f"{tier} version of {plantData['name']}"  # Set the new description
+        shiny_harvestedData["value"] = harvestedData["value"] * getShinyValueMultiplier(tier)
+        shinyHarvestedData.append(shiny_harvestedData)
+
+    return plantData, seedData, harvestedData, shinyHarvestedData
+
+
+def plantRow(plantData):
+    return [
+        plantData["id"],
+        plantData["name"],
+        plantData["icon"],
+        plantData["type"],
+        plantData["subtype"],
+        plantData["category"],
+        plantData["description"],
+        plantData["value"],
+        plantData["level"],
+        plantData["transformId"],
+        plantData["baseExp"],
+        plantData["growTime"],
+        plantData["repeatedGrowTime"],
+        plantData["numHarvests"]
+    ]
+
+
+def seedRow(seedData):
+    return [
+        seedData["id"],
+        seedData["name"],
+        seedData["icon"],
+        seedData["type"],
+        seedData["subtype"],
+        seedData["category"],
+        seedData["description"],
+        seedData["value"],
+        seedData["level"],
+        seedData["transformId"]
+    ]
+
+
+def harvestedRow(harvestedData):
+    return [
+        harvestedData["id"],
+        harvestedData["name"],
+        harvestedData["icon"],
+        harvestedData["type"],
+        harvestedData["subtype"],
+        harvestedData["category"],
+        harvestedData["description"],
+        harvestedData["value"],
+        harvestedData["level"]
+    ]
+
+
+def shinyItemRateRows(plantData, harvestedData):
+    rows = []
+    for tier, shiny_info in plantData["shinyIds"].items():
+        shiny_item_id = harvestedData["id"][:-2] + shiny_info["idSuffix"] # Construct the shiny item ID
+        shiny_item_name = f"{tier} {plantData['name']}"  # Construct the shiny item name
+        probability = shiny_info["probability"]  # Get the probability from shiny_info
+        plant_id = plantData["id"]  # Use the original harvestedData ID
+
+        rows.append([
+            shiny_item_id,
+            shiny_item_name,
+            tier,
+            probability,
+            plant_id
+        ])
+    return rows
 
-# Call the function to add the original harvested data
-addHarvestedToCSV(harvestedData)
 
-# Create additional harvested items for shiny versions
-for tier, shiny_info in plantData["shinyIds"].items():
-    shiny_harvestedData = copy.deepcopy(harvestedData)  # Create a copy of the original harvestedData
-    shiny_harvestedData["name"] = f"{tier} {plantData['name']}"  # Set the new name
-    shiny_harvestedData["id"] = harvestedData["id"][:-2] + shiny_info["idSuffix"]  # Update the ID
-    shiny_harvestedData["description"] = f"{tier} version of {plantData['name']}"  # Set the new description
-    shiny_harvestedData["value"] = harvestedData["value"] * getShinyValueMultiplier(tier)
-    # Call the function to add the shiny harvested data
-    addHarvestedToCSV(shiny_harvestedData)
+def buildPlantRows(plantData, data_dir=default_data_dir):
+    """All CSV rows for one plant definition, keyed by target table, with ids from the codec of data_dir."""
+    plantData, seedData, harvestedData, shinyHarvestedData = createPlantItems(plantData, data_dir)
+    return {
+        "plants": [plantRow(plantData)],
+        "seeds": [seedRow(seedData)],
+        "harvested": [harvestedRow(harvestedData)] + [harvestedRow(shiny) for shiny in shinyHarvestedData],
+        "shinyItemRates": shinyItemRateRows(plantData, harvestedData),
+    }
 
-# Call the function to add shiny item rates
-addShinyItemRates(plantData)
 
+def addPlantToCSV(plantData, data_dir=default_data_dir):
+    rowsByTable = buildPlantRows(plantData, data_dir)
+    clashes = findExistingIds(rowsByTable, data_dir)
+    if clashes:
+        for table, item_id in clashes:
+            print(f"Refusing to add {plantData['name']}: id {item_id} already exists in {table}.")
+        return False
+    # One open per target CSV, including all shiny harvested rows
+    mergeRowsIntoCSVs(rowsByTable, data_dir)
+    return True
 
 
+if __name__ == "__main__":
+    # Call the function to add the plant, seed, harvested, shiny harvested and shiny rate rows
+    sys.exit(0 if addPlantToCSV(plantData) else 1)
@@ -0,0 +1,96 @@
+import json
+import os
+import sys
+
+from addDecorationToCSV import buildDecorationRows
+from addPlantToCSV import buildPlantRows
+from csvAppend import default_data_dir, findExistingIds, mergeRowsIntoCSVs
+
+# Spec file layout: {"plants": [plantData, ...], "decorations": [decorationData, ...]}, where each
+# entry has the same keys as the plantData / decorationData examples in the add scripts
+REQUIRED_KEYS = {
+    "plants": ["name", "icon", "category", "item", "idSuffix", "description", "seedValue", "value",
+               "harvestedValue", "level", "baseExp", "growTime", "repeatedGrowTime", "numHarvests", "shinyIds"],
+    "decorations": ["name", "icon", "category", "item", "idSuffix", "description", "value", "level"],
+}
+
+ROW_BUILDERS = {
+    "plants": buildPlantRows,
+    "decorations": buildDecorationRows,
+}
+
+
+def validateEntry(kind, entry):
+    """Problems with a single spec entry that would stop its rows from being built."""
+    missing = [key for key in REQUIRED_KEYS[kind] if key not in entry]
+    if missing:
+        return [f"missing {', '.join(missing)}"]
+    errors = []
+    if kind == "plants":
+        if not isinstance(entry["shinyIds"], dict):
+            return [f"shinyIds must map tier names to {{probability, idSuffix}}, got {type(entry['shinyIds']).__name__}"]
+        probabilities = []
+        for tier, shiny_info in entry["shinyIds"].items():
+            if not isinstance(shiny_info, dict) or "probability" not in shiny_info or "idSuffix" not in shiny_info:
+                errors.append(f"shiny tier '{tier}' needs probability and idSuffix")
+                continue
+            if isinstance(shiny_info["probability"], bool) or not isinstance(shiny_info["probability"], (int, float)):
+                errors.append(f"shiny tier '{tier}' probability must be a number, got {shiny_info['probability']!r}")
+                continue
+            probabilities.append(shiny_info["probability"])
+        if sum(probabilities) > 1:
+            errors.append(f"shiny probabilities add up to {sum(probabilities)}, more than 1")
+    return errors
+
+
+def buildBatchRows(spec, data_dir=default_data_dir):
+    """Validate every entry and build all rows with the id codec of data_dir, returning (rowsByTable, errors)."""
+    rowsByTable = {}
+    errors = []
+    for kind, build in ROW_BUILDERS.items():
+        for index, entry in enumerate(spec.get(kind, [])):
+            label = f"{kind}[{index}] ({entry.get('name', '?')})"
+            entry_errors = validateEntry(kind, entry)
+            rows = None
+            # Only entries validateEntry accepts are built, the builders assume its checks passed
+            if not entry_errors:
+                try:
+                    rows = build(entry, data_dir)
+                except ValueError as error:
+                    # Unknown category or item in the id maps
+                    entry_errors.append(str(error))
+                except KeyError as error:
+                    # An entry that failed to build must never go through without an error of its own
+                    entry_errors.append(f"missing key {error}")
+            if entry_errors or rows is None:
+                errors.extend(f"{label}: {message}" for message in entry_errors)
+                continue
+            for table, table_rows in rows.items():
+                rowsByTable.setdefault(table, []).extend(table_rows)
+    return rowsByTable, errors
+
+
+def batchAddItems(spec_file_path, data_dir=default_data_dir):
+    """Add every plant and decoration in a spec file, or nothing at all if any entry is invalid."""
+    with open(spec_file_path, mode='r', encoding='utf-8') as spec_file:
+        spec = json.load(spec_file)
+
+    rowsByTable, errors = buildBatchRows(spec, data_dir)
+    errors.extend(f"{table}: id {item_id} already exists" for table, item_id in findExistingIds(rowsByTable, data_dir))
+    if errors:
+        for error in errors:
+            print(error, file=sys.stderr)
+        print(f"Refusing to add items from {spec_file_path}, {len(errors)} problem(s) found.", file=sys.stderr)
+        return False
+
+    mergeRowsIntoCSVs(rowsByTable, data_dir)
+    counts = ', '.join(f"{len(rows)} {table}" for table, rows in rowsByTable.items())
+    print(f"Added {counts} rows from {spec_file_path}.")
+    return True
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print(f"Usage: python {os.path.basename(__file__)} <spec.json>", file=sys.stderr)
+        sys.exit(2)
+    sys.exit(0 if batchAddItems(sys.argv[1]) else 1)
@@ -0,0 +1,85 @@
+import csv
+import heapq
+import os
+import sys
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '../..')
+
+# The id codec is shared with the build scripts one directory up
+scripts_dir = os.path.join(script_dir, '..')
+if scripts_dir not in sys.path:
+    sys.path.insert(0, scripts_dir)
+
+from idCodec import natural_id_key
+
+# Temp CSVs new items are merged into, cleanCSVs and copyTempToFinal take it from there
+TEMP_CSV_PATHS = {
+    "plants": 'items/placedItems/temp/plants.csv',
+    "decorations": 'items/placedItems/temp/decorations.csv',
+    "shinyItemRates": 'items/placedItems/temp/shinyItemRates.csv',
+    "seeds": 'items/inventoryItems/temp/seeds.csv',
+    "harvested": 'items/inventoryItems/temp/harvested.csv',
+    "blueprints": 'items/inventoryItems/temp/blueprints.csv',
+}
+
+
+def existingIds(table, data_dir=default_data_dir):
+    absolute_path = os.path.join(data_dir, TEMP_CSV_PATHS[table])
+    with open(absolute_path, mode='r', encoding='utf-8', newline='') as file:
+        return {row["id"] for row in csv.DictReader(file)}
+
+
+def findExistingIds(rowsByTable, data_dir=default_data_dir):
+    """Ids in rowsByTable that are already in their target CSV or repeated within the batch."""
+    clashes = []
+    for table, rows in rowsByTable.items():
+        known = existingIds(table, data_dir)
+        for row in rows:
+            if row[0] in known:
+                clashes.append((table, row[0]))
+            known.add(row[0])
+    return clashes
+
+
+def mergeRowsIntoCSVs(rowsByTable, data_dir=default_data_dir):
+    """Insert every row at its place in id order, so a sorted temp CSV stays sorted.
+
+    The new rows are sorted on their own and merged into the existing rows in one streaming pass,
+    existing rows first on equal ids; cleanCSVs then finds the file in order and leaves it alone.
+    """
+    for table, rows in rowsByTable.items():
+        if not rows:
+            continue
+        absolute_path = os.path.join(data_dir, TEMP_CSV_PATHS[table])
+        temp_path = absolute_path + '.tmp'
+        in_order = True
+        with open(absolute_path, mode='r', encoding='utf-8', newline='') as file:
+            reader = csv.reader(file)
+            header = next(reader)
+            id_index = header.index("id")
+
+            def row_key(row):
+                return natural_id_key(row[id_index])
+
+            def existing_rows():
+                nonlocal in_order
+                previous = None
+                for row in reader:
+                    # Blank lines are skipped like every other reader of these files does
+                    if not row:
+                        continue
+                    key = row_key(row)
+                    if previous is not None and key < previous:
+                        in_order = False
+                    previous = key
+                    yield row
+
+            with open(temp_path, mode='w', newline='', encoding='utf-8') as temp_file:
+                writer = csv.writer(temp_file, lineterminator='\n')
+                writer.writerow(header)
+                writer.writerows(heapq.merge(existing_rows(), sorted(rows, key=row_key), key=row_key))
+        os.replace(temp_path, absolute_path)
+        if not in_order:
+            print(f"{TEMP_CSV_PATHS[table]} was not sorted by id, cleanCSVs will sort it.")
@@ -0,0 +1,128 @@
+import csv
+import contextlib
+import heapq
+import itertools
+import os
+import tempfile
+
+from instrumentation import counted_rows, record_bytes_written
+
+# Rows are spilled to runs on disk once the buffered rows pass this many bytes
+DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+# Rough per-field overhead of a Python string inside a list, used to estimate buffered memory
+FIELD_OVERHEAD = 56
+
+
+def estimate_row_size(row):
+    return sum(len(field) for field in row) + FIELD_OVERHEAD * len(row)
+
+
+def write_rows(file_path, header, rows):
+    with open(file_path, mode='w', encoding='utf-8', newline='') as csv_file:
+        writer = csv.writer(csv_file, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def read_run(file_path):
+    with open(file_path, mode='r', encoding='utf-8', newline='') as csv_file:
+        yield from csv.reader(csv_file)
+
+
+def spill_run(rows):
+    """Write rows to a temporary CSV and return its path, the caller removes it."""
+    run_fd, run_path = tempfile.mkstemp(suffix='.csv.run')
+    with open(run_fd, mode='w', encoding='utf-8', newline='') as run_file:
+        csv.writer(run_file, lineterminator='\n').writerows(rows)
+    return run_path
+
+
+@contextlib.contextmanager
+def external_sort(rows, key, memory_budget=DEFAULT_MEMORY_BUDGET):
+    """Sort rows of strings by key, spilling sorted runs to disk once memory_budget is exceeded.
+
+    With key None the rows keep their order and the runs are consecutive slices of them. All rows
+    are consumed on entering the with block; the yielded iterator over the sorted rows is only
+    valid inside it.
+    """
+    runs = []
+    try:
+        buffered = []
+        buffered_size = 0
+        for row in rows:
+            buffered.append(row)
+            buffered_size += estimate_row_size(row)
+            if buffered_size > memory_budget:
+                if key is not None:
+                    buffered.sort(key=key)
+                runs.append(spill_run(buffered))
+                buffered = []
+                buffered_size = 0
+        sources = [read_run(run_path) for run_path in runs]
+        if key is None:
+            yield itertools.chain(*sources, buffered)
+        else:
+            buffered.sort(key=key)
+            yield heapq.merge(*sources, buffered, key=key)
+    finally:
+        for run_path in runs:
+            os.remove(run_path)
+
+
+def dedupe_and_sort_csv(file_path, dedupe_key, sort=True, memory_budget=DEFAULT_MEMORY_BUDGET, sort_key=None):
+    """Drop rows repeating an earlier dedupe_key value and optionally sort the rest by that key.
+
+    Keeps the first occurrence of every key, like DataFrame.drop_duplicates. Sorting compares
+    sort_key(value), or the raw key strings like sort_values on a string column when sort_key is
+    None. Only the set of seen keys and at most memory_budget bytes of rows stay in memory, the
+    rest goes through external_sort. The file is only rewritten when something changed.
+    Returns the number of removed rows, or None when the file has no dedupe_key column.
+    """
+    with open(file_path, mode='r', encoding='utf-8', newline='') as csv_file:
+        reader = csv.reader(csv_file)
+        header = next(reader, None)
+        if header is None or dedupe_key not in header:
+            return None
+        key_index = header.index(dedupe_key)
+        if sort_key is None:
+            def row_key(row):
+                return row[key_index]
+        else:
+            def row_key(row):
+                return sort_key(row[key_index])
+
+        seen = set()
+        removed = 0
+        blank_lines = False
+        in_order = True
+
+        def unique_rows():
+            nonlocal removed, blank_lines, in_order
+            previous_key = None
+            for row in counted_rows(file_path, reader):
+                # read_csv skips blank lines, so the rewritten file drops them
+                if not row:
+                    blank_lines = True
+                    continue
+                key = row[key_index]
+                if key in seen:
+                    removed += 1
+                    continue
+                seen.add(key)
+                if sort and in_order:
+                    order_key = row_key(row)
+                    if previous_key is not None and order_key < previous_key:
+                        in_order = False
+                    previous_key = order_key
+                yield row
+
+        with external_sort(unique_rows(), row_key if sort else None, memory_budget) as rows:
+            if removed == 0 and not blank_lines and (in_order or not sort):
+                return 0
+            temp_file_path = file_path + '.tmp'
+            write_rows(temp_file_path, header, rows)
+
+    os.replace(temp_file_path, file_path)
+    record_bytes_written(file_path, os.path.getsize(file_path))
+    return removed
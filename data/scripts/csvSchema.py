@@ -0,0 +1,163 @@
+import csv
+
+from instrumentation import counted_rows
+
+CASTERS = {
+    "str": str,
+    "int": int,
+    "float": float,
+}
+
+
+class CsvSchemaError(ValueError):
+    """A CSV that does not match its schema, reported with the file and line it came from."""
+
+    def __init__(self, file_path, line, message):
+        super().__init__(f"{file_path}:{line}: {message}")
+        self.file_path = file_path
+        self.line = line
+        self.message = message
+
+    def __reduce__(self):
+        # Exceptions unpickle by calling the class with self.args, which only hold the joined text
+        return (type(self), (self.file_path, self.line, self.message))
+
+
+class Field:
+    """One output key read from one CSV column and cast to type ("str", "int" or "float")."""
+
+    def __init__(self, key, type="str", column=None):
+        if type not in CASTERS:
+            raise ValueError(f"Unknown field type '{type}' for '{key}'")
+        self.key = key
+        self.type = type
+        self.column = column or key
+
+
+class Join:
+    """An output key filled from a lookup table built by another schema, {} when there is no match."""
+
+    def __init__(self, key, column, table):
+        self.key = key
+        self.column = column
+        self.table = table
+
+
+class CsvSchema:
+    """Describes one CSV file and where its rows go in the JSON output.
+
+    Record schemas have a section path and produce one dict per row, optionally bucketed into
+    sub-lists by group_by, a format string applied to one column ("{}s" on type -> "Shovels").
+    Lookup schemas have index_by columns instead and produce a nested dict keyed by those
+    columns, which Join fields of other schemas read from.
+    """
+
+    def __init__(self, name, path, fields, section=None, group_by=None, groups=(), index_by=()):
+        self.name = name
+        self.path = path
+        self.fields = list(fields)
+        self.section = tuple(section) if section else None
+        self.group_by = group_by
+        self.groups = tuple(groups)
+        self.index_by = tuple(index_by)
+
+    @property
+    def joins(self):
+        return [field for field in self.fields if isinstance(field, Join)]
+
+    def columns(self):
+        columns = [field.column for field in self.fields]
+        if self.group_by:
+            columns.append(self.group_by[0])
+        columns.extend(self.index_by)
+        return columns
+
+
+def compile_row_converter(schema, header, file_path, tables):
+    """Generate a function turning one csv.reader row into the output dict.
+
+    Column positions, casts and join tables are resolved once here, so converting a row is a
+    single dict display with positional indexing instead of per-field DictReader lookups.
+    """
+    missing = [column for column in schema.columns() if column not in header]
+    if missing:
+        raise CsvSchemaError(file_path, 1, f"missing column(s) {', '.join(missing)}")
+
+    namespace = dict(CASTERS)
+    entries = []
+    for position, field in enumerate(schema.fields):
+        index = header.index(field.column)
+        if isinstance(field, Join):
+            namespace[f"join_{position}"] = tables[field.table]
+            entries.append(f"{field.key!r}: join_{position}.get(row[{index}], {{}})")
+        elif field.type == "str":
+            entries.append(f"{field.key!r}: row[{index}]")
+        else:
+            entries.append(f"{field.key!r}: {field.type}(row[{index}])")
+
+    source = "def convert(row):\n    return {" + ", ".join(entries) + "}\n"
+    exec(compile(source, f"<schema {schema.name}>", "exec"), namespace)
+    return namespace["convert"]
+
+
+def explain_row_error(schema, header, row, file_path, line):
+    """Find the first field of a row that fails its cast, to replace a bare ValueError from int()."""
+    if len(row) != len(header):
+        return CsvSchemaError(file_path, line, f"expected {len(header)} columns, got {len(row)}")
+    for field in schema.fields:
+        if isinstance(field, Join) or field.type == "str":
+            continue
+        value = row[header.index(field.column)]
+        try:
+            CASTERS[field.type](value)
+        except ValueError:
+            return CsvSchemaError(file_path, line, f"column '{field.column}' expected {field.type}, got {value!r}")
+    return None
+
+
+def read_rows(schema, file_path, tables=None):
+    """Yield the converted rows of file_path, with joins resolved against tables by name."""
+    tables = tables or {}
+    with open(file_path, mode='r', encoding='utf-8', newline='') as csv_file:
+        csv_reader = csv.reader(csv_file)
+        header = next(csv_reader, None)
+        if header is None:
+            raise CsvSchemaError(file_path, 1, "missing header row")
+        convert = compile_row_converter(schema, header, file_path, tables)
+        extra_indexes = [header.index(column) for column in (schema.group_by[:1] if schema.group_by else schema.index_by)]
+
+        for row in counted_rows(file_path, csv_reader):
+            # DictReader skips blank lines, keep doing the same
+            if not row:
+                continue
+            try:
+                record = convert(row)
+            except (ValueError, IndexError) as error:
+                raise (explain_row_error(schema, header, row, file_path, csv_reader.line_num) or error) from error
+            yield record, [row[index] for index in extra_indexes]
+
+
+def read_records(schema, file_path, tables=None):
+    """Yield the records of a record schema without group_by, streaming straight from the file."""
+    for record, _ in read_rows(schema, file_path, tables):
+        yield record
+
+
+def read_groups(schema, file_path, tables=None):
+    """Return the records of a group_by schema bucketed by their group name."""
+    column_format = schema.group_by[1]
+    groups = {group: [] for group in schema.groups}
+    for record, (group_value,) in read_rows(schema, file_path, tables):
+        groups.setdefault(column_format.format(group_value), []).append(record)
+    return groups
+
+
+def read_lookup(schema, file_path, tables=None):
+    """Return a lookup schema's rows as a nested dict keyed by its index_by columns."""
+    lookup = {}
+    for record, keys in read_rows(schema, file_path, tables):
+        node = lookup
+        for key in keys[:-1]:
+            node = node.setdefault(key, {})
+        node[keys[-1]] = record
+    return lookup
@@ -0,0 +1,85 @@
+import os
+import shutil
+
+from buildManifest import hash_file
+
+
+class SyncResult:
+    def __init__(self):
+        self.copied = []
+        self.deleted = []
+        self.unchanged = 0
+
+    def __str__(self):
+        return f"{len(self.copied)} copied, {len(self.deleted)} deleted, {self.unchanged} unchanged"
+
+
+def files_differ(source_path, destination_path, compare_hash=False):
+    """Cheap size and mtime check first; hashing only when asked to and the metadata agrees."""
+    if not os.path.exists(destination_path):
+        return True
+    source_stat = os.stat(source_path)
+    destination_stat = os.stat(destination_path)
+    if source_stat.st_size != destination_stat.st_size:
+        return True
+    if compare_hash:
+        return hash_file(source_path) != hash_file(destination_path)
+    # Copies keep the source mtime, so any difference means one side changed since the last sync
+    return source_stat.st_mtime_ns != destination_stat.st_mtime_ns
+
+
+def publish_file(source_path, destination_path, link=False):
+    """Replace destination_path with source_path in one rename, so readers never see a partial file.
+
+    With link=True the destination becomes a hardlink to the source instead of a copy. That is
+    only safe when the source is always replaced rather than edited in place.
+    """
+    directory, filename = os.path.split(destination_path)
+    temp_file_path = os.path.join(directory, f".{filename}.sync")
+    if os.path.exists(temp_file_path):
+        os.remove(temp_file_path)
+    try:
+        if link:
+            os.link(source_path, temp_file_path)
+        else:
+            shutil.copy2(source_path, temp_file_path)
+        os.replace(temp_file_path, destination_path)
+    except BaseException:
+        if os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+        raise
+
+
+def sync_directory(source_dir, destination_dir, compare_hash=False, link=False, delete=True):
+    """Make destination_dir mirror source_dir, copying only the files that changed.
+
+    Files that no longer exist in source_dir are removed from destination_dir unless delete is False.
+    """
+    result = SyncResult()
+    os.makedirs(destination_dir, exist_ok=True)
+
+    source_files = set()
+    for root, _, filenames in os.walk(source_dir):
+        relative_root = os.path.relpath(root, source_dir)
+        for filename in filenames:
+            relative_path = os.path.normpath(os.path.join(relative_root, filename))
+            source_files.add(relative_path)
+            source_path = os.path.join(source_dir, relative_path)
+            destination_path = os.path.join(destination_dir, relative_path)
+            if not files_differ(source_path, destination_path, compare_hash):
+                result.unchanged += 1
+                continue
+            os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+            publish_file(source_path, destination_path, link=link)
+            result.copied.append(relative_path)
+
+    if delete:
+        for root, _, filenames in os.walk(destination_dir):
+            relative_root = os.path.relpath(root, destination_dir)
+            for filename in filenames:
+                relative_path = os.path.normpath(os.path.join(relative_root, filename))
+                if relative_path not in source_files:
+                    os.remove(os.path.join(destination_dir, relative_path))
+                    result.deleted.append(relative_path)
+
+    return result
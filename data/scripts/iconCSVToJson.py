@@ -1,40 +1,54 @@
 import csv
-import json
 import os  # Ensure this import is at the top of your file
+import sys
+
+from buildManifest import Section, build_json_incrementally
+from instrumentation import counted_rows
 
 # Get the directory of the current script
 script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
 
-# Define the input and output file paths with absolute paths
-icon_file_path = os.path.join(script_dir, '../user/final/icons.csv')
-json_file_path = os.path.join(script_dir, '../final/temp/Icons.json')
-
-# Initialize the data structure for JSON output
-data = {
-	"Icons": {
-		"Error": [],
-        "Ground": [],
-		"Plants": [],
-		"Decorations": [],
-        "Tools": [],
-        "Utilities": [],
-        "Other": []
-	}
-}
-
-with open(icon_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-
-    # Process each row in the CSV
-    for row in csv_reader:
-        icon = {
-            "name": row["name"],
-            "icon": row["icon"]
+def convert_icons(data_dir=default_data_dir, force=False, profile=None):
+    # Define the input and output file paths with absolute paths
+    icon_file_path = os.path.join(data_dir, 'user/final/icons.csv')
+    json_file_path = os.path.join(data_dir, 'final/temp/Icons.json')
+
+    def build_icons():
+        # Initialize the data structure for JSON output
+        icons = {
+            "Error": [],
+            "Ground": [],
+            "Plants": [],
+            "Decorations": [],
+            "Tools": [],
+            "Utilities": [],
+            "Other": []
         }
-        data["Icons"][row["type"]].append(icon)
 
-# Write the JSON data to the output file
-with open(json_file_path, mode='w', encoding='utf-8') as json_file:
-    json.dump(data, json_file, ensure_ascii=False, indent=4)
+        with open(icon_file_path, mode='r', encoding='utf-8') as csv_file:
+            csv_reader = csv.DictReader(csv_file)
+
+            # Process each row in the CSV
+            for row in counted_rows(icon_file_path, csv_reader):
+                icon = {
+                    "name": row["name"],
+                    "icon": row["icon"]
+                }
+                icons[row["type"]].append(icon)
+        return icons
+
+    sections = [
+        Section(("Icons",), [icon_file_path], build_icons),
+    ]
+
+    if not build_json_incrementally(data_dir, json_file_path, sections, force=force, profile=profile):
+        print("Icons.json is up to date, skipped icon CSV conversion.")
+        return
+
+    print("Icon CSV has been converted to JSON format successfully.")
+
 
-print("Icon CSV has been converted to JSON format successfully.")
\ No newline at end of file
+if __name__ == "__main__":
+    convert_icons(force="--force" in sys.argv, profile="compact" if "--compact" in sys.argv else None)
@@ -0,0 +1,203 @@
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+
+from buildManifest import MANIFEST_DIR, hash_file
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# Ids are type-subtype-category-item-variant, e.g. 0-02-10-05-00 is the pineapple plant:
+#   type     1 digit, from IDCategories.json
+#   subtype  2 digits, from IDCategories.json
+#   category 2 digits, the ID of the category in the *Categories.json5 file of the subtype
+#   item     2 digits, the position of the item in its category list, starting at 01
+#   variant  2 digits, 00 for the base item, shiny tiers and other variants count up from there
+ID_CATEGORIES_FILE = 'items/IDCategories.json'
+CATEGORY_FILES = {
+    "GROUND": 'items/GroundCategories.json5',
+    "SEED": 'items/PlantCategories.json5',
+    "PLANT": 'items/PlantCategories.json5',
+    "HARVESTED_ITEM": 'items/PlantCategories.json5',
+    "DECORATION": 'items/DecorationCategories.json5',
+    "BLUEPRINT": 'items/DecorationCategories.json5',
+}
+CACHE_FILE = 'idCodec.json'
+
+# The names the CSVs use for the IDCategories.json type constants
+TYPE_NAMES = {"PLACED": "PlacedItem", "INVENTORY": "InventoryItem", "TOOL": "Tool"}
+
+# Keys in a category block that list its items
+ITEM_LIST_KEYS = {"Crops", "Decorations", "Items"}
+
+ERROR_CODE = "99"
+
+ItemId = namedtuple('ItemId', ['type', 'subtype', 'category', 'item', 'variant'])
+
+
+def subtype_name(constant):
+    """HARVESTED_ITEM -> HarvestedItem, the spelling used in the CSVs."""
+    return ''.join(part.capitalize() for part in constant.split('_'))
+
+
+def parse_category_file(file_path):
+    """Read a *Categories.json5 file into [(category, code, [items])].
+
+    These files are hand written and not strict json5 (unquoted keys with spaces, bare comma
+    separated lists), so they are read line by line: a `Name: {` line inside the root block opens
+    a category, `ID:` sets its code and any of ITEM_LIST_KEYS lists its items in id order.
+    """
+    categories = []
+    depth = 0
+    with open(file_path, mode='r', encoding='utf-8') as file:
+        for raw_line in file:
+            line = raw_line.split('//', 1)[0].strip().rstrip(',').strip()
+            if not line:
+                continue
+            if line.endswith('{'):
+                depth += 1
+                if depth == 2:
+                    categories.append([line[:-1].strip().rstrip(':').strip(), None, []])
+                continue
+            if line.startswith('}'):
+                depth -= 1
+                continue
+            if depth != 2 or ':' not in line:
+                continue
+            key, value = (part.strip() for part in line.split(':', 1))
+            if key == 'ID':
+                categories[-1][1] = value.strip('\'"')
+            elif key in ITEM_LIST_KEYS:
+                categories[-1][2] = [item.strip().strip('\'"') for item in value.strip('[]').split(',') if item.strip()]
+    for name, code, _ in categories:
+        if code is None or not re.fullmatch(r'\d\d', code):
+            raise ValueError(f"{file_path}: category '{name}' has no two digit ID")
+    return categories
+
+
+def compile_tables(data_dir):
+    """Build the prefix tables from the category files.
+
+    prefixes maps "0-02-10-05" / "0-02-10" / "0-02" to the names they stand for, names maps the
+    lowercased names back to the prefix, so encoding and decoding are single dict lookups.
+    """
+    with open(os.path.join(data_dir, ID_CATEGORIES_FILE), mode='r', encoding='utf-8') as file:
+        id_categories = json.load(file)
+
+    prefixes = {}
+    names = {}
+
+    def add(prefix, *parts):
+        prefixes[prefix] = list(parts)
+        names['/'.join(part.lower() for part in parts)] = prefix
+
+    category_files = {}
+    for type_constant, type_code in id_categories["type"].items():
+        type_name = TYPE_NAMES.get(type_constant, subtype_name(type_constant))
+        subtypes = id_categories["subtype_tool"] if type_constant == "TOOL" else id_categories["subtype_item"]
+        for subtype_constant, subtype_code in subtypes.items():
+            subtype = subtype_name(subtype_constant)
+            subtype_prefix = f"{type_code}-{subtype_code}"
+            add(subtype_prefix, type_name, subtype)
+            if type_constant == "TOOL" or subtype_constant not in CATEGORY_FILES:
+                continue
+            category_path = CATEGORY_FILES[subtype_constant]
+            if category_path not in category_files:
+                category_files[category_path] = parse_category_file(os.path.join(data_dir, category_path))
+            for category, category_code, items in category_files[category_path]:
+                category_prefix = f"{subtype_prefix}-{category_code}"
+                add(category_prefix, type_name, subtype, category)
+                for position, item in enumerate(items, start=1):
+                    add(f"{category_prefix}-{position:02d}", type_name, subtype, category, item)
+                if category_code == ERROR_CODE:
+                    add(f"{category_prefix}-{ERROR_CODE}", type_name, subtype, category, category)
+
+    return {"prefixes": prefixes, "names": names, "variants": id_categories["variant"]}
+
+
+def source_paths(data_dir):
+    return [os.path.join(data_dir, ID_CATEGORIES_FILE)] + [
+        os.path.join(data_dir, path) for path in sorted(set(CATEGORY_FILES.values()))
+    ]
+
+
+def load_tables(data_dir):
+    """Compiled tables from the cache under final/.buildCache, recompiled when a category file changed."""
+    cache_path = os.path.join(data_dir, MANIFEST_DIR, CACHE_FILE)
+    source_hashes = {os.path.basename(path): hash_file(path) for path in source_paths(data_dir)}
+    if os.path.exists(cache_path):
+        with open(cache_path, mode='r', encoding='utf-8') as cache_file:
+            cached = json.load(cache_file)
+        if cached.get("sources") == source_hashes:
+            return cached["tables"]
+
+    tables = compile_tables(data_dir)
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_file_path = cache_path + '.tmp'
+    with open(temp_file_path, mode='w', encoding='utf-8') as cache_file:
+        json.dump({"sources": source_hashes, "tables": tables}, cache_file, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_file_path, cache_path)
+    return tables
+
+
+def natural_id_key(item_id):
+    """Sort key comparing the codes of an id as numbers, so the order stays right past two digit codes.
+
+    Codes that are not numbers sort after the numeric ones, by their text.
+    """
+    return tuple((0, int(code)) if code.isdigit() else (1, code) for code in item_id.split('-'))
+
+
+class IdCodec:
+    """Encode names to ids and decode ids to names with the compiled category tables."""
+
+    def __init__(self, tables):
+        self.prefixes = {prefix: tuple(parts) for prefix, parts in tables["prefixes"].items()}
+        self.names = tables["names"]
+        self.variants = tables["variants"]
+
+    def prefix(self, type, subtype, category=None, item=None):
+        """The id prefix for the given names, e.g. ("PlacedItem", "Plant", "Tropical") -> "0-02-10"."""
+        parts = [part for part in (type, subtype, category, item) if part is not None]
+        prefix = self.names.get('/'.join(part.lower() for part in parts))
+        if prefix is None:
+            if item is not None and self.names.get('/'.join(part.lower() for part in parts[:-1])) is not None:
+                raise ValueError(f"Item '{item}' not found in category '{category}'")
+            if category is not None and self.names.get(f"{type.lower()}/{subtype.lower()}") is not None:
+                raise ValueError(f"Category '{category}' not found")
+            raise ValueError(f"Invalid type or subtype '{type}' / '{subtype}'")
+        return prefix
+
+    def encode(self, type, subtype, category, item, variant="00"):
+        """Variant is either the two digit code or a name from IDCategories.json ("NORMAL")."""
+        variant = self.variants.get(variant, variant)
+        if not re.fullmatch(r'\d\d', variant):
+            raise ValueError(f"Invalid variant '{variant}'")
+        return f"{self.prefix(type, subtype, category, item)}-{variant}"
+
+    def decode(self, item_id):
+        """Names for every part of an id. Parts the category files do not name are None."""
+        names = self.prefixes.get(item_id[:10]) or self.prefixes.get(item_id[:7]) or self.prefixes.get(item_id[:4])
+        if names is None or len(item_id) != 13:
+            raise ValueError(f"Unknown id '{item_id}'")
+        return ItemId(*names, *(None,) * (4 - len(names)), item_id[11:])
+
+
+codecs = {}
+
+
+def load_codec(data_dir=default_data_dir):
+    """The codec for a data directory, compiled at most once per process."""
+    key = os.path.realpath(data_dir)
+    if key not in codecs:
+        codecs[key] = IdCodec(load_tables(data_dir))
+    return codecs[key]
+
+
+if __name__ == "__main__":
+    codec = load_codec()
+    for item_id in sys.argv[1:]:
+        print(item_id, *codec.decode(item_id))
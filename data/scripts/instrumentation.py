@@ -0,0 +1,193 @@
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows, stage reports then have no peak RSS
+    resource = None
+
+# Machine-readable report of the last pipeline run, next to the build manifests (buildManifest.MANIFEST_DIR)
+REPORT_DIR = 'final/.buildCache'
+RUN_REPORT = 'runReport.json'
+PROFILE_DIR = 'profiles'
+
+# Report of the stage running in the current thread, None outside of a stage
+current = threading.local()
+
+# tracemalloc is process wide, it stays on while any stage in this process is running
+tracing_lock = threading.Lock()
+tracing = {"active": 0, "started": False}
+
+
+class StageReport:
+    """What one stage did: time, rows read per input file, rows written per section, bytes written, memory.
+
+    peak_rss_bytes is always recorded; peak_memory_bytes, the tracemalloc peak of Python allocations,
+    only when profiling, as tracing every allocation slows a stage down several times over.
+    """
+
+    def __init__(self, name, data_dir):
+        self.name = name
+        self.data_dir = data_dir
+        self.seconds = 0.0
+        self.rows_read = {}
+        self.rows_written = {}
+        self.bytes_written = {}
+        self.peak_memory_bytes = None
+        self.peak_rss_bytes = None
+        self.profile_path = None
+
+    def relative(self, path):
+        return os.path.relpath(path, self.data_dir).replace(os.sep, '/')
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "status": "succeeded",
+            "seconds": round(self.seconds, 6),
+            "rowsRead": self.rows_read,
+            "rowsWritten": self.rows_written,
+            "bytesWritten": self.bytes_written,
+            "peakMemoryBytes": self.peak_memory_bytes,
+            "peakRssBytes": self.peak_rss_bytes,
+            "profile": self.profile_path,
+        }
+
+
+def record_rows_read(path, count):
+    report = getattr(current, 'report', None)
+    if report is not None:
+        key = report.relative(path)
+        report.rows_read[key] = report.rows_read.get(key, 0) + count
+
+
+def record_rows_written(section, count):
+    report = getattr(current, 'report', None)
+    if report is not None:
+        report.rows_written[section] = report.rows_written.get(section, 0) + count
+
+
+def record_bytes_written(path, count):
+    report = getattr(current, 'report', None)
+    if report is not None:
+        key = report.relative(path)
+        report.bytes_written[key] = report.bytes_written.get(key, 0) + count
+
+
+def counted_rows(path, rows):
+    """Pass rows through unchanged, recording how many were read from path once iteration stops."""
+    count = 0
+    try:
+        for row in rows:
+            count += 1
+            yield row
+    finally:
+        record_rows_read(path, count)
+
+
+def peak_rss_bytes(children=False):
+    """High-water mark of this process's resident memory, None where resource is unavailable.
+
+    With children, the high-water mark of the largest finished child process instead, such as a
+    worker of a process pool that has been shut down.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def start_tracing():
+    with tracing_lock:
+        if tracing["active"] == 0:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                tracing["started"] = True
+            # Concurrent stages share one peak, it is only reset when no other stage is measuring it
+            tracemalloc.reset_peak()
+        tracing["active"] += 1
+
+
+def stop_tracing():
+    with tracing_lock:
+        _, peak = tracemalloc.get_traced_memory()
+        tracing["active"] -= 1
+        if tracing["active"] == 0 and tracing["started"]:
+            tracemalloc.stop()
+            tracing["started"] = False
+    return peak
+
+
+@contextlib.contextmanager
+def instrument_stage(name, data_dir, profile=False):
+    """Collect a StageReport for the code run inside the block.
+
+    With profile=True the block also runs under cProfile and tracemalloc. The peak RSS is the
+    high-water mark of the process, so it covers earlier stages run by the same worker process; the
+    tracemalloc peak is exact when stages run one at a time or in separate processes, and stages
+    running in parallel threads share the peak of the whole process.
+    """
+    report = StageReport(name, data_dir)
+    current.report = report
+    profiler = cProfile.Profile() if profile else None
+    if profile:
+        start_tracing()
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield report
+        finally:
+            if profiler is not None:
+                profiler.disable()
+    finally:
+        report.seconds = time.perf_counter() - start
+        if profile:
+            report.peak_memory_bytes = stop_tracing()
+        report.peak_rss_bytes = peak_rss_bytes()
+        current.report = None
+        if profiler is not None:
+            profile_dir = os.path.join(data_dir, REPORT_DIR, PROFILE_DIR)
+            os.makedirs(profile_dir, exist_ok=True)
+            profile_path = os.path.join(profile_dir, f"{name}.prof")
+            profiler.dump_stats(profile_path)
+            report.profile_path = report.relative(profile_path)
+
+
+def write_run_report(data_dir, stage_reports, seconds, skipped=()):
+    """Write the run report and return its path. stage_reports are StageReport.as_dict() results."""
+    report = {
+        "finishedAt": time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        "status": "failed" if any(stage["status"] != "succeeded" for stage in stage_reports) else "succeeded",
+        "seconds": round(seconds, 6),
+        "stages": stage_reports,
+        "skipped": list(skipped),
+    }
+    report_path = os.path.normpath(os.path.join(data_dir, REPORT_DIR, RUN_REPORT))
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, mode='w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=4)
+    return report_path
+
+
+def summary_line(stage_reports, seconds):
+    """One line for the console: totals and the slowest stage."""
+    succeeded = [stage for stage in stage_reports if stage["status"] == "succeeded"]
+    rows_read = sum(sum(stage["rowsRead"].values()) for stage in succeeded)
+    rows_written = sum(sum(stage["rowsWritten"].values()) for stage in succeeded)
+    bytes_written = sum(sum(stage["bytesWritten"].values()) for stage in succeeded)
+    line = (f"{len(succeeded)} stages in {seconds:.2f}s, read {rows_read} rows, "
+            f"wrote {rows_written} rows and {bytes_written / (1 << 20):.2f} MiB")
+    if succeeded:
+        slowest = max(succeeded, key=lambda stage: stage["seconds"])
+        line += f", slowest {slowest['name']} ({slowest['seconds']:.2f}s)"
+    return line
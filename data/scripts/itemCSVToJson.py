@@ -1,193 +1,148 @@
-import csv
-import json
+import multiprocessing
 import os  # Ensure this import is at the top of your file
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import instrumentation
+from buildManifest import Section, build_json_incrementally, encode_section
+from csvSchema import read_groups, read_lookup, read_records
+from instrumentation import StageReport, record_rows_read
+from itemSchemas import ITEM_SCHEMAS, SCHEMAS_BY_NAME
+from jsonWriter import default_profile
 
 # Get the directory of the current script
 script_dir = os.path.dirname(os.path.abspath(__file__))
-
-# Define the input and output file paths with absolute paths
-blueprint_file_path = os.path.join(script_dir, '../items/inventoryItems/final/blueprints.csv')
-harvested_file_path = os.path.join(script_dir, '../items/inventoryItems/final/harvested.csv')
-seeds_file_path = os.path.join(script_dir, '../items/inventoryItems/final/seeds.csv')
-decorations_file_path = os.path.join(script_dir, '../items/placedItems/final/decorations.csv')
-ground_file_path = os.path.join(script_dir, '../items/placedItems/final/ground.csv')
-plants_file_path = os.path.join(script_dir, '../items/placedItems/final/plants.csv')
-shiny_file_path = os.path.join(script_dir, '../items/placedItems/final/shinyItemRates.csv')
-tools_file_path = os.path.join(script_dir, '../items/tools/final/tools.csv')
-json_file_path = os.path.join(script_dir, '../final/temp/Items.json')
-
-# Initialize the data structure for JSON output
-data = {
-    "PlacedItems": {
-        "Plants": [],
-        "Decorations": [],
-        "Ground": []
-    },
-    "InventoryItems": {
-        "Seeds": [],
-        "HarvestedItems": [],
-        "Blueprints": []
-    },
-    "Tools": {
-        "Shovels": []
-    }
-}
-
-with open(blueprint_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    
-    # Process each row in the CSV
-    for row in csv_reader:
-        blueprint = {
-            "id": row["id"],
-            "name": row["name"],
-            "icon": row["icon"],
-            "type": row["type"],
-            "subtype": row["subtype"],
-            "category": row["category"],
-            "description": row["description"],
-            "value": int(row["value"]),
-            "level": int(row["level"]),
-            "transformId": row["transformId"]
-        }
-        data["InventoryItems"]["Blueprints"].append(blueprint)
-
-
-with open(harvested_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    
-    # Process each row in the CSV
-    for row in csv_reader:
-        harvested = {
-            "id": row["id"],
-            "name": row["name"],
-            "icon": row["icon"],
-            "type": row["type"],
-            "subtype": row["subtype"],
-            "category": row["category"],
-            "description": row["description"],
-            "value": int(row["value"]),
-            "level": int(row["level"])
-        }
-        data["InventoryItems"]["HarvestedItems"].append(harvested)
-
-
-with open(seeds_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    
-    # Process each row in the CSV
-    for row in csv_reader:
-        seed = {
-            "id": row["id"],
-            "name": row["name"],
-            "icon": row["icon"],
-            "type": row["type"],
-            "subtype": row["subtype"],
-            "category": row["category"],
-            "description": row["description"],
-            "value": int(row["value"]),
-            "level": int(row["level"]),
-            "transformId": row["transformId"]
-        }
-        data["InventoryItems"]["Seeds"].append(seed)
-
-
-with open(decorations_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    
-    # Process each row in the CSV
-    for row in csv_reader:
-        decoration = {
-            "id": row["id"],
-            "name": row["name"],
-            "icon": row["icon"],
-            "type": row["type"],
-            "subtype": row["subtype"],
-            "category": row["category"],
-            "description": row["description"],
-            "value": int(row["value"]),
-            "level": int(row["level"]),
-            "transformId": row["transformId"]
-        }
-        data["PlacedItems"]["Decorations"].append(decoration)
-
-
-with open(ground_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    
-    # Process each row in the CSV
-    for row in csv_reader:
-        ground = {
-            "id": row["id"],
-            "name": row["name"],
-            "icon": row["icon"],
-            "type": row["type"],
-            "subtype": row["subtype"],
-            "category": row["category"],
-            "description": row["description"],
-            "value": int(row["value"]),
-            "level": int(row["level"]),
-            "transformId": row["transformId"]
-        }
-        data["PlacedItems"]["Ground"].append(ground)
-
-transformShinyIdMap = {}
-with open(shiny_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    for row in csv_reader:
-        plantId = row["plantId"]
-        tier = row["tier"]
-        if plantId not in transformShinyIdMap:
-            transformShinyIdMap[plantId] = {} 
-        
-        transformShinyIdMap[plantId][tier] = {
-            "id": row["id"],
-            "probability": float(row["probability"])
-        }
-
-
-with open(plants_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    
-    # Process each row in the CSV
-    # id,name,icon,type,subtype,category,description,value,level,transformId,baseExp,growTime,repeatedGrowTime,numHarvests
-    for row in csv_reader:
-        plant = {
-            "id": row["id"],
-            "name": row["name"],
-            "icon": row["icon"],
-            "type": row["type"],
-            "subtype": row["subtype"],
-            "category": row["category"],
-            "description": row["description"],
-            "value": int(row["value"]),
-            "level": int(row["level"]),
-            "transformId": row["transformId"],
-            "baseExp": int(row["baseExp"]),
-            "growTime": int(row["growTime"]),
-            "repeatedGrowTime": int(row["repeatedGrowTime"]),
-            "numHarvests": int(row["numHarvests"]),
-            "transformShinyIds": transformShinyIdMap.get(row["id"], {})
-        }
-        data["PlacedItems"]["Plants"].append(plant)
-
-with open(tools_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-    # Process each row in the CSV
-    for row in csv_reader:
-        tool = {
-            "id": row["id"],
-            "name": row["name"],
-            "type": row["type"],
-            "icon": row["icon"],
-            "description": row["description"],
-            "value": int(row["value"]),
-            "level": int(row["level"])
-        }
-        data["Tools"][(row["type"] + "s")].append(tool)
-
-# Write the JSON data to the output file
-with open(json_file_path, mode='w', encoding='utf-8') as json_file:
-    json.dump(data, json_file, ensure_ascii=False, indent=4)
-
-print("Item CSV has been converted to JSON format successfully.")
+default_data_dir = os.path.join(script_dir, '..')
+
+# Below this many bytes of stale CSVs, starting worker processes costs more than parsing in line
+PARALLEL_MIN_BYTES = 4 << 20
+
+
+def parse_schema(data_dir, schema_name, tables=None, profile=None):
+    """Parse one CSV completely, in a worker, and return it with the rows read per file.
+
+    Lookup schemas return their table; record schemas return their section already encoded for
+    profile, which is most of the work of a section.
+    """
+    schema = SCHEMAS_BY_NAME[schema_name]
+    file_path = os.path.join(data_dir, schema.path)
+    # Workers have no stage report of their own, the counts are recorded by the parent
+    report = StageReport(schema_name, data_dir)
+    instrumentation.current.report = report
+    try:
+        if schema.index_by:
+            value = read_lookup(schema, file_path, tables)
+        elif schema.group_by:
+            value = read_groups(schema, file_path, tables)
+        else:
+            value = read_records(schema, file_path, tables)
+        if schema.section:
+            value = encode_section(value, schema.section, profile)
+    finally:
+        instrumentation.current.report = None
+    return value, report.rows_read
+
+
+class ParallelIngest:
+    """Parses and encodes the stale sections in a process pool while Items.json is written in section order.
+
+    Every file is handled by its own worker. A schema that joins a lookup table (plants and the shiny
+    map) is only submitted once that table is parsed, and the parsed table is passed to it. Results
+    are taken back in section order, so the output is the same as parsing one file after another.
+    """
+
+    def __init__(self, data_dir, profile, workers=None):
+        self.data_dir = data_dir
+        self.profile = profile
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.futures = {}
+        self.results = {}
+
+    def submit(self, schema, tables=None):
+        self.futures[schema.name] = self.executor.submit(parse_schema, self.data_dir, schema.name, tables, self.profile)
+
+    def prefetch(self, schemas):
+        stale_bytes = sum(os.path.getsize(os.path.join(self.data_dir, schema.path)) for schema in schemas)
+        if self.workers < 2 or len(schemas) < 2 or stale_bytes < PARALLEL_MIN_BYTES:
+            return
+        # spawn, as the pipeline calls this from one of its threads and forking a threaded process is unsafe
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+        lookups = sorted({join.table for schema in schemas for join in schema.joins})
+        for name in lookups:
+            self.submit(SCHEMAS_BY_NAME[name])
+        # Largest files first, so the longest parse does not start last
+        independent = [schema for schema in schemas if not schema.joins]
+        for schema in sorted(independent, key=lambda schema: os.path.getsize(os.path.join(self.data_dir, schema.path)), reverse=True):
+            self.submit(schema)
+        for schema in schemas:
+            if schema.joins:
+                self.submit(schema, {join.table: self.result(join.table) for join in schema.joins})
+
+    def started(self, schema):
+        return schema.name in self.futures
+
+    def result(self, name):
+        if name not in self.results:
+            value, rows_read = self.futures[name].result()
+            for relative_path, count in rows_read.items():
+                record_rows_read(os.path.join(self.data_dir, relative_path), count)
+            self.results[name] = value
+        return self.results[name]
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+
+def convert_items(data_dir=default_data_dir, force=False, profile=None, workers=None):
+    # Define the output file path with absolute paths, inputs come from itemSchemas
+    json_file_path = os.path.join(data_dir, 'final/temp/Items.json')
+
+    def schema_file_path(schema):
+        return os.path.join(data_dir, schema.path)
+
+    def section_for(schema):
+        join_schemas = [SCHEMAS_BY_NAME[join.table] for join in schema.joins]
+
+        def build():
+            if ingest.started(schema):
+                return ingest.result(schema.name)
+            # Lookup tables such as the shiny map are only read when a section that joins them is rebuilt
+            tables = {
+                join_schema.name: read_lookup(join_schema, schema_file_path(join_schema))
+                for join_schema in join_schemas
+            }
+            if schema.group_by:
+                return read_groups(schema, schema_file_path(schema), tables)
+            return read_records(schema, schema_file_path(schema), tables)
+
+        inputs = [schema_file_path(schema)] + [schema_file_path(join_schema) for join_schema in join_schemas]
+        return Section(schema.section, inputs, build)
+
+    # Sections in output order, each rebuilt only when one of its CSVs changed
+    ingest = ParallelIngest(data_dir, profile or default_profile, workers)
+    sections = [section_for(schema) for schema in ITEM_SCHEMAS]
+    schemas_by_section = {schema.section: schema for schema in ITEM_SCHEMAS}
+
+    def prefetch(stale_sections):
+        ingest.prefetch([schemas_by_section[section.path] for section in stale_sections])
+
+    try:
+        rebuilt = build_json_incrementally(data_dir, json_file_path, sections, force=force, profile=profile, prefetch=prefetch)
+    finally:
+        ingest.close()
+    if not rebuilt:
+        print("Items.json is up to date, skipped item CSV conversion.")
+        return
+
+    print(f"Item CSV has been converted to JSON format successfully (rebuilt {', '.join(rebuilt)}).")
+
+
+if __name__ == "__main__":
+    convert_items(
+        force="--force" in sys.argv,
+        profile="compact" if "--compact" in sys.argv else None,
+        workers=int(sys.argv[sys.argv.index("--workers") + 1]) if "--workers" in sys.argv else None,
+    )
@@ -0,0 +1,234 @@
+import sys
+
+# Compact record types for catalog rows held in memory by the tools (see data/items/itemCatalog.py).
+# Records keep their fields in __slots__, so a row costs one small object instead of a dict with a
+# hash table, and the values repeated across thousands of rows (type, subtype, category, icon,
+# shiny tier) are interned so every row points at the same string.
+#
+# from_json and to_json convert from and to the shape of Items.json, Stocklists.json and
+# Stores.json with the keys in the same order, so loading and saving a file is byte-stable.
+
+# Marks a field the JSON object did not have, so to_json leaves it out again
+MISSING = object()
+
+
+class Record:
+    """Base of the record types. FIELDS is every slot in JSON key order, parents first."""
+
+    __slots__ = ()
+    FIELDS = ()
+    # Fields whose string values are interned
+    INTERNED = frozenset()
+    # Fields stored in another form than their JSON value, field -> function converting the JSON value
+    CONVERTERS = {}
+    # Generated by compile_from_complete_json on first use
+    from_complete_json = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.FIELDS = cls.FIELDS + tuple(cls.__dict__.get('__slots__', ()))
+        cls.FIELD_SET = frozenset(cls.FIELDS)
+        cls.from_complete_json = None
+
+    def __init__(self, **fields):
+        for key, value in fields.items():
+            self.set(key, value)
+
+    @classmethod
+    def convert(cls, key, value):
+        """The form a JSON value of field key is stored in."""
+        if key not in cls.FIELD_SET:
+            raise ValueError(f"{cls.__name__} has no field '{key}'")
+        if key in cls.CONVERTERS and not isinstance(value, tuple):
+            return cls.CONVERTERS[key](value)
+        if key in cls.INTERNED and type(value) is str:
+            return sys.intern(value)
+        return value
+
+    def set(self, key, value):
+        setattr(self, key, self.convert(key, value))
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.FIELD_SET else default
+
+    def __contains__(self, key):
+        return key in self.FIELD_SET and getattr(self, key, MISSING) is not MISSING
+
+    def __eq__(self, other):
+        return type(other) is type(self) and all(
+            getattr(self, field, MISSING) == getattr(other, field, MISSING) for field in self.FIELDS
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_json()!r})"
+
+    @classmethod
+    def compile_from_complete_json(cls):
+        """Generate a from_json for objects that have exactly FIELDS, the usual case when loading a file.
+
+        One attribute store per field with the conversion resolved up front, like the row converters
+        csvSchema compiles; it returns None for any other object so from_json takes the general path.
+        """
+        namespace = {"cls": cls, "intern": sys.intern, "converters": cls.CONVERTERS}
+        lines = ["def from_complete_json(data):",
+                 f"    if len(data) != {len(cls.FIELDS)}:",
+                 "        return None",
+                 "    record = cls.__new__(cls)",
+                 "    try:"]
+        for field in cls.FIELDS:
+            value = f"data[{field!r}]"
+            if field in cls.CONVERTERS:
+                value = f"converters[{field!r}]({value})"
+            elif field in cls.INTERNED:
+                value = f"intern({value}) if type({value}) is str else {value}"
+            lines.append(f"        record.{field} = {value}")
+        lines += ["    except KeyError:", "        return None", "    return record"]
+        exec(compile('\n'.join(lines) + '\n', f"<record {cls.__name__}>", "exec"), namespace)
+        return namespace["from_complete_json"]
+
+    @classmethod
+    def from_json(cls, data):
+        if cls.from_complete_json is None:
+            cls.from_complete_json = cls.compile_from_complete_json()
+        record = cls.from_complete_json(data)
+        if record is not None:
+            return record
+
+        # Objects with missing fields, such as plants before addShinyTable gave them transformShinyIds
+        record = cls.__new__(cls)
+        interned = cls.INTERNED
+        converters = cls.CONVERTERS
+        try:
+            for key, value in data.items():
+                if key in converters:
+                    value = converters[key](value)
+                elif key in interned and type(value) is str:
+                    value = sys.intern(value)
+                setattr(record, key, value)
+        except AttributeError:
+            unknown = sorted(key for key in data if key not in cls.FIELD_SET)
+            raise ValueError(f"{cls.__name__} has no field(s) {', '.join(unknown)}") from None
+        return record
+
+    def to_json(self):
+        data = {}
+        for field in self.FIELDS:
+            value = getattr(self, field, MISSING)
+            if value is not MISSING:
+                data[field] = value
+        return data
+
+
+class Item(Record):
+    __slots__ = ('id', 'name', 'icon', 'type', 'subtype', 'category', 'description', 'value', 'level')
+    INTERNED = frozenset({'icon', 'type', 'subtype', 'category'})
+
+
+class ShinyRate(Record):
+    """One shiny tier of a plant, a row of shinyItemRates.csv.
+
+    Inside a Plant only tier, id and probability are set, matching transformShinyIds.
+    """
+
+    __slots__ = ('id', 'name', 'tier', 'probability', 'plantId')
+    INTERNED = frozenset({'tier'})
+
+
+def shiny_rates_from_json(transform_shiny_ids):
+    rates = []
+    for tier, rate in transform_shiny_ids.items():
+        shiny_rate = ShinyRate.from_json(rate)
+        shiny_rate.tier = sys.intern(tier)
+        rates.append(shiny_rate)
+    return tuple(rates)
+
+
+class Plant(Item):
+    __slots__ = ('transformId', 'baseExp', 'growTime', 'repeatedGrowTime', 'numHarvests', 'transformShinyIds')
+    # transformShinyIds is {tier: {id, probability}} in JSON and a tuple of ShinyRates here
+    CONVERTERS = {'transformShinyIds': shiny_rates_from_json}
+
+    def to_json(self):
+        data = super().to_json()
+        if 'transformShinyIds' in data:
+            data['transformShinyIds'] = {
+                rate.tier: {key: value for key, value in rate.to_json().items() if key != 'tier'}
+                for rate in data['transformShinyIds']
+            }
+        return data
+
+
+class Seed(Item):
+    __slots__ = ('transformId',)
+
+
+class HarvestedItem(Item):
+    __slots__ = ()
+
+
+class Decoration(Item):
+    __slots__ = ('transformId',)
+
+
+class Ground(Item):
+    __slots__ = ('transformId',)
+
+
+class Blueprint(Item):
+    __slots__ = ('transformId',)
+
+
+class Tool(Record):
+    __slots__ = ('id', 'name', 'type', 'icon', 'description', 'value', 'level')
+    INTERNED = frozenset({'type', 'icon'})
+
+
+class StocklistEntry(Record):
+    __slots__ = ('name', 'quantity')
+    INTERNED = frozenset({'name'})
+
+
+class Stocklist(Record):
+    __slots__ = ('id', 'name', 'items')
+    CONVERTERS = {'items': lambda entries: tuple(StocklistEntry.from_json(entry) for entry in entries)}
+
+    def to_json(self):
+        data = super().to_json()
+        if 'items' in data:
+            data['items'] = [entry.to_json() for entry in data['items']]
+        return data
+
+
+class Store(Record):
+    __slots__ = ('id', 'name', 'stocklistId', 'stocklistName', 'buyMultiplier', 'sellMultiplier',
+                 'upgradeMultiplier', 'restockInterval')
+    INTERNED = frozenset({'stocklistId', 'stocklistName'})
+
+
+# Record type of every list section, keyed by its last key in Items.json, Stocklists.json and Stores.json
+SECTION_RECORD_TYPES = {
+    "Plants": Plant,
+    "Decorations": Decoration,
+    "Ground": Ground,
+    "Seeds": Seed,
+    "HarvestedItems": HarvestedItem,
+    "Blueprints": Blueprint,
+    "Shovels": Tool,
+    "Stocklists": Stocklist,
+    "Stores": Store,
+}
+
+
+def records_from_json(section_path, items):
+    """Records for the JSON objects of the section at section_path, Item for sections without a type of their own."""
+    record_type = SECTION_RECORD_TYPES.get(section_path[-1], Item)
+    return [item if isinstance(item, Record) else record_type.from_json(item) for item in items]
+
+
+def record_to_json(value):
+    """json.dump default= hook, lets documents holding records be dumped directly."""
+    if isinstance(value, Record):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,89 @@
+from csvSchema import CsvSchema, Field, Join
+
+# Columns shared by every catalog item CSV, in output order
+ITEM_FIELDS = [
+    Field("id"),
+    Field("name"),
+    Field("icon"),
+    Field("type"),
+    Field("subtype"),
+    Field("category"),
+    Field("description"),
+    Field("value", "int"),
+    Field("level", "int"),
+]
+
+# Lookup tables, built before the record schemas that join against them
+SHINY_RATES = CsvSchema(
+    "shinyItemRates",
+    'items/placedItems/final/shinyItemRates.csv',
+    [Field("id"), Field("probability", "float")],
+    index_by=("plantId", "tier"),
+)
+
+LOOKUP_SCHEMAS = [SHINY_RATES]
+
+# Record schemas in Items.json section order. Adding an item subtype is a new entry here.
+ITEM_SCHEMAS = [
+    CsvSchema(
+        "plants",
+        'items/placedItems/final/plants.csv',
+        ITEM_FIELDS + [
+            Field("transformId"),
+            Field("baseExp", "int"),
+            Field("growTime", "int"),
+            Field("repeatedGrowTime", "int"),
+            Field("numHarvests", "int"),
+            Join("transformShinyIds", "id", SHINY_RATES.name),
+        ],
+        section=("PlacedItems", "Plants"),
+    ),
+    CsvSchema(
+        "decorations",
+        'items/placedItems/final/decorations.csv',
+        ITEM_FIELDS + [Field("transformId")],
+        section=("PlacedItems", "Decorations"),
+    ),
+    CsvSchema(
+        "ground",
+        'items/placedItems/final/ground.csv',
+        ITEM_FIELDS + [Field("transformId")],
+        section=("PlacedItems", "Ground"),
+    ),
+    CsvSchema(
+        "seeds",
+        'items/inventoryItems/final/seeds.csv',
+        ITEM_FIELDS + [Field("transformId")],
+        section=("InventoryItems", "Seeds"),
+    ),
+    CsvSchema(
+        "harvested",
+        'items/inventoryItems/final/harvested.csv',
+        ITEM_FIELDS,
+        section=("InventoryItems", "HarvestedItems"),
+    ),
+    CsvSchema(
+        "blueprints",
+        'items/inventoryItems/final/blueprints.csv',
+        ITEM_FIELDS + [Field("transformId")],
+        section=("InventoryItems", "Blueprints"),
+    ),
+    CsvSchema(
+        "tools",
+        'items/tools/final/tools.csv',
+        [
+            Field("id"),
+            Field("name"),
+            Field("type"),
+            Field("icon"),
+            Field("description"),
+            Field("value", "int"),
+            Field("level", "int"),
+        ],
+        section=("Tools",),
+        group_by=("type", "{}s"),
+        groups=("Shovels",),
+    ),
+]
+
+SCHEMAS_BY_NAME = {schema.name: schema for schema in LOOKUP_SCHEMAS + ITEM_SCHEMAS}
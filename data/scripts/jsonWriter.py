@@ -0,0 +1,97 @@
+import json
+import os
+
+# pretty matches json.dump(indent=4) byte for byte and is what we check in, compact is what clients download.
+# Keys are always written in the order the converters build their records, so both are byte-stable.
+PROFILES = {
+    "pretty": {"indent": 4, "separators": (',', ': ')},
+    "compact": {"indent": None, "separators": (',', ':')},
+}
+
+# Lets the pipeline and the standalone scripts pick the production profile without extra flags
+default_profile = os.environ.get("CATALOG_JSON_PROFILE", "pretty")
+
+
+class JsonStreamWriter:
+    """Writes a JSON document incrementally so records never have to be held in memory together.
+
+    Containers are opened and closed explicitly; complete values (a record, a small dict) are
+    written with value(). Inside an object every value has to be preceded by key(). A writer with a
+    depth writes a fragment: one value as it appears after a key that many containers deep.
+    """
+
+    def __init__(self, file, profile=None, depth=0):
+        profile = profile or default_profile
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown JSON profile '{profile}', expected one of {', '.join(PROFILES)}")
+        self.file = file
+        self.profile = profile
+        self.indent = PROFILES[profile]["indent"]
+        self.separators = PROFILES[profile]["separators"]
+        # json.dumps would build the same encoder again for every record
+        self.encoder = json.JSONEncoder(ensure_ascii=False, indent=self.indent, separators=self.separators)
+        # One [is_empty] entry per open container
+        self.stack = [[False] for _ in range(depth)]
+        self.after_key = depth > 0
+
+    def _newline(self, depth):
+        if self.indent is not None:
+            self.file.write('\n' + ' ' * (self.indent * depth))
+
+    def _before_element(self):
+        if self.after_key:
+            self.after_key = False
+            return
+        if not self.stack:
+            return
+        frame = self.stack[-1]
+        if not frame[0]:
+            self.file.write(self.separators[0])
+        frame[0] = False
+        self._newline(len(self.stack))
+
+    def encode(self, value):
+        return self.encoder.encode(value)
+
+    def value(self, value):
+        """Write a complete value and return its encoding, before indenting it to the current depth."""
+        self._before_element()
+        encoded = self.encode(value)
+        if self.indent is not None and self.stack and '\n' in encoded:
+            self.file.write(encoded.replace('\n', '\n' + ' ' * (self.indent * len(self.stack))))
+        else:
+            self.file.write(encoded)
+        return encoded
+
+    def raw(self, text):
+        """Write a value already encoded by a fragment writer at the current depth."""
+        self._before_element()
+        self.file.write(text)
+
+    def key(self, name):
+        self._before_element()
+        self.file.write(json.dumps(name, ensure_ascii=False) + self.separators[1])
+        self.after_key = True
+
+    def _begin(self, opener):
+        self._before_element()
+        self.file.write(opener)
+        self.stack.append([True])
+
+    def _end(self, closer):
+        is_empty = self.stack.pop()[0]
+        if not is_empty:
+            self._newline(len(self.stack))
+        self.file.write(closer)
+
+    def begin_object(self):
+        self._begin('{')
+
+    def end_object(self):
+        self._end('}')
+
+    def begin_array(self):
+        self._begin('[')
+
+    def end_array(self):
+        self._end(']')
@@ -0,0 +1,213 @@
+import importlib
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# Stage modules live next to this file, make sure they can be imported when run from elsewhere
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+from instrumentation import instrument_stage, summary_line, write_run_report
+from itemSchemas import ITEM_SCHEMAS, LOOKUP_SCHEMAS
+from validateCatalog import TABLES
+
+
+class Stage:
+    """A single step of the data pipeline.
+
+    The stage function is referenced by module and function name and only imported by the worker
+    running the stage, so a pipeline that never reaches a stage never pays for its imports. The
+    pipeline itself only imports instrumentation and the table definitions the inputs come from
+    (itemSchemas, validateCatalog's TABLES), which import nothing but csv. inputs are
+    the CSVs the stage reads, relative to the data directory, used to rerun only the stages a
+    changed file affects.
+    """
+
+    def __init__(self, name, module, function, depends_on=(), inputs=()):
+        self.name = name
+        self.module = module
+        self.function = function
+        self.depends_on = tuple(depends_on)
+        self.inputs = tuple(inputs)
+
+
+def stage_failure(name, error):
+    """Report of a failed stage. Only plain strings, so it crosses a process pool even when error would not."""
+    return {
+        "name": name,
+        "status": "failed",
+        "error": f"{type(error).__name__}: {error}",
+        "errorType": f"{type(error).__module__}.{type(error).__qualname__}",
+        "traceback": ''.join(traceback.format_exception(type(error), error, error.__traceback__)),
+    }
+
+
+def run_stage(name, module, function, data_dir, profile=False):
+    """Run one stage and return its instrumentation report as a dict, or a stage_failure when it raised.
+
+    Failures are returned rather than raised: an exception that cannot be unpickled would otherwise
+    break the process pool and fail every stage running beside it.
+    """
+    try:
+        stage_function = getattr(importlib.import_module(module), function)
+        with instrument_stage(name, data_dir, profile) as report:
+            stage_function(data_dir)
+    except Exception as error:
+        return stage_failure(name, error)
+    return report.as_dict()
+
+
+# Converters that turn the final CSVs into the JSON files (and derived artifacts) under final/temp
+CONVERTER_STAGES = [
+    Stage("actionHistoryCSVToJson", "actionHistoryCSVToJson", "convert_action_histories",
+          inputs=['user/final/actionHistories.csv']),
+    Stage("iconCSVToJson", "iconCSVToJson", "convert_icons", inputs=['user/final/icons.csv']),
+    Stage("itemCSVToJson", "itemCSVToJson", "convert_items",
+          inputs=[schema.path for schema in ITEM_SCHEMAS + LOOKUP_SCHEMAS]),
+    Stage("catalogBinary", "catalogBinary", "convert_items_to_binary", depends_on=["itemCSVToJson"]),
+    Stage("catalogIndex", "catalogIndex", "convert_items_to_index", depends_on=["itemCSVToJson"]),
+    Stage("stocklistCSVToJson", "stocklistCSVToJson", "convert_stocklists", inputs=['store/stocklist.csv']),
+    Stage("storeCSVToJson", "storeCSVToJson", "convert_stores", inputs=['store/stores.csv']),
+]
+
+# Referential integrity check over every final CSV, every converter waits for it
+VALIDATION_STAGE = Stage("validateCatalog", "validateCatalog", "validate_catalog", inputs=TABLES.values())
+
+
+def converter_build_stages():
+    """Validate the final CSVs, then convert everything to JSON."""
+    stages = [VALIDATION_STAGE]
+    for stage in CONVERTER_STAGES:
+        depends_on = stage.depends_on or [VALIDATION_STAGE.name]
+        stages.append(Stage(stage.name, stage.module, stage.function, depends_on=depends_on, inputs=stage.inputs))
+    return stages
+
+
+def full_build_stages():
+    """Clean the temp CSVs, promote them to final, validate them, then convert everything to JSON."""
+    stages = [
+        Stage("cleanCSVs", "cleanCSVs", "clean_csvs"),
+        Stage("copyTempToFinal", "copyTempToFinal", "copy_temp_to_final", depends_on=["cleanCSVs"]),
+    ]
+    for stage in converter_build_stages():
+        depends_on = list(stage.depends_on)
+        if stage.name == VALIDATION_STAGE.name:
+            depends_on.append("copyTempToFinal")
+        stages.append(Stage(stage.name, stage.module, stage.function, depends_on=depends_on, inputs=stage.inputs))
+    return stages
+
+
+def stages_for_changes(stages, changed_inputs):
+    """The stages reading any of changed_inputs, plus the derived stages built from their outputs.
+
+    Derived stages (catalogBinary, catalogIndex) have no inputs of their own and rerun whenever a
+    stage they depend on does; a dependency that is only an ordering gate, like validateCatalog,
+    does not pull in the converters behind it. Dependencies on stages that are left out are dropped.
+    """
+    changed_inputs = set(changed_inputs)
+    selected = {stage.name for stage in stages if changed_inputs.intersection(stage.inputs)}
+    # Stages are listed in dependency order, so one pass picks up derived stages of derived stages
+    for stage in stages:
+        if not stage.inputs and selected.intersection(stage.depends_on):
+            selected.add(stage.name)
+    return [
+        Stage(stage.name, stage.module, stage.function,
+              depends_on=[name for name in stage.depends_on if name in selected], inputs=stage.inputs)
+        for stage in stages if stage.name in selected
+    ]
+
+
+def validate_stages(stages):
+    names = set()
+    for stage in stages:
+        if stage.name in names:
+            raise ValueError(f"Duplicate stage '{stage.name}'")
+        names.add(stage.name)
+    for stage in stages:
+        for dependency in stage.depends_on:
+            if dependency not in names:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown stage '{dependency}'")
+
+    # Kahn's algorithm, only used to reject cycles up front
+    remaining = {stage.name: set(stage.depends_on) for stage in stages}
+    while remaining:
+        ready = [name for name, dependencies in remaining.items() if not dependencies]
+        if not ready:
+            raise ValueError(f"Dependency cycle between stages: {', '.join(sorted(remaining))}")
+        for name in ready:
+            del remaining[name]
+        for dependencies in remaining.values():
+            dependencies.difference_update(ready)
+
+
+def run_pipeline(stages, data_dir=default_data_dir, max_workers=None, use_processes=True, profile=False):
+    """Run the stages in dependency order, independent stages in parallel.
+
+    Stages run in worker processes, as the converters are CPU bound and threads would share the
+    GIL. use_processes=False runs them in threads of this process instead, for callers that keep
+    caches in module state between runs (watchCatalog.py).
+
+    Stops scheduling new stages as soon as one fails, waits for the stages already running and
+    returns a process exit status: 0 if every stage succeeded, 1 otherwise. Every run writes a
+    report of what each stage read and wrote, see instrumentation.py; with profile=True each stage
+    is also run under cProfile and tracemalloc.
+    """
+    validate_stages(stages)
+
+    pending = {stage.name: stage for stage in stages}
+    completed = set()
+    running = {}
+    failed = []
+    stage_reports = []
+    start = time.perf_counter()
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers) as executor:
+        while pending or running:
+            if not failed:
+                ready = [stage for stage in pending.values() if completed.issuperset(stage.depends_on)]
+                for stage in ready:
+                    del pending[stage.name]
+                    future = executor.submit(run_stage, stage.name, stage.module, stage.function, data_dir, profile)
+                    running[future] = stage
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                error = future.exception()
+                # Stage errors come back as reports, an exception here means the worker itself died
+                report = future.result() if error is None else stage_failure(stage.name, error)
+                stage_reports.append(report)
+                if report["status"] == "succeeded":
+                    completed.add(stage.name)
+                    continue
+                failed.append(stage.name)
+                print(f"Stage {stage.name} failed:", file=sys.stderr)
+                print(report["traceback"], end='', file=sys.stderr)
+
+    seconds = time.perf_counter() - start
+    skipped = sorted(pending)
+    report_path = write_run_report(data_dir, stage_reports, seconds, skipped)
+    summary = summary_line(stage_reports, seconds)
+
+    if failed:
+        if skipped:
+            print(f"Skipped stages: {', '.join(skipped)}", file=sys.stderr)
+        print(f"Pipeline failed in {', '.join(failed)} after {summary}. Report: {report_path}", file=sys.stderr)
+        return 1
+
+    print(f"Pipeline complete, ran {summary}. Report: {report_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_pipeline(full_build_stages(), profile="--profile" in sys.argv))
@@ -1,18 +1,12 @@
-def convert_all_csv_to_json():
-    import subprocess
-    import os  # Ensure this import is at the top of your file
+import sys
 
-    # Get the directory of the current script
-    script_dir = os.path.dirname(os.path.abspath(__file__))
+from pipeline import full_build_stages, run_pipeline
 
-    # Define the scripts with absolute paths
-    scripts = [
-        os.path.join(script_dir, "cleanCSVs.py"),
-        os.path.join(script_dir, "copyTempToFinal.py"),
-        os.path.join(script_dir, "allCSVToJson.py")
-    ]
 
-    for script in scripts:
-        subprocess.run(["python", script])  # Call each script
+def process_all_csvs(profile=False):
+    # cleanCSVs -> copyTempToFinal -> every converter, see pipeline.full_build_stages
+    return run_pipeline(full_build_stages(), profile=profile)
 
-convert_all_csv_to_json()
\ No newline at end of file
+
+if __name__ == "__main__":
+    sys.exit(process_all_csvs(profile="--profile" in sys.argv))
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+from buildManifest import hash_file
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# final/current is a plain directory, the app imports its JSON files statically and git tracks them.
+# Publishing swaps new files into it one os.replace at a time, so every file is always either the
+# old or the new build, never partly written. Every published build is also kept under
+# final/snapshots/<version> for rollbacks; final/snapshots/ is local deploy state and gitignored.
+SNAPSHOT_DIR = 'snapshots'
+PUBLISH_LOG = 'publishLog.json'
+MANIFEST = 'manifest.json'
+
+# The JSON files the app reads from final/current. The pipeline writes the first set to final/temp;
+# the others are maintained by hand and carried over from the live snapshot.
+PIPELINE_FILES = ('ActionHistories.json', 'Icons.json', 'Items.json', 'Stocklists.json', 'Stores.json')
+CARRIED_FILES = ('DailyLoginRewards.json', 'SVGIcons.json')
+
+
+def snapshot_files(directory, filenames=PIPELINE_FILES + CARRIED_FILES):
+    """The published files among filenames that exist in directory. Derived artifacts such as Items.bin never are."""
+    return sorted(filename for filename in filenames if os.path.isfile(os.path.join(directory, filename)))
+
+
+def build_manifest(files):
+    """files maps file name -> path. The version is a prefix of the hash over every name and file hash."""
+    entries = {}
+    digest = hashlib.sha256()
+    for filename in sorted(files):
+        file_hash = hash_file(files[filename])
+        entries[filename] = {"sha256": file_hash, "size": os.path.getsize(files[filename])}
+        digest.update(f"{filename}\0{file_hash}\n".encode('utf-8'))
+    content_hash = digest.hexdigest()
+    return {"version": content_hash[:16], "contentHash": content_hash, "files": entries}
+
+
+def utc_now():
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
+
+def read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, mode='r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def write_json(path, data):
+    temp_file_path = path + '.tmp'
+    with open(temp_file_path, mode='w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, indent=4)
+    os.replace(temp_file_path, path)
+
+
+def live_version(final_dir):
+    """Version of the files in final/current, None when it has none."""
+    current_dir = os.path.join(final_dir, 'current')
+    files = {filename: os.path.join(current_dir, filename) for filename in snapshot_files(current_dir)}
+    return build_manifest(files)["version"] if files else None
+
+
+def install_snapshot(final_dir, version):
+    """Make the files of final/current those of a snapshot.
+
+    Every file is first copied next to its target, then all of them are swapped in with os.replace
+    and the published files the snapshot does not have are removed.
+    """
+    current_dir = os.path.join(final_dir, 'current')
+    snapshot_path = os.path.join(final_dir, SNAPSHOT_DIR, version)
+    filenames = snapshot_files(snapshot_path)
+    os.makedirs(current_dir, exist_ok=True)
+    staged = []
+    try:
+        for filename in filenames:
+            temp_file_path = os.path.join(current_dir, f".{filename}.tmp")
+            shutil.copy2(os.path.join(snapshot_path, filename), temp_file_path)
+            staged.append(temp_file_path)
+    except BaseException:
+        for temp_file_path in staged:
+            os.remove(temp_file_path)
+        raise
+    for filename in filenames:
+        os.replace(os.path.join(current_dir, f".{filename}.tmp"), os.path.join(current_dir, filename))
+    for filename in snapshot_files(current_dir):
+        if filename not in filenames:
+            os.remove(os.path.join(current_dir, filename))
+
+
+def snapshot_current(final_dir):
+    """Keep the files of final/current as a snapshot when no snapshot has them yet, so a rollback can return to them.
+
+    Returns the version when a snapshot was made, None otherwise.
+    """
+    current_dir = os.path.join(final_dir, 'current')
+    files = {filename: os.path.join(current_dir, filename) for filename in snapshot_files(current_dir)}
+    if not files:
+        return None
+    manifest = build_manifest(files)
+    if os.path.exists(os.path.join(final_dir, SNAPSHOT_DIR, manifest["version"])):
+        return None
+    write_snapshot(final_dir, files, manifest)
+    return manifest["version"]
+
+
+def write_snapshot(final_dir, files, manifest):
+    """Copy files into final/snapshots/<version>, assembled under a temporary name so a half-copied snapshot is never visible."""
+    snapshots_dir = os.path.join(final_dir, SNAPSHOT_DIR)
+    staging_path = os.path.join(snapshots_dir, f".{manifest['version']}.staging")
+    if os.path.exists(staging_path):
+        shutil.rmtree(staging_path)
+    os.makedirs(staging_path)
+    for filename, source_path in files.items():
+        shutil.copy2(source_path, os.path.join(staging_path, filename))
+    manifest["publishedAt"] = utc_now()
+    write_json(os.path.join(staging_path, MANIFEST), manifest)
+    os.rename(staging_path, os.path.join(snapshots_dir, manifest["version"]))
+
+
+def live_history(log):
+    """Versions made live by the log, oldest first, with everything a rollback undid dropped again."""
+    history = []
+    for entry in log:
+        version = entry["version"]
+        if entry["action"] == "rollback" and version in history:
+            del history[history.index(version) + 1:]
+        elif not history or history[-1] != version:
+            history.append(version)
+    return history
+
+
+def publish(data_dir=default_data_dir):
+    """Publish final/temp as a new immutable snapshot and swap its files into final/current.
+
+    A snapshot holds the PIPELINE_FILES of final/temp and the CARRIED_FILES of final/current,
+    nothing else. Raises ValueError, publishing nothing, when a pipeline file is missing from
+    final/temp. Returns the published version, or None when the build is identical to the live one.
+    """
+    final_dir = os.path.join(data_dir, 'final')
+    temp_dir = os.path.join(final_dir, 'temp')
+    current_dir = os.path.join(final_dir, 'current')
+    snapshots_dir = os.path.join(final_dir, SNAPSHOT_DIR)
+    log_path = os.path.join(snapshots_dir, PUBLISH_LOG)
+
+    files = {filename: os.path.join(temp_dir, filename) for filename in snapshot_files(temp_dir, PIPELINE_FILES)}
+    missing = [filename for filename in PIPELINE_FILES if filename not in files]
+    if missing:
+        raise ValueError(f"final/temp has no {', '.join(missing)}, run the pipeline before publishing")
+    os.makedirs(snapshots_dir, exist_ok=True)
+    log = read_json(log_path, [])
+    files.update({filename: os.path.join(current_dir, filename) for filename in snapshot_files(current_dir, CARRIED_FILES)})
+    manifest = build_manifest(files)
+    version = manifest["version"]
+
+    if version == live_version(final_dir):
+        print(f"Catalog {version} is already live, nothing to publish.")
+        return None
+
+    # The build live until now, e.g. the checked in one on the first publish, has to stay reachable
+    adopted = snapshot_current(final_dir)
+    if adopted is not None:
+        log.append({"version": adopted, "action": "adopt", "at": utc_now()})
+    if not os.path.exists(os.path.join(snapshots_dir, version)):
+        write_snapshot(final_dir, files, manifest)
+
+    install_snapshot(final_dir, version)
+    log.append({"version": version, "action": "publish", "at": utc_now()})
+    write_json(log_path, log)
+    print(f"Published catalog {version}.")
+    return version
+
+
+def rollback(data_dir=default_data_dir, version=None):
+    """Swap the files of an earlier snapshot back into final/current.
+
+    By default that is the version live before the current one, so rolling back again keeps going
+    back through the publish history.
+    """
+    final_dir = os.path.join(data_dir, 'final')
+    snapshots_dir = os.path.join(final_dir, SNAPSHOT_DIR)
+    log_path = os.path.join(snapshots_dir, PUBLISH_LOG)
+    log = read_json(log_path, [])
+    live = live_version(final_dir)
+
+    if version is None:
+        history = live_history(log)
+        while history and history[-1] == live:
+            history.pop()
+        if not history:
+            raise ValueError("No earlier snapshot to roll back to")
+        version = history[-1]
+    if not os.path.isdir(os.path.join(snapshots_dir, version)):
+        raise ValueError(f"Snapshot '{version}' does not exist")
+
+    install_snapshot(final_dir, version)
+    log.append({"version": version, "action": "rollback", "at": utc_now()})
+    write_json(log_path, log)
+    print(f"Rolled back catalog from {live} to {version}.")
+    return version
+
+
+if __name__ == "__main__":
+    try:
+        if "--rollback" in sys.argv:
+            arguments = sys.argv[sys.argv.index("--rollback") + 1:]
+            rollback(version=arguments[0] if arguments else None)
+        else:
+            publish()
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
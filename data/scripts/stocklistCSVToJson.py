@@ -1,47 +1,92 @@
 import csv
-import json
 import os  # Ensure this import is at the top of your file
+import sys
+
+from buildManifest import Section, build_json_incrementally
+from csvDedupeSort import external_sort
+from instrumentation import counted_rows
 
 # Get the directory of the current script
 script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+
+def convert_stocklists(data_dir=default_data_dir, force=False, profile=None):
+    # Define the input and output file paths with absolute paths
+    stocklist_file_path = os.path.join(data_dir, 'store/stocklist.csv')
+    json_file_path = os.path.join(data_dir, 'final/temp/Stocklists.json')
+
+    def index_stocklists():
+        # First pass: give every (id, name) pair an ordinal in first-seen order and check whether
+        # each stocklist's rows are contiguous, which lets the second pass stream without sorting
+        stocklist_index = {}
+        contiguous = True
+        previous_key = None
+        with open(stocklist_file_path, mode='r', encoding='utf-8') as csv_file:
+            csv_reader = csv.DictReader(csv_file)
+            for row in csv_reader:
+                key = (row["id"], row["name"])
+                if key != previous_key:
+                    if key in stocklist_index:
+                        contiguous = False
+                    else:
+                        stocklist_index[key] = len(stocklist_index)
+                    previous_key = key
+        return stocklist_index, contiguous
+
+    def read_item_rows():
+        with open(stocklist_file_path, mode='r', encoding='utf-8') as csv_file:
+            csv_reader = csv.DictReader(csv_file)
+            for row in counted_rows(stocklist_file_path, csv_reader):
+                yield row["id"], row["name"], row["itemName"], row["quantity"]
+
+    def build_stocklists():
+        stocklist_index, contiguous = index_stocklists()
+
+        def group(rows):
+            stocklist = None
+            for stocklist_id, stocklist_name, item_name, quantity in rows:
+                # Rows arrive grouped by stocklist, so a new key means the previous stocklist is complete
+                if stocklist is None or stocklist["id"] != stocklist_id or stocklist["name"] != stocklist_name:
+                    if stocklist is not None:
+                        yield stocklist
+                    stocklist = {
+                        "id": stocklist_id,
+                        "name": stocklist_name,
+                        "items": []
+                    }
+
+                # Create item and append to the corresponding stocklist
+                item = {
+                    "name": item_name,
+                    "quantity": int(quantity)
+                }
+                stocklist["items"].append(item)
+            if stocklist is not None:
+                yield stocklist
+
+        if contiguous:
+            yield from group(read_item_rows())
+            return
+
+        # Interleaved stocklists: order the rows by (stocklist ordinal, row number), spilling to disk if needed
+        numbered_rows = (
+            [str(stocklist_index[(row[0], row[1])]), str(row_number), *row]
+            for row_number, row in enumerate(read_item_rows())
+        )
+        with external_sort(numbered_rows, key=lambda r: (int(r[0]), int(r[1]))) as sorted_rows:
+            yield from group(row[2:] for row in sorted_rows)
+
+    sections = [
+        Section(("Stocklists",), [stocklist_file_path], build_stocklists),
+    ]
+
+    if not build_json_incrementally(data_dir, json_file_path, sections, force=force, profile=profile):
+        print("Stocklists.json is up to date, skipped stocklist CSV conversion.")
+        return
+
+    print("Stocklist CSV has been converted to JSON format successfully.")
+
 
-# Define the input and output file paths with absolute paths
-stocklist_file_path = os.path.join(script_dir, '../store/stocklist.csv')
-json_file_path = os.path.join(script_dir, '../final/temp/Stocklists.json')
-
-data = {
-    "Stocklists": []
-}
-
-with open(stocklist_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-
-    # Process each row in the CSV
-    for row in csv_reader:
-        stocklist_id = row["id"]
-        stocklist_name = row["name"]
-
-        # Check if the id-name pair exists in data["Stocklists"]
-        stocklist_exists = next((s for s in data["Stocklists"] if s["id"] == stocklist_id and s["name"] == stocklist_name), None)
-
-        # If it does not exist, create a new stocklist
-        if not stocklist_exists:
-            stocklist_exists = {
-                "id": stocklist_id,
-                "name": stocklist_name,
-                "items": []
-            }
-            data["Stocklists"].append(stocklist_exists)
-
-        # Create item and append to the corresponding stocklist
-        item = {
-            "name": row["itemName"],
-            "quantity": int(row["quantity"])
-        }
-        stocklist_exists["items"].append(item)
-
-# Write the JSON data to the output file
-with open(json_file_path, mode='w', encoding='utf-8') as json_file:
-    json.dump(data, json_file, ensure_ascii=False, indent=4)
-
-print("Stocklist CSV has been converted to JSON format successfully.")
\ No newline at end of file
+if __name__ == "__main__":
+    convert_stocklists(force="--force" in sys.argv, profile="compact" if "--compact" in sys.argv else None)
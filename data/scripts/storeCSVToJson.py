@@ -1,40 +1,49 @@
 import csv
-import json
 import os  # Ensure this import is at the top of your file
+import sys
+
+from buildManifest import Section, build_json_incrementally
+from instrumentation import counted_rows
 
 # Get the directory of the current script
 script_dir = os.path.dirname(os.path.abspath(__file__))
-
-# Define the input and output file paths with absolute paths
-stores_file_path = os.path.join(script_dir, '../store/stores.csv')
-json_file_path = os.path.join(script_dir, '../final/temp/Stores.json')
-
-
-# Initialize the data structure for JSON output
-data = {
-    "Stores": []
-}
-
-with open(stores_file_path, mode='r', encoding='utf-8') as csv_file:
-    csv_reader = csv.DictReader(csv_file)
-	# id,name,stocklistId,stocklistName,buyMultiplier,sellMultiplier,upgradeMultiplier,restockInterval
-
-    # Process each row in the CSV
-    for row in csv_reader:
-        store = {
-            "id": int(row["id"]),
-            "name": row["name"],
-            "stocklistId": row["stocklistId"],
-            "stocklistName": row["stocklistName"],
-            "buyMultiplier": float(row["buyMultiplier"]),
-            "sellMultiplier": float(row["sellMultiplier"]),
-            "upgradeMultiplier": float(row["upgradeMultiplier"]),
-            "restockInterval": int(row["restockInterval"])
-        }
-        data["Stores"].append(store)
-
-# Write the JSON data to the output file
-with open(json_file_path, mode='w', encoding='utf-8') as json_file:
-    json.dump(data, json_file, ensure_ascii=False, indent=4)
-
-print("Store CSV has been converted to JSON format successfully.")
\ No newline at end of file
+default_data_dir = os.path.join(script_dir, '..')
+
+
+def convert_stores(data_dir=default_data_dir, force=False, profile=None):
+    # Define the input and output file paths with absolute paths
+    stores_file_path = os.path.join(data_dir, 'store/stores.csv')
+    json_file_path = os.path.join(data_dir, 'final/temp/Stores.json')
+
+    def build_stores():
+        with open(stores_file_path, mode='r', encoding='utf-8') as csv_file:
+            csv_reader = csv.DictReader(csv_file)
+            # id,name,stocklistId,stocklistName,buyMultiplier,sellMultiplier,upgradeMultiplier,restockInterval
+
+            # Process each row in the CSV
+            for row in counted_rows(stores_file_path, csv_reader):
+                store = {
+                    "id": int(row["id"]),
+                    "name": row["name"],
+                    "stocklistId": row["stocklistId"],
+                    "stocklistName": row["stocklistName"],
+                    "buyMultiplier": float(row["buyMultiplier"]),
+                    "sellMultiplier": float(row["sellMultiplier"]),
+                    "upgradeMultiplier": float(row["upgradeMultiplier"]),
+                    "restockInterval": int(row["restockInterval"])
+                }
+                yield store
+
+    sections = [
+        Section(("Stores",), [stores_file_path], build_stores),
+    ]
+
+    if not build_json_incrementally(data_dir, json_file_path, sections, force=force, profile=profile):
+        print("Stores.json is up to date, skipped store CSV conversion.")
+        return
+
+    print("Store CSV has been converted to JSON format successfully.")
+
+
+if __name__ == "__main__":
+    convert_stores(force="--force" in sys.argv, profile="compact" if "--compact" in sys.argv else None)
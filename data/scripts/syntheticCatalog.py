@@ -0,0 +1,162 @@
+import csv
+import os
+import random
+import sys
+
+# Synthetic data directory with the layout of data/, for benchmarking the pipeline at catalog sizes we
+# do not have yet. Every reference is valid, so validateCatalog passes and every stage does its full work.
+# The same rows and seed always produce byte-identical files.
+
+# Relative paths the generated tables are written to, keyed like validateCatalog.TABLES
+TEMP_TABLES = {
+    "plants": 'items/placedItems/temp/plants.csv',
+    "decorations": 'items/placedItems/temp/decorations.csv',
+    "ground": 'items/placedItems/temp/ground.csv',
+    "shinyItemRates": 'items/placedItems/temp/shinyItemRates.csv',
+    "seeds": 'items/inventoryItems/temp/seeds.csv',
+    "harvested": 'items/inventoryItems/temp/harvested.csv',
+    "blueprints": 'items/inventoryItems/temp/blueprints.csv',
+    "tools": 'items/tools/temp/tools.csv',
+    "icons": 'user/temp/icons.csv',
+    "actionHistories": 'user/temp/actionHistories.csv',
+    "stocklist": 'store/stocklist.csv',
+    "stores": 'store/stores.csv',
+}
+
+ITEM_HEADER = ["id", "name", "icon", "type", "subtype", "category", "description", "value", "level"]
+HEADERS = {
+    "plants": ITEM_HEADER + ["transformId", "baseExp", "growTime", "repeatedGrowTime", "numHarvests"],
+    "decorations": ITEM_HEADER + ["transformId"],
+    "ground": ITEM_HEADER + ["transformId"],
+    "shinyItemRates": ["id", "name", "tier", "probability", "plantId"],
+    "seeds": ITEM_HEADER + ["transformId"],
+    "harvested": ITEM_HEADER,
+    "blueprints": ITEM_HEADER + ["transformId"],
+    "tools": ["id", "name", "type", "icon", "description", "value", "level"],
+    "icons": ["name", "icon", "type"],
+    "actionHistories": ["name", "description", "identifier"],
+    "stocklist": ["id", "name", "itemName", "quantity"],
+    "stores": ["id", "name", "stocklistId", "stocklistName", "buyMultiplier", "sellMultiplier", "upgradeMultiplier", "restockInterval"],
+}
+
+# Shiny tiers with their variant offset from the base item, probability and value multiplier
+SHINY_TIERS = [("bronze", 1, 0.6, 2), ("silver", 2, 0.3, 5), ("gold", 3, 0.1, 10)]
+
+# A plant uses its variant plus one per shiny tier, so base plants step through the variants by 4
+PLANT_VARIANT_STEP = 4
+# Category and item codes 01-98, 99 is reserved for the error items
+CODES = 98
+
+# Share of rows appended again to the temp item CSVs, which cleanCSVs has to remove
+DUPLICATE_RATE = 0.01
+STOCKLIST_SIZE = 100
+
+
+def code_id(type_code, subtype_code, index, variant_step=1):
+    """The index-th id of a subtype in type-subtype-category-item-variant order."""
+    variants = 99 // variant_step
+    variant = (index % variants) * variant_step
+    item = 1 + (index // variants) % CODES
+    category = 1 + index // (variants * CODES)
+    if category > CODES:
+        raise ValueError(f"Id space of subtype {subtype_code} exhausted at {index} items")
+    return f"{type_code}-{subtype_code}-{category:02d}-{item:02d}-{variant:02d}", category
+
+
+def generate_rows(rows):
+    """Rows per table for a catalog of about `rows` item rows, in id order."""
+    # Every plant brings a seed, a harvested item, its shiny variants and their rates: 9 rows
+    plant_count = max(1, rows * 8 // 90)
+    decoration_count = max(1, rows // 10)
+    tables = {name: [] for name in TEMP_TABLES}
+
+    tables["icons"].append(["error", "❌", "Error"])
+    tables["ground"].append(["0-00-00-00-00", "ground", "ground", "PlacedItem", "Ground", "Ground", "Error", 0, 0, "0-00-00-00-00"])
+    tables["icons"].append(["ground", "🟫", "Ground"])
+    for tool in range(1, 3):
+        tables["tools"].append([f"2-01-{tool:02d}-00-00", f"shovel {tool}", "Shovel", "shovel", "Error", 0, 0])
+    tables["icons"].append(["shovel", "🪏", "Tools"])
+
+    for index in range(plant_count):
+        plant_id, category = code_id("0", "02", index, PLANT_VARIANT_STEP)
+        suffix = plant_id[4:]
+        name = f"plant {index}"
+        icon = f"plant{index}"
+        category_name = f"Category {category:02d}"
+        value = 10 + index % 500
+        grow_time = 60 * (1 + index % 480)
+        tables["icons"].append([icon, "🌱", "Plants"])
+        tables["plants"].append([plant_id, name, icon, "PlacedItem", "Plant", category_name, "Error", value, 0,
+                                 f"1-03-{suffix}", 1 + index % 50, grow_time, grow_time // 2, 1 + index % 3])
+        tables["seeds"].append([f"1-01-{suffix}", f"{name} seed", icon, "InventoryItem", "Seed", category_name, "Error",
+                                max(1, value // 4), 0, plant_id])
+        tables["harvested"].append([f"1-03-{suffix}", name, icon, "InventoryItem", "HarvestedItem", category_name, "Error", value, 0])
+        for tier, offset, probability, multiplier in SHINY_TIERS:
+            shiny_id = f"1-03-{suffix[:-2]}{int(suffix[-2:]) + offset:02d}"
+            shiny_name = f"{tier.capitalize()} {name}"
+            tables["harvested"].append([shiny_id, shiny_name, icon, "InventoryItem", "HarvestedItem", category_name,
+                                        f"{tier} version of {name}", value * multiplier, 0])
+            tables["shinyItemRates"].append([shiny_id, shiny_name, tier, probability, plant_id])
+
+    for index in range(decoration_count):
+        decoration_id, category = code_id("0", "04", index)
+        suffix = decoration_id[4:]
+        name = f"decoration {index}"
+        icon = f"decoration{index}"
+        category_name = f"Category {category:02d}"
+        tables["icons"].append([icon, "🪑", "Decorations"])
+        tables["decorations"].append([decoration_id, name, icon, "PlacedItem", "Decoration", category_name, "Error",
+                                      100 + index % 1000, 0, f"1-05-{suffix}"])
+        tables["blueprints"].append([f"1-05-{suffix}", f"{name} blueprint", icon, "InventoryItem", "Blueprint", category_name,
+                                     "Error", 100 + index % 1000, 0, decoration_id])
+
+    for index in range(max(1, rows // 100)):
+        tables["actionHistories"].append([f"Action {index}", f"Synthetic action history {index}", f"plant:action{index}:harvested"])
+
+    # Stocklists sell seeds and blueprints, one store per stocklist
+    for_sale = [row[1] for row in tables["seeds"]] + [row[1] for row in tables["blueprints"]]
+    for stocklist in range(max(1, len(for_sale) // STOCKLIST_SIZE)):
+        stocklist_name = f"Stocklist {stocklist}"
+        for item_name in for_sale[stocklist * STOCKLIST_SIZE:(stocklist + 1) * STOCKLIST_SIZE]:
+            tables["stocklist"].append([stocklist, stocklist_name, item_name, 25])
+        tables["stores"].append([stocklist, f"Store {stocklist}", stocklist, stocklist_name, 2, 1, 1, 300000])
+    return tables
+
+
+def scramble(name, rows, seed):
+    """Temp CSVs are appended to over time, so they are written out of order and with some duplicates."""
+    rng = random.Random(f"{seed}:{name}")
+    duplicates = [rows[rng.randrange(len(rows))] for _ in range(int(len(rows) * DUPLICATE_RATE))]
+    rows = rows + duplicates
+    rng.shuffle(rows)
+    return rows
+
+
+def generate_catalog(data_dir, rows, seed=0):
+    """Write a synthetic catalog of about `rows` item rows to data_dir. Returns the row count per table."""
+    tables = generate_rows(rows)
+    counts = {}
+    for name, relative_path in TEMP_TABLES.items():
+        table_rows = tables[name]
+        # Store CSVs have no temp copy and are read as they are, the rest go through cleanCSVs
+        if name not in ("stocklist", "stores"):
+            table_rows = scramble(name, table_rows, seed)
+        file_path = os.path.join(data_dir, relative_path)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, mode='w', encoding='utf-8', newline='') as csv_file:
+            writer = csv.writer(csv_file, lineterminator='\n')
+            writer.writerow(HEADERS[name])
+            writer.writerows(table_rows)
+        counts[name] = len(table_rows)
+
+    for directory in ['items/placedItems/final', 'items/inventoryItems/final', 'items/tools/final', 'user/final', 'final/temp']:
+        os.makedirs(os.path.join(data_dir, directory), exist_ok=True)
+    return counts
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print(f"Usage: python {os.path.basename(__file__)} <output data dir> <rows> [seed]", file=sys.stderr)
+        sys.exit(2)
+    counts = generate_catalog(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]) if len(sys.argv) > 3 else 0)
+    print(f"Generated {sum(counts.values())} rows in {sys.argv[1]}.")
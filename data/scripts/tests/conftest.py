@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The tests import the scripts the same way the scripts import each other
+scripts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+for path in (scripts_dir, os.path.join(scripts_dir, 'createItems'), os.path.join(scripts_dir, '..', 'items')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
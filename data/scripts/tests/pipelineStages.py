@@ -0,0 +1,23 @@
+# Stage functions for test_pipeline, in a module of their own so worker processes can import them
+
+class UnpicklableError(Exception):
+    """Like an exception whose __init__ takes other arguments than it passes on: unpickling it fails."""
+
+    def __init__(self, file_path, line):
+        super().__init__(f"{file_path}:{line}: broken")
+
+
+def fail(data_dir):
+    raise UnpicklableError("plants.csv", 3)
+
+
+def succeed(data_dir):
+    with open(f"{data_dir}/succeeded.txt", mode='a', encoding='utf-8') as file:
+        file.write("ok\n")
+
+
+def bad_csv(data_dir):
+    from csvSchema import CsvSchema, Field, read_records
+
+    schema = CsvSchema("counts", f"{data_dir}/counts.csv", [Field("count", "int")])
+    return list(read_records(schema, schema.path))
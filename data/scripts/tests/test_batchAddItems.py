@@ -0,0 +1,45 @@
+import copy
+
+import pytest
+
+from addPlantToCSV import plantData
+from batchAddItems import buildBatchRows, validateEntry
+
+
+def plant(**changes):
+    entry = copy.deepcopy(plantData)
+    entry.update(changes)
+    return entry
+
+
+def test_example_plant_is_valid():
+    assert validateEntry("plants", plant()) == []
+
+
+@pytest.mark.parametrize("shiny_ids", [["bronze", "silver"], "bronze", None, 0.6])
+def test_shiny_ids_that_are_not_a_dict_are_reported(shiny_ids):
+    (error,) = validateEntry("plants", plant(shinyIds=shiny_ids))
+    assert error.startswith("shinyIds must map tier names")
+
+
+def test_malformed_shiny_tiers_are_reported():
+    errors = validateEntry("plants", plant(shinyIds={
+        "bronze": "01",
+        "silver": {"idSuffix": "02"},
+        "gold": {"probability": "0.1", "idSuffix": "03"},
+    }))
+    assert errors == [
+        "shiny tier 'bronze' needs probability and idSuffix",
+        "shiny tier 'silver' needs probability and idSuffix",
+        "shiny tier 'gold' probability must be a number, got '0.1'",
+    ]
+
+
+def test_batch_reports_instead_of_raising():
+    spec = {"plants": [plant(name="odd", shinyIds=["bronze"]), plant(name="tiers", shinyIds={"bronze": []})]}
+    rows, errors = buildBatchRows(spec)
+    assert rows == {}
+    assert errors == [
+        "plants[0] (odd): shinyIds must map tier names to {probability, idSuffix}, got list",
+        "plants[1] (tiers): shiny tier 'bronze' needs probability and idSuffix",
+    ]
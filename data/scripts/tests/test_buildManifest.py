@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+import buildManifest
+from buildManifest import BuildManifest, Section, build_json_incrementally
+
+
+def write_input(path, rows):
+    path.write_text('\n'.join(rows) + '\n', encoding='utf-8')
+
+
+def read_rows(path):
+    return [{"name": row} for row in path.read_text(encoding='utf-8').split()]
+
+
+def build(data_dir, output, seeds, tools, profile):
+    sections = [
+        Section(("Items", "Seeds"), [str(seeds)], lambda: read_rows(seeds)),
+        Section(("Items", "Tools"), [str(tools)], lambda: iter(read_rows(tools))),
+        Section(("Meta",), [str(tools)], lambda: {"tools": len(read_rows(tools))}),
+    ]
+    return build_json_incrementally(str(data_dir), str(output), sections, profile=profile)
+
+
+@pytest.mark.parametrize("profile", ["pretty", "compact"])
+def test_splice_copies_unchanged_sections_without_parsing_the_output(tmp_path, monkeypatch, profile):
+    seeds, tools, output = tmp_path / 'seeds.csv', tmp_path / 'tools.csv', tmp_path / 'Items.json'
+    write_input(seeds, ["apple", "bean", "crème"])
+    write_input(tools, ["hoe"])
+    assert build(tmp_path, output, seeds, tools, profile) == ["Items/Seeds", "Items/Tools", "Meta"]
+
+    load = json.load
+
+    def load_all_but_output(file, **kwargs):
+        assert file.name != str(output), "the previous output was parsed"
+        return load(file, **kwargs)
+    monkeypatch.setattr(buildManifest.json, 'load', load_all_but_output)
+    write_input(tools, ["hoe", "rake", "ça"])
+    assert build(tmp_path, output, seeds, tools, profile) == ["Items/Tools", "Meta"]
+    monkeypatch.undo()
+
+    spliced = output.read_bytes()
+    expected = {"Items": {"Seeds": read_rows(seeds), "Tools": read_rows(tools)}, "Meta": {"tools": 3}}
+    assert json.loads(spliced) == expected
+    for path in (output, tmp_path / 'final/.buildCache/Items.json.manifest.json'):
+        path.unlink()
+    build(tmp_path, output, seeds, tools, profile)
+    assert output.read_bytes() == spliced
+
+    manifest = BuildManifest(str(tmp_path), 'Items.json')
+    start, end, count = manifest.section_layout("Items/Seeds")
+    assert count == 3
+    assert json.loads(spliced[start:end]) == read_rows(seeds)
@@ -0,0 +1,39 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from catalogBinary import CatalogReader, convert_items_to_binary, find_sections, verify_catalog
+from itemCSVToJson import convert_items, default_data_dir
+
+
+@pytest.fixture(scope="module")
+def catalog_dir(tmp_path_factory):
+    """Items.json and Items.bin built from the final CSVs into a scratch data directory."""
+    data_dir = tmp_path_factory.mktemp("data")
+    shutil.copytree(os.path.join(default_data_dir, 'items'), data_dir / 'items')
+    os.makedirs(data_dir / 'final' / 'temp')
+    convert_items(str(data_dir), force=True, workers=1)
+    convert_items_to_binary(str(data_dir), force=True)
+    return data_dir / 'final' / 'temp'
+
+
+def test_binary_decodes_to_items_json(catalog_dir):
+    assert verify_catalog(catalog_dir / 'Items.json', catalog_dir / 'Items.bin')
+
+
+def test_single_records_decode_lazily(catalog_dir):
+    with open(catalog_dir / 'Items.json', mode='r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    with CatalogReader(catalog_dir / 'Items.bin') as reader:
+        for path, records in find_sections(data):
+            section = reader.section(*path)
+            assert len(section) == len(records)
+            # Back to front, so no record is decoded on the way to another
+            for position in reversed(range(len(records))):
+                assert section[position] == records[position]
+
+
+def test_binary_is_smaller_than_json(catalog_dir):
+    assert os.path.getsize(catalog_dir / 'Items.bin') < os.path.getsize(catalog_dir / 'Items.json')
@@ -0,0 +1,60 @@
+import filecmp
+import json
+
+import pytest
+
+from catalogDiff import CATALOG_FILES, apply_patch, diff_catalogs, encode_document
+
+
+def write_build(directory, items, stocklists, stores=None):
+    directory.mkdir()
+    documents = {"Items.json": items, "Stocklists.json": stocklists, "Stores.json": stores}
+    for filename, document in documents.items():
+        if document is not None:
+            (directory / filename).write_text(encode_document(document, "pretty"), encoding='utf-8')
+    return directory
+
+
+@pytest.fixture
+def builds(tmp_path):
+    items = {"PlacedItems": {"Plants": [{"id": "0-02-01-01-00", "name": "garlic", "value": 15}]}}
+    stocklists = [{"id": "1", "items": [{"name": "garlic seed", "quantity": 10}]}]
+    old_dir = write_build(tmp_path / 'old', items, stocklists)
+    items = json.loads(json.dumps(items))
+    items["PlacedItems"]["Plants"][0]["value"] = 16
+    new_dir = write_build(tmp_path / 'new', items, stocklists)
+    patch = json.loads(json.dumps(diff_catalogs(old_dir, new_dir)))
+    assert list(patch["files"]) == ["Items.json"]
+    return old_dir, new_dir, patch
+
+
+def assert_same_build(directory, new_dir):
+    for filename in CATALOG_FILES:
+        assert (directory / filename).exists() == (new_dir / filename).exists(), filename
+        if (new_dir / filename).exists():
+            assert filecmp.cmp(directory / filename, new_dir / filename, shallow=False), filename
+
+
+def test_patch_applied_to_another_directory_writes_the_whole_build(builds, tmp_path):
+    old_dir, new_dir, patch = builds
+    target = tmp_path / 'target'
+    target.mkdir()
+    # A catalog file neither build has is not left behind
+    (target / 'Stores.json').write_text("{}", encoding='utf-8')
+    apply_patch(old_dir, patch, target)
+    assert_same_build(target, new_dir)
+    assert sorted(path.name for path in target.iterdir()) == ["Items.json", "Stocklists.json"]
+
+
+def test_patch_applied_in_place(builds):
+    old_dir, new_dir, patch = builds
+    apply_patch(old_dir, patch, old_dir)
+    assert_same_build(old_dir, new_dir)
+
+
+def test_patch_refuses_another_base(builds, tmp_path):
+    old_dir, new_dir, patch = builds
+    target = tmp_path / 'target'
+    with pytest.raises(ValueError):
+        apply_patch(new_dir, patch, target)
+    assert not target.exists()
@@ -0,0 +1,45 @@
+import os
+import shutil
+
+import pytest
+
+from catalogBinary import convert_items_to_binary
+from catalogIndex import ItemIndex, build_index, convert_items_to_index
+from itemCSVToJson import convert_items, default_data_dir
+
+
+def test_names_repeated_across_sections_keep_every_id():
+    data = {
+        "PlacedItems": {"Plants": [{"id": "0-02-01-01-00", "name": "garlic"}]},
+        "InventoryItems": {"HarvestedItems": [
+            {"id": "1-03-01-01-00", "name": "garlic"},
+            {"id": "1-03-01-01-01", "name": "Bronze garlic"},
+        ]},
+    }
+    assert build_index(data)["names"] == {
+        "garlic": ["0-02-01-01-00", "1-03-01-01-00"],
+        "Bronze garlic": ["1-03-01-01-01"],
+    }
+
+
+@pytest.fixture(scope="module")
+def item_index(tmp_path_factory):
+    """ItemIndex over Items.index.json and Items.bin built from the final CSVs into a scratch data directory."""
+    data_dir = tmp_path_factory.mktemp("data")
+    shutil.copytree(os.path.join(default_data_dir, 'items'), data_dir / 'items')
+    os.makedirs(data_dir / 'final' / 'temp')
+    convert_items(str(data_dir), force=True, workers=1)
+    convert_items_to_binary(str(data_dir), force=True)
+    convert_items_to_index(str(data_dir), force=True)
+    index = ItemIndex(str(data_dir / 'final' / 'temp' / 'Items.index.json'))
+    yield index
+    index.close()
+
+
+def test_plant_and_harvest_with_the_same_name(item_index):
+    assert item_index.ids_for_name("garlic") == ["0-02-01-01-00", "1-03-01-01-00"]
+    assert item_index.id_for_name("garlic") == "0-02-01-01-00"
+    harvested = item_index.get_by_name("garlic", ("InventoryItems", "HarvestedItems"))
+    assert harvested["id"] == "1-03-01-01-00" and harvested["subtype"] == "HarvestedItem"
+    assert item_index.get_by_name("garlic", ("Tools",)) is None
+    assert item_index.ids_for_name("no such item") == []
@@ -0,0 +1,37 @@
+import json
+import os
+import pickle
+
+import pytest
+
+from csvSchema import CsvSchema, CsvSchemaError, Field, read_records
+from pipeline import Stage, run_pipeline
+
+
+def test_schema_error_survives_pickling():
+    error = CsvSchemaError("items/plants.csv", 7, "column 'value' expected int, got 'ten'")
+    copy = pickle.loads(pickle.dumps(error))
+    assert type(copy) is CsvSchemaError
+    assert (copy.file_path, copy.line, copy.message) == (error.file_path, error.line, error.message)
+    assert str(copy) == str(error) == "items/plants.csv:7: column 'value' expected int, got 'ten'"
+
+
+def test_schema_error_reports_file_and_line(tmp_path):
+    csv_path = tmp_path / 'counts.csv'
+    csv_path.write_text("count\n1\nten\n", encoding='utf-8')
+    with pytest.raises(CsvSchemaError) as raised:
+        list(read_records(CsvSchema("counts", str(csv_path), [Field("count", "int")]), str(csv_path)))
+    assert raised.value.line == 3
+
+
+@pytest.mark.parametrize("use_processes", [True, False])
+def test_schema_error_is_reported_by_the_pipeline(tmp_path, use_processes):
+    (tmp_path / 'counts.csv').write_text("count\n1\nten\n", encoding='utf-8')
+    stages = [Stage("counts", "pipelineStages", "bad_csv")]
+    assert run_pipeline(stages, str(tmp_path), use_processes=use_processes) == 1
+
+    with open(os.path.join(tmp_path, 'final/.buildCache/runReport.json'), mode='r', encoding='utf-8') as report_file:
+        (report,) = json.load(report_file)["stages"]
+    assert report["status"] == "failed"
+    assert report["errorType"] == "csvSchema.CsvSchemaError"
+    assert "counts.csv:3: column 'count' expected int, got 'ten'" in report["error"]
@@ -0,0 +1,48 @@
+import csv
+import glob
+import os
+
+import pytest
+
+from idCodec import default_data_dir, load_codec, natural_id_key
+
+# Every final item CSV; the tables are keyed by id
+FINAL_CSVS = sorted(glob.glob(os.path.join(default_data_dir, 'items', '**', 'final', '*.csv'), recursive=True))
+
+
+def final_ids():
+    for file_path in FINAL_CSVS:
+        with open(file_path, mode='r', encoding='utf-8', newline='') as csv_file:
+            for row in csv.DictReader(csv_file):
+                yield os.path.relpath(file_path, default_data_dir), row["id"]
+
+
+@pytest.fixture(scope="module")
+def codec():
+    return load_codec()
+
+
+def test_final_csvs_found():
+    assert FINAL_CSVS
+
+
+@pytest.mark.parametrize("file_path, item_id", list(final_ids()))
+def test_decode_encode_round_trip(codec, file_path, item_id):
+    decoded = codec.decode(item_id)
+    if None not in decoded:
+        assert codec.encode(*decoded) == item_id
+    else:
+        # Ground and tools ids stop at the parts the category files name
+        names = [name for name in decoded[:4] if name is not None]
+        assert item_id.startswith(codec.prefix(*names) + '-')
+        assert decoded.variant == item_id[11:]
+
+
+def test_unknown_id_is_rejected(codec):
+    with pytest.raises(ValueError):
+        codec.decode("9-99-99-99-99")
+
+
+def test_natural_id_key_orders_codes_numerically():
+    assert sorted(["0-02-100-01-00", "0-02-10-01-00", "0-02-09-01-00"], key=natural_id_key) == [
+        "0-02-09-01-00", "0-02-10-01-00", "0-02-100-01-00"]
@@ -0,0 +1,70 @@
+import time
+
+from itemCatalog import HARVESTED_ITEMS, Catalog
+
+ITEMS = 20000
+
+
+def harvested(number, **fields):
+    item = {
+        "id": f"1-03-{number:05d}-00",
+        "name": f"crop {number}",
+        "icon": "crop",
+        "type": "InventoryItem",
+        "subtype": "HarvestedItem",
+        "category": "Onion",
+        "description": "Error",
+        "value": 100,
+        "level": 0,
+    }
+    item.update(fields)
+    return item
+
+
+def large_catalog():
+    # One category and level for every item, so their index buckets hold the whole section
+    return Catalog({"InventoryItems": {"HarvestedItems": [harvested(number) for number in range(ITEMS)]}})
+
+
+def test_updating_thousands_of_items_takes_bounded_time():
+    catalog = large_catalog()
+    items = catalog.section(*HARVESTED_ITEMS)
+    start = time.perf_counter()
+    # Back to front, the worst case for scanning buckets and sections from the front
+    for item in reversed(items):
+        catalog.update(item, value=item.value * 2)
+    for item in reversed(items[::2]):
+        catalog.update(item, level=5)
+    for number in range(ITEMS - 1, 0, -4):
+        catalog.upsert(HARVESTED_ITEMS, harvested(number, value=1))
+    # Quadratic bucket and section scans take minutes here, a linear pass well under a second
+    assert time.perf_counter() - start < 5
+
+    assert len(catalog.where('category', 'Onion')) == ITEMS
+    assert [item.id for item in catalog.where('level', 5)] == [item.id for item in reversed(items[::2])]
+    # Replaced items go to the end of their buckets
+    assert sorted(item.id for item in catalog.where('level', 0)) == [item.id for item in items[1::2]]
+    assert [item.value for item in items[:4]] == [200, 200, 200, 1]
+    assert catalog.get(items[4].id) is items[4]
+
+
+def test_updates_keep_indexes_and_positions_in_step():
+    catalog = large_catalog()
+    items = catalog.section(*HARVESTED_ITEMS)
+    item = items[10]
+    assert not catalog.update(item, value=100)
+    assert catalog.update(item, name="garlic", id="1-03-99999-00")
+    assert catalog.item_named("garlic") is item
+    assert catalog.where('name', "crop 10") == []
+    assert catalog.get("1-03-99999-00") is item and catalog.get(harvested(10)["id"]) is None
+
+    replacement = catalog.upsert(HARVESTED_ITEMS, harvested(10, id="1-03-99999-00", name="garlic", value=7), match='name')
+    assert items[10] is replacement and len(items) == ITEMS
+    assert catalog.item_named("garlic").value == 7
+
+    # Reordered behind the catalog's back, upsert still finds the item it replaces
+    items.reverse()
+    replacement = catalog.upsert(HARVESTED_ITEMS, harvested(0, value=3))
+    assert items[-1] is replacement
+    appended = catalog.upsert(HARVESTED_ITEMS, harvested(ITEMS))
+    assert items[-1] is appended and len(items) == ITEMS + 1
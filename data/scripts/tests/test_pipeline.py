@@ -0,0 +1,28 @@
+import json
+import os
+
+import pytest
+
+from pipeline import Stage, run_pipeline
+
+
+@pytest.mark.parametrize("use_processes", [True, False])
+def test_failing_stage_does_not_fail_its_siblings(tmp_path, use_processes):
+    stages = [
+        Stage("broken", "pipelineStages", "fail"),
+        Stage("first", "pipelineStages", "succeed"),
+        Stage("second", "pipelineStages", "succeed"),
+        Stage("after", "pipelineStages", "succeed", depends_on=["broken"]),
+    ]
+    assert run_pipeline(stages, str(tmp_path), max_workers=2, use_processes=use_processes) == 1
+
+    with open(os.path.join(tmp_path, 'final/.buildCache/runReport.json'), mode='r', encoding='utf-8') as report_file:
+        report = json.load(report_file)
+    statuses = {stage["name"]: stage["status"] for stage in report["stages"]}
+    assert statuses == {"broken": "failed", "first": "succeeded", "second": "succeeded"}
+    assert report["skipped"] == ["after"]
+    broken = next(stage for stage in report["stages"] if stage["name"] == "broken")
+    assert broken["errorType"].endswith("UnpicklableError")
+    assert "plants.csv:3: broken" in broken["error"]
+    assert "plants.csv:3: broken" in broken["traceback"]
+    assert (tmp_path / 'succeeded.txt').read_text(encoding='utf-8') == "ok\nok\n"
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from publishCatalog import CARRIED_FILES, PIPELINE_FILES, live_version, publish, rollback
+
+
+def write_files(directory, filenames, content):
+    os.makedirs(directory, exist_ok=True)
+    for filename in filenames:
+        (directory / filename).write_text(f'{{"build": "{content}"}}\n', encoding='utf-8')
+
+
+def contents(directory):
+    return {path.name: path.read_text(encoding='utf-8') for path in directory.iterdir()}
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    # final/current starts out as the checked in build
+    write_files(tmp_path / 'final' / 'current', PIPELINE_FILES + CARRIED_FILES, "checked in")
+    return tmp_path
+
+
+def build(data_dir, content):
+    write_files(data_dir / 'final' / 'temp', PIPELINE_FILES, content)
+
+
+def test_publish_swaps_files_into_the_current_directory(data_dir):
+    current = data_dir / 'final' / 'current'
+    checked_in = contents(current)
+    build(data_dir, "first")
+    version = publish(str(data_dir))
+
+    assert current.is_dir() and not current.is_symlink()
+    assert sorted(contents(current)) == sorted(PIPELINE_FILES + CARRIED_FILES)
+    assert contents(current)["Items.json"] == '{"build": "first"}\n'
+    assert contents(current)["SVGIcons.json"] == checked_in["SVGIcons.json"]
+    assert live_version(str(data_dir / 'final')) == version
+    assert publish(str(data_dir)) is None
+
+
+def test_missing_pipeline_file_refuses_to_publish(data_dir):
+    current = data_dir / 'final' / 'current'
+    checked_in = contents(current)
+    build(data_dir, "partial")
+    os.remove(data_dir / 'final' / 'temp' / 'Stores.json')
+    with pytest.raises(ValueError, match="Stores.json"):
+        publish(str(data_dir))
+    assert contents(current) == checked_in
+    assert not (data_dir / 'final' / 'snapshots').exists()
+
+
+def test_rollback_walks_back_through_the_history(data_dir):
+    current = data_dir / 'final' / 'current'
+    checked_in = contents(current)
+    final_dir = str(data_dir / 'final')
+    versions = [live_version(final_dir)]
+    for content in ("first", "second", "third"):
+        build(data_dir, content)
+        versions.append(publish(str(data_dir)))
+
+    assert rollback(str(data_dir)) == versions[2]
+    assert contents(current)["Items.json"] == '{"build": "second"}\n'
+    assert rollback(str(data_dir)) == versions[1]
+    assert rollback(str(data_dir)) == versions[0]
+    assert contents(current) == checked_in
+    with pytest.raises(ValueError):
+        rollback(str(data_dir))
+
+    # Publishing after a rollback continues from the version rolled back to
+    build(data_dir, "fourth")
+    fourth = publish(str(data_dir))
+    assert rollback(str(data_dir), versions[3]) == versions[3]
+    assert rollback(str(data_dir)) == fourth
+    assert rollback(str(data_dir)) == versions[0]
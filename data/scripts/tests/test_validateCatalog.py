@@ -0,0 +1,11 @@
+import pickle
+
+from validateCatalog import ReferentialIntegrityError
+
+
+def test_integrity_error_survives_pickling():
+    violations = ["store/stocklist.csv:4: itemName 'garlic' not found in plants.name"]
+    copy = pickle.loads(pickle.dumps(ReferentialIntegrityError(violations)))
+    assert type(copy) is ReferentialIntegrityError
+    assert copy.violations == violations
+    assert str(copy) == "1 broken reference(s) in the catalog"
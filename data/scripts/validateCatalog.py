@@ -0,0 +1,134 @@
+import csv
+import os
+import sys
+
+from instrumentation import record_rows_read
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# Every table the catalog references, relative to the data directory
+TABLES = {
+    "plants": 'items/placedItems/final/plants.csv',
+    "decorations": 'items/placedItems/final/decorations.csv',
+    "ground": 'items/placedItems/final/ground.csv',
+    "shinyItemRates": 'items/placedItems/final/shinyItemRates.csv',
+    "seeds": 'items/inventoryItems/final/seeds.csv',
+    "harvested": 'items/inventoryItems/final/harvested.csv',
+    "blueprints": 'items/inventoryItems/final/blueprints.csv',
+    "tools": 'items/tools/final/tools.csv',
+    "icons": 'user/final/icons.csv',
+    "stocklist": 'store/stocklist.csv',
+    "stores": 'store/stores.csv',
+}
+
+# Tables kept in memory between runs by long-running callers such as watchCatalog.py, keyed by path
+# with the file's (mtime, size) so only changed CSVs are read again; None disables it
+table_cache = None
+
+ITEM_TABLES = ["plants", "decorations", "ground", "seeds", "harvested", "blueprints", "tools"]
+
+# (referencing table, column, [(referenced table, column), ...]); a value must exist in one of the targets
+RELATIONSHIPS = [
+    ("seeds", "transformId", [("plants", "id")]),
+    ("plants", "transformId", [("harvested", "id")]),
+    ("decorations", "transformId", [("blueprints", "id")]),
+    ("blueprints", "transformId", [("decorations", "id")]),
+    ("ground", "transformId", [("ground", "id")]),
+    ("shinyItemRates", "plantId", [("plants", "id")]),
+    ("shinyItemRates", "id", [("harvested", "id")]),
+    ("stocklist", "itemName", [(table, "name") for table in ITEM_TABLES]),
+    ("stores", "stocklistId", [("stocklist", "id")]),
+] + [(table, "icon", [("icons", "name")]) for table in ITEM_TABLES]
+
+
+class ReferentialIntegrityError(Exception):
+    def __init__(self, violations):
+        super().__init__(f"{len(violations)} broken reference(s) in the catalog")
+        self.violations = violations
+
+    def __reduce__(self):
+        # Exceptions unpickle by calling the class with self.args, which only hold the summary
+        return (type(self), (self.violations,))
+
+
+class Table:
+    """A CSV loaded once as columns, with a hash set per column built on first use."""
+
+    def __init__(self, name, file_path):
+        self.name = name
+        self.file_path = file_path
+        with open(file_path, mode='r', encoding='utf-8', newline='') as csv_file:
+            csv_reader = csv.reader(csv_file)
+            self.header = next(csv_reader, [])
+            rows = []
+            self.lines = []
+            for row in csv_reader:
+                # DictReader skips blank lines, so the converters never see them either
+                if not row:
+                    continue
+                rows.append(row)
+                self.lines.append(csv_reader.line_num)
+        record_rows_read(file_path, len(rows))
+        self.columns = {
+            column: [row[index] if index < len(row) else '' for row in rows]
+            for index, column in enumerate(self.header)
+        }
+        self.key_sets = {}
+
+    def keys(self, column):
+        if column not in self.key_sets:
+            self.key_sets[column] = set(self.columns.get(column, ()))
+        return self.key_sets[column]
+
+
+def load_table(name, file_path):
+    if table_cache is None:
+        return Table(name, file_path)
+    stat = os.stat(file_path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = table_cache.get(file_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    table = Table(name, file_path)
+    table_cache[file_path] = (signature, table)
+    return table
+
+
+def find_violations(tables):
+    violations = []
+    for source_name, column, targets in RELATIONSHIPS:
+        source = tables[source_name]
+        if column not in source.columns:
+            violations.append(f"{source.file_path}:1: missing column '{column}'")
+            continue
+
+        # One union of the target key sets per relationship, then a single pass over the column
+        target_keys = set()
+        for target_name, target_column in targets:
+            target_keys |= tables[target_name].keys(target_column)
+        target_label = ' or '.join(f"{target_name}.{target_column}" for target_name, target_column in targets)
+
+        for line, value in zip(source.lines, source.columns[column]):
+            if value not in target_keys:
+                violations.append(f"{source.file_path}:{line}: {column} '{value}' not found in {target_label}")
+    return violations
+
+
+def validate_catalog(data_dir=default_data_dir):
+    tables = {name: load_table(name, os.path.normpath(os.path.join(data_dir, path))) for name, path in TABLES.items()}
+    violations = find_violations(tables)
+    if violations:
+        for violation in violations:
+            print(violation, file=sys.stderr)
+        raise ReferentialIntegrityError(violations)
+    print(f"Catalog references are valid ({len(RELATIONSHIPS)} relationships checked).")
+
+
+if __name__ == "__main__":
+    try:
+        validate_catalog()
+    except ReferentialIntegrityError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
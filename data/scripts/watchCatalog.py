@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+
+import buildManifest
+import validateCatalog
+from cleanCSVs import CLEANED_DIRECTORIES, clean_csv
+from deltaSync import files_differ, publish_file
+from pipeline import converter_build_stages, run_pipeline, stages_for_changes
+
+# Get the directory of the current script
+script_dir = os.path.dirname(os.path.abspath(__file__))
+default_data_dir = os.path.join(script_dir, '..')
+
+# CSV directories polled for changes, relative to the data directory
+WATCHED_DIRECTORIES = ['items', 'store', 'user']
+
+DEFAULT_INTERVAL = 0.1
+# A burst of saves is handled as one change once no file changed for this long
+DEFAULT_DEBOUNCE = 0.2
+
+
+def relative(data_dir, path):
+    return os.path.relpath(path, data_dir).replace(os.sep, '/')
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def snapshot(data_dir):
+    """(mtime, size) of every CSV under the watched directories, keyed by path relative to data_dir."""
+    signatures = {}
+    for directory in WATCHED_DIRECTORIES:
+        for root, _, filenames in os.walk(os.path.join(data_dir, directory)):
+            for filename in filenames:
+                if filename.endswith('.csv'):
+                    path = os.path.join(root, filename)
+                    signature = file_signature(path)
+                    if signature is not None:
+                        signatures[relative(data_dir, path)] = signature
+    return signatures
+
+
+def changed_paths(before, after):
+    return {path for path in before.keys() | after.keys() if before.get(path) != after.get(path)}
+
+
+def promote_temp_files(data_dir, changed):
+    """Clean the changed temp CSVs and copy them over their final CSV, like cleanCSVs and copyTempToFinal.
+
+    Returns the final paths that now differ, and every path this wrote to.
+    """
+    promoted = set()
+    written = set()
+    for path in sorted(changed):
+        directory = os.path.dirname(path)
+        if directory not in CLEANED_DIRECTORIES:
+            continue
+        source_path = os.path.join(data_dir, path)
+        if not os.path.exists(source_path):
+            continue
+        if clean_csv(source_path):
+            written.add(path)
+        final_path = os.path.join(os.path.dirname(directory), 'final', os.path.basename(path)).replace(os.sep, '/')
+        destination_path = os.path.join(data_dir, final_path)
+        if files_differ(source_path, destination_path):
+            publish_file(source_path, destination_path)
+            promoted.add(final_path)
+            written.add(final_path)
+    return promoted, written
+
+
+def rebuild(data_dir, changed):
+    """Rerun only the stages reading the changed CSVs. Returns the paths written by the promotion step."""
+    start = time.perf_counter()
+    promoted, written = promote_temp_files(data_dir, changed)
+    stages = stages_for_changes(converter_build_stages(), changed | promoted)
+    if not stages:
+        return written
+    status = run_pipeline(stages, data_dir, use_processes=False)
+    elapsed = (time.perf_counter() - start) * 1000
+    names = ', '.join(stage.name for stage in stages)
+    outcome = "Rebuilt" if status == 0 else "Failed to rebuild"
+    print(f"{outcome} {names} for {', '.join(sorted(changed))} in {elapsed:.0f}ms.")
+    return written
+
+
+def watch(data_dir=default_data_dir, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+    """Poll the CSV directories and rebuild the affected outputs until interrupted.
+
+    Parsed validation tables and built JSON sections stay in memory between rebuilds, so a change
+    only pays for the CSVs it touched.
+    """
+    validateCatalog.table_cache = {}
+    buildManifest.section_cache = {}
+
+    # Bring every output up to date once, which also fills the caches. Stages run in threads so
+    # the caches stay in this process.
+    run_pipeline(converter_build_stages(), data_dir, use_processes=False)
+    known = snapshot(data_dir)
+    print(f"Watching {', '.join(WATCHED_DIRECTORIES)} for CSV changes, press Ctrl+C to stop.")
+
+    try:
+        while True:
+            time.sleep(interval)
+            current = snapshot(data_dir)
+            changed = changed_paths(known, current)
+            if not changed:
+                continue
+
+            # Wait for the burst of saves to settle before rebuilding
+            quiet_since = time.monotonic()
+            while time.monotonic() - quiet_since < debounce:
+                time.sleep(interval)
+                latest = snapshot(data_dir)
+                if latest != current:
+                    changed |= changed_paths(current, latest)
+                    current = latest
+                    quiet_since = time.monotonic()
+
+            known = current
+            written = rebuild(data_dir, changed)
+            # Our own writes are not edits; files someone else saved meanwhile are still picked up next poll
+            for path in written:
+                known[path] = file_signature(os.path.join(data_dir, path))
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+def argument_value(name, default):
+    if name in sys.argv:
+        return sys.argv[sys.argv.index(name) + 1]
+    return default
+
+
+if __name__ == "__main__":
+    watch(
+        interval=float(argument_value("--interval", DEFAULT_INTERVAL)),
+        debounce=float(argument_value("--debounce", DEFAULT_DEBOUNCE)),
+    )
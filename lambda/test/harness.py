@@ -0,0 +1,60 @@
+import os
+import statistics
+import sys
+import time
+
+# Invokes lambda_function in-process to measure cold and warm latency without AWS.
+# Usage: python harness.py [invocations] [catalog dir]
+
+handler_dir = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_INVOCATIONS = 1000
+
+
+def sample_events(handler_module):
+    """One event per kind of lookup, against ids that exist in the catalog."""
+    records = handler_module.get_catalog().records
+    item_ids = sorted(records["items"])
+    events = [
+        ("item", {"path": f"/items/{item_ids[0]}"}),
+        ("batch", {"path": "/items", "queryStringParameters": {"ids": ','.join(item_ids[:20])}}),
+        ("section", {"path": f"/sections/{next(iter(records['sections']))}"}),
+        ("store", {"path": f"/stores/{next(iter(records['stores']))}"}),
+        ("stocklist", {"path": f"/stocklists/{next(iter(records['stocklists']))}"}),
+    ]
+    # The same item again from a client that already has it
+    etag = handler_module.lambda_handler(events[0][1], None)["headers"]["ETag"]
+    events.append(("notModified", {"path": events[0][1]["path"], "headers": {"If-None-Match": etag}}))
+    return events
+
+
+def measure(function):
+    start = time.perf_counter()
+    result = function()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run(invocations=DEFAULT_INVOCATIONS):
+    if handler_dir not in sys.path:
+        sys.path.insert(0, handler_dir)
+
+    # Cold start: importing the handler module and the first invocation, which loads the catalog
+    import_ms, handler_module = measure(lambda: __import__("lambda_function"))
+    first_ms, response = measure(lambda: handler_module.lambda_handler({"path": "/items/missing"}, None))
+    print(f"Cold start: import {import_ms:.2f}ms, first invocation {first_ms:.2f}ms (status {response['statusCode']}), "
+          f"catalog from {handler_module.CATALOG_DIR}")
+
+    for name, event in sample_events(handler_module):
+        timings = []
+        for _ in range(invocations):
+            elapsed, response = measure(lambda: handler_module.lambda_handler(event, None))
+            timings.append(elapsed)
+        timings.sort()
+        print(f"Warm {name}: status {response['statusCode']}, {len(response['body'])} characters, "
+              f"median {statistics.median(timings) * 1000:.1f}us, p99 {timings[int(len(timings) * 0.99) - 1] * 1000:.1f}us")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        os.environ["CATALOG_DIR"] = sys.argv[2]
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_INVOCATIONS)
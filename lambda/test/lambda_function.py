@@ -1,5 +1,172 @@
+import hashlib
+import json
+import os
+
+# Catalog lookups served from the JSON files the data pipeline publishes (data/final/current).
+#
+#   GET /items/{id}                  one item
+#   GET /items?ids={id},{id},...     several items as {"items": {id: item}, "missing": [ids]}
+#   GET /sections/{key}              a whole section, e.g. /sections/PlacedItems/Plants
+#   GET /stores/{id}                 one store
+#   GET /stocklists/{id}             one stocklist
+#
+# Works with API Gateway REST (path) and HTTP API (rawPath) proxy events, or a direct
+# invocation like {"path": "/items/0-02-01-01-00"}. Every response carries an ETag; a request
+# whose If-None-Match matches it gets an empty 304.
+
+# Deploy the catalog JSON files in a catalog/ directory next to this file, or point CATALOG_DIR at them
+handler_dir = os.path.dirname(os.path.abspath(__file__))
+CATALOG_DIR = os.environ.get("CATALOG_DIR") or next(
+    (path for path in [
+        os.path.join(handler_dir, 'catalog'),
+        os.path.join(handler_dir, '..', '..', 'data', 'final', 'current'),
+    ] if os.path.isdir(path)),
+    os.path.join(handler_dir, 'catalog'),
+)
+
+# Clients may keep a response this long before revalidating with its ETag
+CACHE_CONTROL = "public, max-age=300"
+MAX_BATCH_IDS = 100
+
+# Built on the first invocation and kept for every warm invocation of this container
+catalog = None
+
+
+def encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def etag_for(body):
+    return '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def find_sections(data, path=()):
+    """Yield (path, records) for every list of records in a catalog document, in document order."""
+    for key, value in data.items():
+        if isinstance(value, list):
+            yield path + (key,), value
+        elif isinstance(value, dict):
+            yield from find_sections(value, path + (key,))
+
+
+class Catalog:
+    """The catalog records by kind and key, with every response body serialized once.
+
+    A body and its ETag are built the first time a record is asked for and kept for every later
+    request, so a cold start only pays for reading the JSON files and a warm lookup is a dict access.
+    """
+
+    def __init__(self, catalog_dir):
+        items = self.read(catalog_dir, 'Items.json')
+        sections = {'/'.join(path): records for path, records in find_sections(items)}
+        self.records = {
+            "items": {record["id"]: record for records in sections.values() for record in records},
+            "sections": sections,
+            "stores": {str(store["id"]): store for store in self.read(catalog_dir, 'Stores.json')["Stores"]},
+            "stocklists": {str(stocklist["id"]): stocklist for stocklist in self.read(catalog_dir, 'Stocklists.json')["Stocklists"]},
+        }
+        self.responses = {}
+
+    @staticmethod
+    def read(catalog_dir, filename):
+        with open(os.path.join(catalog_dir, filename), mode='r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def lookup(self, kind, key):
+        """(body, etag) of one record, None when there is no such record."""
+        response = self.responses.get((kind, key))
+        if response is None:
+            record = self.records[kind].get(key)
+            if record is None:
+                return None
+            body = encode(record)
+            response = self.responses[(kind, key)] = (body, etag_for(body))
+        return response
+
+    def batch(self, item_ids):
+        """Body and ETag for several items, assembled from the serialized item bodies."""
+        found = []
+        missing = []
+        for item_id in item_ids:
+            response = self.lookup("items", item_id)
+            if response is None:
+                missing.append(item_id)
+            else:
+                found.append((item_id, response))
+        body = (
+            '{"items":{'
+            + ','.join(encode(item_id) + ':' + item_body for item_id, (item_body, _) in found)
+            + '},"missing":' + encode(missing) + '}'
+        )
+        # Derived from the item ETags rather than hashing the whole body
+        etags = {item_id: etag for item_id, (_, etag) in found}
+        return body, etag_for(encode([[item_id, etags.get(item_id)] for item_id in item_ids]))
+
+
+def get_catalog():
+    global catalog
+    if catalog is None:
+        catalog = Catalog(CATALOG_DIR)
+    return catalog
+
+
+def respond(status, body='', etag=None):
+    headers = {"Content-Type": "application/json", "Cache-Control": CACHE_CONTROL}
+    if etag:
+        headers["ETag"] = etag
+    return {"statusCode": status, "headers": headers, "body": body}
+
+
+def error(status, message):
+    return {"statusCode": status, "headers": {"Content-Type": "application/json"}, "body": encode({"message": message})}
+
+
+def header(event, name):
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def not_modified(event, etag):
+    if_none_match = header(event, "if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    return '*' in candidates or any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+
+def resolve(event, lookup):
+    """The (body, etag) for the request, or an error response."""
+    path = event.get("rawPath") or event.get("path") or ''
+    parts = [part for part in path.split('/') if part]
+    query = event.get("queryStringParameters") or {}
+    if not parts:
+        return error(400, "Expected /items, /sections, /stores or /stocklists")
+
+    resource, keys = parts[0], parts[1:]
+    if resource == "items" and not keys and query.get("ids"):
+        item_ids = [item_id for item_id in query["ids"].split(',') if item_id]
+        if len(item_ids) > MAX_BATCH_IDS:
+            return error(400, f"At most {MAX_BATCH_IDS} ids per request")
+        return lookup.batch(item_ids)
+    # Section keys contain slashes, every other resource takes a single key
+    if resource in lookup.records and keys and (resource == "sections" or len(keys) == 1):
+        key = '/'.join(keys)
+        return lookup.lookup(resource, key) or error(404, f"No {resource} entry {key}")
+    return error(400, f"Unknown catalog path {path}")
+
+
 def lambda_handler(event, context):
-    return {
-        'statusCode': 200,
-        'body': 'Hello from Lambda on vscode!'
-    }
+    try:
+        result = resolve(event, get_catalog())
+    except (OSError, ValueError, KeyError) as exception:
+        print(f"Error loading the catalog from {CATALOG_DIR}: {exception}")
+        return error(500, "Catalog unavailable")
+    if isinstance(result, dict):
+        return result
+    body, etag = result
+    if not_modified(event, etag):
+        return respond(304, etag=etag)
+    return respond(200, body, etag)
+